@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Offline parse benchmark for the HTML scrapers.
+
+Records real listing pages once, then replays them through each scraper's
+parsing code with no network, reporting pages/sec, listings (cards)/sec
+and peak memory. Synthetic pages with every card repeated 10x / 100x show
+how parsing scales with page size.
+
+Usage:
+    python benchmark.py --record            # save live listing pages to fixtures/
+    python benchmark.py                     # replay fixtures (plus 10x and 100x pages)
+    python benchmark.py --scale 1 --repeat 20 jobinrwanda
+    python benchmark.py --compare brightermonday   # html.parser full parse vs fast backend + strainer
+"""
+
+import argparse
+import copy
+import json
+import os
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from scrapers import client, parsing, jobinrwanda, brightermonday, devex, tenderafrica
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _jobinrwanda_cards(soup):
+    return [h.find_parent(["div", "article"]) or h for h in soup.select(jobinrwanda.CARD_SELECTOR)]
+
+
+def _devex_cards(soup):
+    return soup.select(devex.CARD_SELECTOR) or soup.select(devex.LINK_SELECTOR)
+
+
+def _tenderafrica_cards(soup):
+    for selector in tenderafrica.TENDER_SELECTORS:
+        items = soup.select(selector)
+        if len(items) > 1:
+            return items
+    return []
+
+
+# name -> scraper module, cards(soup) -> card elements (for synthetic pages)
+SCRAPERS = {
+    "jobinrwanda": (jobinrwanda, _jobinrwanda_cards),
+    "brightermonday": (brightermonday, lambda soup: soup.select(brightermonday.CARD_SELECTOR)),
+    "devex": (devex, _devex_cards),
+    "tenderafrica": (tenderafrica, _tenderafrica_cards),
+}
+
+
+def record(names):
+    """Download every listing page of the given scrapers into fixtures/<name>/."""
+    for name in names:
+        directory = os.path.join(FIXTURES_DIR, name)
+        os.makedirs(directory, exist_ok=True)
+        manifest = {}
+        for i, url in enumerate(SCRAPERS[name][0].urls()):
+            try:
+                r = client.get(url)
+            except Exception as e:
+                print(f"[Bench] Error fetching {url}: {e}")
+                continue
+            if r.status_code != 200:
+                print(f"[Bench] {url} returned {r.status_code}")
+                continue
+            filename = f"{i:02d}.html"
+            with open(os.path.join(directory, filename), "w", encoding="utf-8") as f:
+                f.write(r.text)
+            manifest[filename] = url
+            print(f"[Bench] Recorded {url} ({len(r.content) // 1024} KB)")
+        with open(os.path.join(directory, "urls.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+
+def load_fixtures(name):
+    """Return [(url, html)] recorded for a scraper."""
+    directory = os.path.join(FIXTURES_DIR, name)
+    manifest_path = os.path.join(directory, "urls.json")
+    if not os.path.exists(manifest_path):
+        return []
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    pages = []
+    for filename, url in sorted(manifest.items()):
+        with open(os.path.join(directory, filename), encoding="utf-8") as f:
+            pages.append((url, f.read()))
+    return pages
+
+
+def scale_page(html, cards, factor):
+    """Return html with every card repeated factor times (and the card count)."""
+    soup = BeautifulSoup(html, "html.parser")
+    found = [c for c in cards(soup) if c is not None]
+    if factor > 1:
+        for card in found:
+            anchor = card
+            for _ in range(factor - 1):
+                clone = copy.copy(card)
+                anchor.insert_after(clone)
+                anchor = clone
+    return str(soup), len(found) * factor
+
+
+def measure(parse, pages, repeat):
+    """Parse every page repeat times; return (seconds, matches, peak bytes)."""
+    start = time.perf_counter()
+    matches = 0
+    for _ in range(repeat):
+        for url, html in pages:
+            matches += len(parse(html, url))
+    elapsed = time.perf_counter() - start
+
+    # Memory is measured on a separate pass so tracing does not skew timings
+    tracemalloc.start()
+    for url, html in pages:
+        parse(html, url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, matches // repeat, peak
+
+
+def _load_scaled(name, factor):
+    """Return ([(url, html)], card count) for a scraper at the given scale."""
+    _, cards_of = SCRAPERS[name]
+    pages, cards = [], 0
+    for url, html in load_fixtures(name):
+        scaled, count = scale_page(html, cards_of, factor)
+        pages.append((url, scaled))
+        cards += count
+    return pages, cards
+
+
+def run(names, scales, repeat):
+    print(f"[Bench] HTML backend: {parsing.backend()}")
+    print(f"{'scraper':<16}{'scale':>6}{'pages':>7}{'cards':>8}{'matches':>9}"
+          f"{'pages/s':>10}{'cards/s':>11}{'peak MB':>9}")
+    for name in names:
+        module, _ = SCRAPERS[name]
+        if not load_fixtures(name):
+            print(f"{name:<16}  no fixtures - run: python benchmark.py --record {name}")
+            continue
+        for factor in scales:
+            pages, cards = _load_scaled(name, factor)
+            elapsed, matches, peak = measure(module.parse, pages, repeat)
+            runs = len(pages) * repeat
+            print(f"{name:<16}{str(factor) + 'x':>6}{len(pages):>7}{cards:>8}{matches:>9}"
+                  f"{runs / elapsed:>10.1f}{cards * repeat / elapsed:>11.0f}{peak / 1e6:>9.1f}")
+
+
+def compare(names, scales, repeat):
+    """Time the original full html.parser parse against the configured fast path."""
+    print(f"[Bench] baseline: html.parser, full page | fast: {parsing.backend()}, card subtrees")
+    print(f"{'scraper':<16}{'scale':>6}{'baseline/s':>12}{'fast/s':>10}{'speedup':>9}{'same':>6}")
+    for name in names:
+        module, _ = SCRAPERS[name]
+        if not load_fixtures(name):
+            print(f"{name:<16}  no fixtures - run: python benchmark.py --record {name}")
+            continue
+        for factor in scales:
+            pages, _ = _load_scaled(name, factor)
+            timings, outputs = [], []
+            for backend, strain in (("html.parser", False), ("auto", True)):
+                parsing.configure(backend=backend, strain=strain)
+                outputs.append([module.parse(html, url) for url, html in pages])
+                elapsed, _, _ = measure(module.parse, pages, repeat)
+                timings.append(len(pages) * repeat / elapsed)
+            parsing.configure(backend="auto", strain=True)
+            same = "yes" if outputs[0] == outputs[1] else "NO"
+            print(f"{name:<16}{str(factor) + 'x':>6}{timings[0]:>12.1f}{timings[1]:>10.1f}"
+                  f"{timings[1] / timings[0]:>8.1f}x{same:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scraper parse benchmark")
+    parser.add_argument("scrapers", nargs="*", help=f"Scrapers to include (default: {', '.join(SCRAPERS)})")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 100],
+                        help="Card multipliers for synthetic pages (default: 1 10 100)")
+    parser.add_argument("--repeat", type=int, default=3, help="Times to parse each page (default: 3)")
+    parser.add_argument("--compare", action="store_true",
+                        help="Report the speedup of the fast parser backend over html.parser")
+    parser.add_argument("--record", action="store_true",
+                        help="Download the scrapers' live listing pages to fixtures/ instead of benchmarking")
+    args = parser.parse_args()
+
+    names = args.scrapers or list(SCRAPERS)
+    unknown = [n for n in names if n not in SCRAPERS]
+    if unknown:
+        parser.error(f"unknown scraper(s): {', '.join(unknown)}")
+
+    if args.record:
+        record(names)
+    elif args.compare:
+        compare(names, args.scale, args.repeat)
+    else:
+        run(names, args.scale, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Canonical keys for listing URLs.
+
+The same tender is often reachable under several URLs: http vs https, with
+or without "www.", with tracking parameters from a search result, a
+trailing slash, a fragment, or (on BrighterMonday and Devex) a different
+title slug in front of the same listing id. canonical_key() maps all of
+those to one string, which the database uses to tell whether a listing is
+already stored.
+
+Usage:
+    from canonical import canonical_key
+    canonical_key("http://www.devex.com/jobs/web-developer-123?utm_source=x")
+    # -> "devex.com/jobs/123"
+"""
+
+import re
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "_ga", "ref", "referrer"}
+TRACKING_PREFIXES = ("utm_",)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Sites whose listing URLs carry a stable id: (host, path pattern, key).
+# The key is formatted with the host and the pattern's named groups.
+# BrighterMonday ids are a word of letters and digits at the end of the
+# slug ("web-developer-k1x9"); a slug ending in a plain word or number
+# ("web-developer", "intern-2024") has no id and keeps its whole path.
+SITE_IDS = [
+    (re.compile(r"jobinrwanda\.com$"), re.compile(r"^/job/(?P<id>[^/]+)"), "{host}/job/{id}"),
+    (re.compile(r"brightermonday\.co\.(ke|ug|tz)$"),
+     re.compile(r"^/listings/(?:.*-)?(?P<id>(?=[a-z]*\d)(?=\d*[a-z])[a-z0-9]{4,})$"), "{host}/listings/{id}"),
+    (re.compile(r"devex\.com$"), re.compile(r"^/(?P<kind>jobs|funding)/(?:.*-)?(?P<id>\d+)$"), "{host}/{kind}/{id}"),
+    (re.compile(r"reliefweb\.int$"), re.compile(r"^/(?P<kind>job|report|training)/(?P<id>\d+)"), "{host}/{kind}/{id}"),
+]
+
+
+def _host(parts):
+    host = (parts.hostname or "").rstrip(".")
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{port}"
+    return host
+
+
+def _query(query):
+    params = [(k, v) for k, v in parse_qsl(query, keep_blank_values=True)
+              if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)]
+    return urlencode(sorted(params))
+
+
+@lru_cache(maxsize=65536)
+def canonical_key(url):
+    """
+    Return the canonical key of a listing URL.
+
+    The key drops the scheme, "www.", default ports, fragments, trailing
+    slashes and tracking parameters, sorts the remaining query, and reduces
+    known listing URLs to their site id. Anything that is not an http(s)
+    URL is returned stripped but otherwise unchanged.
+    """
+    url = (url or "").strip()
+    parts = urlsplit(url)
+    if parts.scheme.lower() not in DEFAULT_PORTS or not parts.hostname:
+        return url
+
+    host = _host(parts)
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/")
+
+    for host_pattern, path_pattern, key in SITE_IDS:
+        if host_pattern.search(host):
+            m = path_pattern.match(path)
+            if m:
+                return key.format(host=host, **m.groupdict())
+
+    query = _query(parts.query)
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
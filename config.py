@@ -38,22 +38,161 @@ KEYWORDS = [
     "online platform",
 ]
 
+# Alternative spellings and translations (French, Swahili) that count as a
+# hit for the keyword they are listed under
+KEYWORD_SYNONYMS = {
+    "website": ["site web", "site internet", "tovuti"],
+    "web developer": ["developpeur web", "développeur web"],
+    "web development": ["développement web", "developpement web"],
+    "mobile app": ["application mobile", "programu ya simu"],
+    "software developer": ["développeur logiciel", "développeur de logiciels"],
+    "software development": ["développement logiciel", "développement de logiciels"],
+    "full stack": ["full-stack"],
+    "e-commerce": ["ecommerce", "commerce électronique"],
+    "digital platform": ["plateforme numérique", "plateforme digitale"],
+}
+
+# Relevance scoring - a tender's score is the sum of the weights of the
+# keywords in its title (x TITLE_WEIGHT) and, if not already in the title,
+# its organisation (x ORG_WEIGHT), times the prior of its source. Keywords
+# not listed weigh 1.0; sources match by name prefix, default 1.0.
+KEYWORD_WEIGHTS = {
+    # Project work we bid on
+    "web development": 3.0,
+    "app development": 3.0,
+    "mobile app": 3.0,
+    "software development": 3.0,
+    "web application": 2.5,
+    "website": 2.0,
+    "digital platform": 2.0,
+    "online platform": 2.0,
+    "e-commerce": 2.0,
+    "ICT consultant": 2.0,
+    "IT consultant": 2.0,
+    # Staff roles are less likely to be contract work
+    "ICT officer": 0.5,
+    "ICT manager": 0.5,
+    "ICT technician": 0.5,
+    "IT officer": 0.5,
+    "IT manager": 0.5,
+}
+TITLE_WEIGHT = 1.0
+ORG_WEIGHT = 0.3
+SOURCE_PRIORS = {
+    "TenderAfrica": 1.3,
+    "Devex Funding": 1.3,
+    "ReliefWeb": 1.1,
+    "JobInRwanda": 1.1,
+    "Devex Jobs": 1.0,
+    "Google": 0.9,
+    "BrighterMonday": 0.8,
+}
+
+# Email digest - the DIGEST_TOP_N best-scoring tenders are listed and
+# marked sent; the rest are summarised by source and stay in the queue for
+# the next digest
+DIGEST_TOP_N = 25
+
+# Metrics - after each scan a Prometheus text-format snapshot (per-source
+# pages, fetch latency, match rate, new/duplicate tenders, email result) is
+# written to this file for node_exporter's textfile collector and/or pushed
+# to this Pushgateway URL. Leave empty to turn either off.
+METRICS_TEXTFILE = os.environ.get("RADAR_METRICS_TEXTFILE", "")
+METRICS_PUSHGATEWAY = os.environ.get("RADAR_PUSHGATEWAY", "")
+
 # SendGrid settings - use environment variables for security
 SENDGRID_API_KEY = os.environ.get("SENDGRID_API_KEY", "")
 SENDGRID_TEMPLATE_ID = os.environ.get("SENDGRID_TEMPLATE_ID", "d-11064e123cf445bcab85f0d5fd2c4ec9")
 EMAIL_FROM = os.environ.get("EMAIL_FROM", "alerts@kamagram.com")
 EMAIL_TO = os.environ.get("EMAIL_TO", "marvin@kamagram.com")
 
-# Sources to enable/disable
+# Sources to enable/disable. Optional per-source settings:
+#   max_pages         how deep to follow a listing's pagination (default 1,
+#                     the first page only). Deeper crawling is opt-in: each
+#                     extra page is one more request per seed URL, paced at
+#                     RATE_LIMIT_PER_HOST, e.g. max_pages 5 on JobInRwanda's
+#                     3 seeds adds up to 12 requests (~6 s) a run
+#   stop_after_known  stop paging once this many listings in a row are
+#                     already in the database (default 10)
+#   interval          minutes between polls in daemon mode (default
+#                     DAEMON_INTERVAL); pages that stay unchanged are
+#                     polled less often, up to max_interval minutes
+#                     (default ADAPTIVE_MAX_INTERVAL)
 SOURCES = {
-    "jobinrwanda": True,
-    "brightermonday": True,  # East Africa: Kenya, Uganda, Tanzania
-    "devex": False,  # Requires JavaScript rendering - use google_search instead
-    "tenderafrica": False,  # Site currently returning 404
-    "reliefweb": False,  # Requires RELIEFWEB_APPNAME (register at apidoc.reliefweb.int)
-    "google_search": False,  # Requires Google Cloud billing
+    "jobinrwanda": {"enabled": True, "stop_after_known": 10, "interval": 15},
+    "brightermonday": {"enabled": True, "stop_after_known": 10, "interval": 30},  # East Africa: Kenya, Uganda, Tanzania
+    "devex": {"enabled": False, "interval": 12 * 60},  # Requires JavaScript rendering - use google_search instead
+    "tenderafrica": {"enabled": False, "interval": 60},  # Site currently returning 404
+    "reliefweb": {"enabled": False, "max_pages": 3, "stop_after_known": 10, "interval": 3 * 60},  # Requires RELIEFWEB_APPNAME (register at apidoc.reliefweb.int)
+    "google_search": {"enabled": False, "interval": 24 * 60},  # Requires Google Cloud billing
 }
 
+# Daemon mode (python radar.py --daemon) - sources without an "interval"
+# are polled every DAEMON_INTERVAL minutes; unsent tenders are emailed at
+# most every DAEMON_DIGEST_EVERY minutes
+DAEMON_INTERVAL = 60
+DAEMON_DIGEST_EVERY = 60
+
+# Adaptive polling (daemon mode) - every seed URL of a source gets its own
+# interval between the source's "interval" and "max_interval" (default
+# ADAPTIVE_MAX_INTERVAL) minutes. It is multiplied by ADAPTIVE_SPEED_UP
+# after a poll that finds new tenders and by ADAPTIVE_SLOW_DOWN after one
+# that finds the page unchanged.
+ADAPTIVE_MAX_INTERVAL = 24 * 60
+ADAPTIVE_SPEED_UP = 0.5
+ADAPTIVE_SLOW_DOWN = 1.5
+
 # Google Custom Search settings (optional)
 GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY", "")
 GOOGLE_CSE_ID = os.environ.get("GOOGLE_CSE_ID", "")
+
+# Concurrency - sources and the URLs inside each scraper run in parallel
+# when MAX_WORKERS > 1 (override with: python radar.py --workers N)
+MAX_WORKERS = 1
+MAX_WORKERS_PER_HOST = 2
+
+# HTTP client - seconds to wait for a response (shared by all scrapers),
+# and for a connection, so an unreachable host fails fast
+HTTP_TIMEOUT = 20
+HTTP_CONNECT_TIMEOUT = 5
+
+# Fetch policy - each host gets RATE_LIMIT_PER_HOST requests per second
+# (bursts up to RATE_LIMIT_BURST). 429/5xx responses and connection errors
+# are retried up to MAX_RETRIES times with jittered exponential backoff.
+# After CIRCUIT_FAILURES failed requests in a row a host is skipped for
+# CIRCUIT_COOLDOWN seconds; this is remembered across runs.
+RATE_LIMIT_PER_HOST = 2.0
+RATE_LIMIT_BURST = 4
+MAX_RETRIES = 2
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+CIRCUIT_FAILURES = 3
+CIRCUIT_COOLDOWN = 24 * 3600
+
+# HTTP cache - listing pages are fetched with conditional GETs and not
+# re-parsed when unchanged (disable with: python radar.py --no-cache)
+HTTP_CACHE_MAX_BYTES = 5 * 1024 * 1024
+
+# HTML parser - "auto" uses lxml when installed, else Python's html.parser
+HTML_PARSER = "auto"
+
+# Parse stage - with PARSE_PROCS > 1, scrapers with at least
+# PARSE_POOL_MIN_PAGES changed pages parse them in a process pool
+# (override with: python radar.py --parse-procs N)
+PARSE_PROCS = 1
+PARSE_POOL_MIN_PAGES = 8
+
+# Near-duplicates - a tender whose title shares at least this fraction of
+# words with one stored in the last NEAR_DUPLICATE_DAYS days, from the same
+# organisation (see dedup.py), is clustered with it instead of being
+# emailed again
+NEAR_DUPLICATE_THRESHOLD = 0.8
+NEAR_DUPLICATE_DAYS = 60
+
+# Retention - sent, expired and clustered near-duplicate tenders older
+# than RETENTION_DAYS move to a compressed archive table; their URLs are still
+# recognised. Archiving, VACUUM and ANALYZE run every COMPACT_EVERY_DAYS
+# days after a scan (run them now with: python radar.py --compact).
+# Keep RETENTION_DAYS above NEAR_DUPLICATE_DAYS.
+RETENTION_DAYS = 180
+COMPACT_EVERY_DAYS = 7
@@ -0,0 +1,120 @@
+"""
+Resident scheduler for radar.py --daemon.
+
+Instead of one cold scan a week, the daemon stays up and polls every source
+on its own interval (config.SOURCES "interval", in minutes), so new tenders
+are stored within minutes of being posted. What a cold start pays for stays
+warm between polls: the HTTP session and its connection pools, the
+database connection, the seen-link index, the compiled keyword matcher and
+the parse pool.
+
+SIGTERM or Ctrl-C lets the poll in progress finish and then returns; a
+second signal stops at once. A poll that raises (a locked database, a
+broken scraper) is logged and its sources are polled again at their next
+interval; the daemon keeps running. instance_lock() keeps a second radar
+that writes (daemon, one-off scan, --export or --compact) from working on
+the same database at the same time.
+
+Usage:
+    python radar.py --daemon
+"""
+
+import os
+import signal
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # no advisory file locks (Windows)
+    fcntl = None
+
+
+class AlreadyRunning(Exception):
+    """Another process holds the instance lock."""
+
+
+@contextmanager
+def instance_lock(path):
+    """Hold an exclusive lock on path (which records our pid) for the block."""
+    f = open(path, "a+", encoding="utf-8")
+    try:
+        if fcntl is not None:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                f.seek(0)
+                raise AlreadyRunning(f"another radar is running (pid {f.read().strip() or '?'}, lock {path})")
+        f.seek(0)
+        f.truncate()
+        f.write(f"{os.getpid()}\n")
+        f.flush()
+        yield
+    finally:
+        f.close()  # closing the file releases the lock
+
+
+class Schedule:
+    """When each source is next due, given {source: interval in seconds}."""
+
+    def __init__(self, intervals, now=None):
+        self.intervals = dict(intervals)
+        self.next_at = dict.fromkeys(self.intervals, now or time.time())
+
+    def due(self, now):
+        return [key for key, at in self.next_at.items() if at <= now]
+
+    def done(self, keys, started):
+        """Schedule the next poll of keys one interval after this one started."""
+        for key in keys:
+            self.next_at[key] = started + self.intervals[key]
+
+    def wait(self, now):
+        """Seconds until the next source is due (None if there are no sources)."""
+        if not self.next_at:
+            return None
+        return max(0.0, min(self.next_at.values()) - now)
+
+
+def serve(poll, intervals):
+    """
+    Call poll(sources) with the sources that are due, until SIGTERM or
+    SIGINT. Every source is polled once at start-up, then every interval
+    seconds, unless poll() returns {source: time of its next poll}. An
+    exception from poll() is printed and the schedule carries on.
+    """
+    stop = threading.Event()
+    signals = [signal.SIGTERM, signal.SIGINT]
+
+    def handle(signum, frame):
+        print(f"\n[Daemon] {signal.Signals(signum).name} received, stopping after the current poll...")
+        stop.set()
+        for sig in signals:
+            signal.signal(sig, previous[sig])
+
+    schedule = Schedule(intervals)
+    if not schedule.next_at:
+        print("[Daemon] No sources to poll.")
+        return
+    previous = {sig: signal.signal(sig, handle) for sig in signals}
+    try:
+        while not stop.is_set():
+            started = time.time()
+            due = schedule.due(started)
+            if not due:
+                stop.wait(schedule.wait(started))
+                continue
+            schedule.done(due, started)
+            try:
+                next_at = poll(due) or {}
+            except Exception as e:
+                print(f"[Daemon] Poll of {', '.join(map(str, due))} failed: {e!r}")
+                traceback.print_exc()
+                continue
+            schedule.next_at.update((key, at) for key, at in next_at.items() if at)
+    finally:
+        for sig in signals:
+            signal.signal(sig, previous[sig])
+    print("[Daemon] Stopped.")
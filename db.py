@@ -1,67 +1,934 @@
+import hashlib
+import heapq
+import itertools
+import json
+import re
 import sqlite3
 import os
+import threading
+import time
+import zlib
+
+import dedup
+import frozen
+from canonical import canonical_key
+from deadlines import parse_deadline
+from scoring import score
 
 DB_NAME = os.path.join(os.path.dirname(__file__), "tenders.db")
 
+# One connection is shared for the whole run instead of reconnecting (and
+# fsyncing) for every statement. WAL lets readers carry on while we write.
+PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",
+    "PRAGMA busy_timeout = 5000",
+]
 
-def init_db():
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS tenders (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT,
-            organization TEXT,
-            deadline TEXT,
-            link TEXT UNIQUE,
-            source TEXT,
-            sent INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+_conn = None
+_lock = threading.RLock()
+
+
+def connect():
+    """Return the run-wide connection, opening (and migrating) it on first use."""
+    global _conn
+    with _lock:
+        if _conn is None:
+            _conn = sqlite3.connect(DB_NAME, check_same_thread=False)
+            for pragma in PRAGMAS:
+                _conn.execute(pragma)
+            migrate(_conn)
+        return _conn
+
+
+def close():
+    """Close the run-wide connection (safe to call more than once)."""
+    global _conn
+    with _lock:
+        if _conn is not None:
+            _conn.execute("PRAGMA optimize")
+            _conn.close()
+            _conn = None
+
+
+def link_hash(link):
+    """64-bit signed hash of a link's canonical key, as stored in tenders.link_hash."""
+    digest = hashlib.blake2b(canonical_key(link).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _add_link_hash(conn):
+    conn.execute("ALTER TABLE tenders ADD COLUMN link_hash INTEGER")
+    rows = conn.execute("SELECT id, link FROM tenders WHERE link IS NOT NULL").fetchall()
+    conn.executemany("UPDATE tenders SET link_hash = ? WHERE id = ?",
+                     [(frozen.link_hash_3(link), row_id) for row_id, link in rows])
+    # Single-row snapshot of the sorted hashes of every row up to max_id
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS link_index (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            max_id INTEGER NOT NULL,
+            hashes BLOB NOT NULL
+        )
+    """)
+
+
+def _add_canonical_key(conn):
+    conn.execute("ALTER TABLE tenders ADD COLUMN canonical_key TEXT")
+    rows = conn.execute("SELECT id, link FROM tenders WHERE link IS NOT NULL ORDER BY id").fetchall()
+    seen = set()
+    updates = []
+    for row_id, link in rows:
+        key = frozen.canonical_key_4(link)
+        # A tender stored twice under different URLs keeps its key on the
+        # oldest row only; the copies are marked sent so they are not emailed again
+        duplicate = key in seen
+        updates.append((None if duplicate else key, frozen.link_hash_4(link), int(duplicate), row_id))
+        seen.add(key)
+    conn.executemany("UPDATE tenders SET canonical_key = ?, link_hash = ?, sent = MAX(sent, ?) WHERE id = ?",
+                     updates)
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_tenders_canonical_key ON tenders (canonical_key)")
+    conn.execute("DELETE FROM link_index")
+
+
+def _add_near_duplicates(conn):
+    conn.execute("ALTER TABLE tenders ADD COLUMN duplicate_of INTEGER")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS tender_minhash (
+            tender_id INTEGER PRIMARY KEY,
+            signature BLOB NOT NULL
         )
     """)
-    conn.commit()
-    conn.close()
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS tender_lsh (
+            band INTEGER,
+            bucket INTEGER,
+            tender_id INTEGER,
+            PRIMARY KEY (band, bucket, tender_id)
+        ) WITHOUT ROWID
+    """)
+    # Clustered duplicates never enter the unsent queue
+    conn.execute("DROP INDEX IF EXISTS idx_tenders_unsent")
+    conn.execute("""
+        CREATE INDEX idx_tenders_unsent
+            ON tenders (id, title, organization, deadline, link, source)
+            WHERE sent = 0 AND duplicate_of IS NULL
+    """)
+    for row_id, title, org in conn.execute("SELECT id, title, organization FROM tenders").fetchall():
+        sig = frozen.signature_5(title, org)
+        if sig:
+            frozen.index_5(conn, row_id, sig)
+
+
+def _reindex_near_duplicates(conn):
+    rows = conn.execute("SELECT id, title, organization, source, duplicate_of FROM tenders").fetchall()
+    conn.execute("DELETE FROM tender_lsh")
+    conn.execute("DELETE FROM tender_minhash")
+    signatures = {}
+    for row_id, title, _, _, _ in rows:
+        sig = signatures[row_id] = frozen.signature_15(title)
+        if sig:
+            frozen.index_5(conn, row_id, sig)
+    # Release tenders clustered only because of placeholder organisations
+    tenders = {row[0]: row for row in rows}
+    released = []
+    for row_id, title, org, source, duplicate_of in rows:
+        first = tenders.get(duplicate_of)
+        if duplicate_of is None or first is None:
+            continue
+        sig, other_sig = signatures[row_id], signatures[first[0]]
+        if not (sig and other_sig and frozen.is_duplicate_15(
+                sig, title, frozen.organization_15(org, source),
+                other_sig, first[1], frozen.organization_15(first[2], first[3]))):
+            released.append((row_id,))
+    conn.executemany("UPDATE tenders SET duplicate_of = NULL WHERE id = ?", released)
+
+
+def _recheck_number_order(conn):
+    # Release tenders clustered with one whose title has the same numbers in another order
+    rows = conn.execute("""
+        SELECT t.id, t.title, f.title FROM tenders t JOIN tenders f ON f.id = t.duplicate_of
+    """).fetchall()
+    conn.executemany("UPDATE tenders SET duplicate_of = NULL WHERE id = ?",
+                     [(row_id,) for row_id, title, first in rows
+                      if frozen.numbers_18(title) != frozen.numbers_18(first)])
+
+
+def _rekey_brightermonday(conn):
+    # Keys taken from the slug's last word ("web-developer" -> "developer")
+    # merged different listings; recompute every BrighterMonday key, stored
+    # and archived, oldest row first
+    rows = [("tenders", row_id, link) for row_id, link in conn.execute(
+        "SELECT id, link FROM tenders WHERE link LIKE '%brightermonday.co.%'")]
+    rows += [("tenders_archive", row_id, json.loads(zlib.decompress(data))["link"]) for row_id, data in conn.execute(
+        "SELECT id, data FROM tenders_archive WHERE canonical_key LIKE 'brightermonday.co.%'")]
+    rows.sort(key=lambda row: row[1])
+    # Clear the old keys first so the unique indexes never see two rows swapping keys
+    for table in ("tenders", "tenders_archive"):
+        conn.executemany(f"UPDATE {table} SET canonical_key = NULL WHERE id = ?",
+                         [(row_id,) for name, row_id, _ in rows if name == table])
+    seen = set()
+    updates = {"tenders": [], "tenders_archive": []}
+    for table, row_id, link in rows:
+        key = frozen.canonical_key_19(link)
+        # As in migration 4, a second row with the same key loses it and is not emailed
+        updates[table].append((None if key in seen else key, frozen.link_hash_19(link), int(key in seen), row_id))
+        seen.add(key)
+    conn.executemany("UPDATE tenders SET canonical_key = ?, link_hash = ?, sent = MAX(sent, ?) WHERE id = ?",
+                     updates["tenders"])
+    conn.executemany("UPDATE tenders_archive SET canonical_key = ?, link_hash = ? WHERE id = ?",
+                     [(key, h, row_id) for key, h, _, row_id in updates["tenders_archive"]])
+    conn.execute("DELETE FROM link_index")
+
+
+def _add_deadline_at(conn):
+    conn.execute("ALTER TABLE tenders ADD COLUMN deadline_at TEXT")
+    rows = conn.execute("SELECT id, deadline FROM tenders WHERE deadline IS NOT NULL").fetchall()
+    conn.executemany("UPDATE tenders SET deadline_at = ? WHERE id = ?",
+                     [(frozen.parse_deadline_9(deadline), row_id) for row_id, deadline in rows])
+    # Unsent queue by urgency (covering for get_unsent)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tenders_unsent_deadline
+            ON tenders (deadline_at, id, title, organization, deadline, link, source)
+            WHERE sent = 0 AND duplicate_of IS NULL
+    """)
+
+
+def _add_score(conn):
+    conn.execute("ALTER TABLE tenders ADD COLUMN score REAL")
+    rows = conn.execute("SELECT id, title, organization, source FROM tenders").fetchall()
+    score = frozen.scorer_10()
+    conn.executemany("UPDATE tenders SET score = ? WHERE id = ?",
+                     [(score(title, org, source), row_id) for row_id, title, org, source in rows])
+    # The unsent queue is ranked by score now, deadline second (covering for get_unsent)
+    conn.execute("DROP INDEX IF EXISTS idx_tenders_unsent_deadline")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tenders_unsent_score
+            ON tenders (score DESC, deadline_at, id, title, organization, deadline, link, source)
+            WHERE sent = 0 AND duplicate_of IS NULL
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tenders_score ON tenders (score, id)")
+
+
+# Schema migrations, applied in order. PRAGMA user_version records how many
+# have run, so each one runs exactly once per database. Append new steps;
+# never edit one that has shipped. Callables use the frozen.py copies of
+# the code they need, so later changes to it do not change them.
+MIGRATIONS = [
+    # 1: base table
+    """
+    CREATE TABLE IF NOT EXISTS tenders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT,
+        organization TEXT,
+        deadline TEXT,
+        link TEXT UNIQUE,
+        source TEXT,
+        sent INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+    # 2: unsent queue (partial + covering for get_unsent), recency listing,
+    #    per-source stats
+    """
+    CREATE INDEX IF NOT EXISTS idx_tenders_unsent
+        ON tenders (id, title, organization, deadline, link, source) WHERE sent = 0;
+    CREATE INDEX IF NOT EXISTS idx_tenders_created_at ON tenders (created_at);
+    CREATE INDEX IF NOT EXISTS idx_tenders_source_created ON tenders (source, created_at);
+    """,
+    # 3: hashed links and their snapshot for the seen-link index (linkindex.py)
+    _add_link_hash,
+    # 4: canonical URL keys (canonical.py), unique so re-posted URLs are not stored twice
+    _add_canonical_key,
+    # 5: MinHash signatures and LSH buckets for near-duplicates (dedup.py)
+    _add_near_duplicates,
+    # 6: full-text index over title/organization/source, kept in sync by triggers
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tenders_fts USING fts5(
+        title, organization, source,
+        content = 'tenders', content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2'
+    );
+    CREATE TRIGGER IF NOT EXISTS tenders_fts_insert AFTER INSERT ON tenders BEGIN
+        INSERT INTO tenders_fts (rowid, title, organization, source)
+        VALUES (new.id, new.title, new.organization, new.source);
+    END;
+    CREATE TRIGGER IF NOT EXISTS tenders_fts_delete AFTER DELETE ON tenders BEGIN
+        INSERT INTO tenders_fts (tenders_fts, rowid, title, organization, source)
+        VALUES ('delete', old.id, old.title, old.organization, old.source);
+    END;
+    CREATE TRIGGER IF NOT EXISTS tenders_fts_update AFTER UPDATE OF title, organization, source ON tenders BEGIN
+        INSERT INTO tenders_fts (tenders_fts, rowid, title, organization, source)
+        VALUES ('delete', old.id, old.title, old.organization, old.source);
+        INSERT INTO tenders_fts (rowid, title, organization, source)
+        VALUES (new.id, new.title, new.organization, new.source);
+    END;
+    INSERT INTO tenders_fts (tenders_fts) VALUES ('rebuild');
+    """,
+    # 7: last exported row per export target (export.py)
+    """
+    CREATE TABLE IF NOT EXISTS export_watermarks (
+        target TEXT PRIMARY KEY,
+        last_id INTEGER NOT NULL,
+        exported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+    # 8: archive of old sent tenders (compressed rows; keys kept for dedup),
+    #    and a key/value table for housekeeping state
+    """
+    CREATE TABLE IF NOT EXISTS tenders_archive (
+        id INTEGER PRIMARY KEY,
+        canonical_key TEXT UNIQUE,
+        link_hash INTEGER,
+        created_at TIMESTAMP,
+        archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        data BLOB NOT NULL
+    );
+    CREATE TRIGGER IF NOT EXISTS tenders_skip_archived BEFORE INSERT ON tenders
+    WHEN new.canonical_key IS NOT NULL
+        AND EXISTS (SELECT 1 FROM tenders_archive WHERE canonical_key = new.canonical_key)
+    BEGIN
+        SELECT RAISE(IGNORE);
+    END;
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    """,
+    # 9: deadlines parsed to ISO dates (deadlines.py)
+    _add_deadline_at,
+    # 10: relevance score (scoring.py)
+    _add_score,
+    # 11: per-host circuit breakers (scrapers/policy.py)
+    """
+    CREATE TABLE IF NOT EXISTS circuit_breakers (
+        host TEXT PRIMARY KEY,
+        failures INTEGER NOT NULL,
+        opened_at REAL
+    );
+    """,
+    # 12: timing/counter summary of every scan (instrument.py)
+    """
+    CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY,
+        started_at TIMESTAMP NOT NULL,
+        mode TEXT NOT NULL,
+        duration REAL NOT NULL,
+        summary TEXT NOT NULL
+    );
+    """,
+    # 13: per-source metrics of every scan (metrics.py), and the email result
+    """
+    CREATE TABLE IF NOT EXISTS run_metrics (
+        run_id INTEGER NOT NULL REFERENCES runs(id),
+        source TEXT NOT NULL,
+        pages INTEGER NOT NULL,
+        unchanged INTEGER NOT NULL,
+        errors INTEGER NOT NULL,
+        checked INTEGER NOT NULL,
+        matched INTEGER NOT NULL,
+        new INTEGER NOT NULL,
+        duplicates INTEGER NOT NULL,
+        fetch_p50 REAL,
+        fetch_p90 REAL,
+        fetch_p99 REAL,
+        PRIMARY KEY (run_id, source)
+    ) WITHOUT ROWID;
+    ALTER TABLE runs ADD COLUMN email TEXT;
+    CREATE INDEX IF NOT EXISTS idx_runs_started_at ON runs(started_at);
+    """,
+    # 14: adaptive polling interval of every seed URL (scrapers/adaptive.py)
+    """
+    CREATE TABLE IF NOT EXISTS url_schedule (
+        url TEXT PRIMARY KEY,
+        interval REAL NOT NULL,
+        next_at REAL NOT NULL,
+        fetches INTEGER NOT NULL DEFAULT 0,
+        changes INTEGER NOT NULL DEFAULT 0,
+        new_links INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID;
+    """,
+    # 15: near-duplicate signatures over titles only (placeholder organisations
+    #     left out), re-checking existing clusters
+    _reindex_near_duplicates,
+    # 16: unsent queue ranked with undated tenders after dated ones of the same score
+    """
+    DROP INDEX IF EXISTS idx_tenders_unsent_score;
+    CREATE INDEX IF NOT EXISTS idx_tenders_unsent_rank
+        ON tenders (score DESC, deadline_at IS NULL, deadline_at, id, title, organization, deadline, link, source)
+        WHERE sent = 0 AND duplicate_of IS NULL;
+    """,
+    # 17: --list filters: sent tenders, pending by score, and case-insensitive
+    #     source lookups (newest or best first) replacing the per-source stats index
+    """
+    DROP INDEX IF EXISTS idx_tenders_source_created;
+    CREATE INDEX IF NOT EXISTS idx_tenders_sent ON tenders (id) WHERE sent = 1;
+    CREATE INDEX IF NOT EXISTS idx_tenders_sent_score ON tenders (score, id) WHERE sent = 1;
+    CREATE INDEX IF NOT EXISTS idx_tenders_pending_score ON tenders (score, id)
+        WHERE sent = 0 AND duplicate_of IS NULL;
+    CREATE INDEX IF NOT EXISTS idx_tenders_source ON tenders (source COLLATE NOCASE, id);
+    CREATE INDEX IF NOT EXISTS idx_tenders_source_score ON tenders (source COLLATE NOCASE, score, id);
+    """,
+    # 18: near-duplicates must mention the same numbers in the same order
+    _recheck_number_order,
+    # 19: BrighterMonday keys from the listing id, not the slug's last word
+    _rekey_brightermonday,
+]
+
+
+def migrate(conn):
+    """Apply any migrations the database has not seen yet."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, step in enumerate(MIGRATIONS[version:], start=version + 1):
+        try:
+            if callable(step):
+                conn.execute("BEGIN")
+                step(conn)
+                conn.execute(f"PRAGMA user_version = {number}")
+                conn.commit()
+            else:
+                conn.executescript(f"BEGIN;\n{step}\nPRAGMA user_version = {number};\nCOMMIT;")
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def init_db():
+    with _lock:
+        migrate(connect())
+
+
+def insert_tenders(tenders):
+    """
+    Insert a whole scrape result in one transaction.
+
+    Rows whose link, or canonical key, is already stored (or archived) are
+    skipped. A near-duplicate of a recent tender (see dedup.py) is stored
+    with duplicate_of set to that tender's cluster and is left out of the
+    unsent queue. Returns the tenders that were stored, each with its new
+    row "id" and "duplicate_of" (None for a new tender).
+    """
+    conn = connect()
+    new = []
+    with _lock, conn:
+        for t in tenders:
+            sig = dedup.signature(t["title"])
+            duplicate_of = dedup.find_duplicate(conn, t["title"], t["org"], t["source"], sig) if sig else None
+            c = conn.execute("""
+                INSERT OR IGNORE INTO tenders
+                    (title, organization, deadline, link, source, link_hash, canonical_key, duplicate_of,
+                     deadline_at, score)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (t["title"], t["org"], t["deadline"], t["link"], t["source"],
+                  link_hash(t["link"]), canonical_key(t["link"]), duplicate_of, parse_deadline(t["deadline"]),
+                  score(t["title"], t["org"], t["source"])))
+            if c.rowcount == 1:
+                if sig:
+                    dedup.index(conn, c.lastrowid, sig)
+                new.append(dict(t, id=c.lastrowid, duplicate_of=duplicate_of))
+    return new
 
 
 def save_tender(t):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    try:
-        c.execute("""
-            INSERT INTO tenders (title, organization, deadline, link, source)
-            VALUES (?, ?, ?, ?, ?)
-        """, (t["title"], t["org"], t["deadline"], t["link"], t["source"]))
-        conn.commit()
-        return True
-    except sqlite3.IntegrityError:
-        return False
-    finally:
-        conn.close()
+    return bool(insert_tenders([t]))
+
+
+def _known_links_sql(count):
+    """SQL matching count canonical keys against tenders and the archive (keys passed twice)."""
+    placeholders = ",".join("?" * count)
+    return f"""
+        SELECT canonical_key FROM tenders WHERE canonical_key IN ({placeholders})
+        UNION ALL
+        SELECT canonical_key FROM tenders_archive WHERE canonical_key IN ({placeholders})
+    """
+
+
+def known_links(links):
+    """Return the subset of links stored (or archived) under the same canonical key, checked in bulk."""
+    by_key = {}
+    for link in links:
+        by_key.setdefault(canonical_key(link), []).append(link)
+    keys = list(by_key)
+    known = set()
+    with _lock:
+        conn = connect()
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            c = conn.execute(_known_links_sql(len(chunk)), chunk + chunk)
+            for (key,) in c:
+                known.update(by_key[key])
+    return known
+
+
+LINK_HASHES_SQL = """
+    SELECT id, link_hash FROM tenders WHERE id > ?
+    UNION ALL
+    SELECT id, link_hash FROM tenders_archive WHERE id > ?
+"""
+
+
+def link_hashes(after_id=0):
+    """Return (max id, [link hashes]) for the stored and archived rows with id > after_id."""
+    with _lock:
+        c = connect().execute(LINK_HASHES_SQL, (after_id, after_id))
+        max_id, hashes = after_id, []
+        for row_id, h in c:
+            max_id = max(max_id, row_id)
+            if h is not None:
+                hashes.append(h)
+        return max_id, hashes
+
+
+def load_link_snapshot():
+    """Return (max id, packed hashes) of the stored link index snapshot."""
+    with _lock:
+        row = connect().execute("SELECT max_id, hashes FROM link_index WHERE id = 1").fetchone()
+        return row or (0, b"")
+
+
+def save_link_snapshot(max_id, hashes):
+    conn = connect()
+    with _lock, conn:
+        conn.execute("INSERT OR REPLACE INTO link_index (id, max_id, hashes) VALUES (1, ?, ?)",
+                     (max_id, hashes))
+
+
+UNSENT_SQL = """
+    SELECT id, title, organization, deadline, link, source, score FROM tenders
+    WHERE sent = 0 AND duplicate_of IS NULL AND (deadline_at IS NULL OR deadline_at >= date('now'))
+    ORDER BY score DESC, deadline_at IS NULL, deadline_at, id
+"""
 
 
 def get_unsent():
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT id, title, organization, deadline, link, source FROM tenders WHERE sent = 0")
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    """
+    Return (id, title, organization, deadline, link, source, score) for the
+    unsent tenders that are still open, best score first, then soonest
+    deadline (undated last). Expired ones stay unsent and are archived in
+    time.
+    """
+    with _lock:
+        return connect().execute(UNSENT_SQL).fetchall()
 
 
 def mark_sent(ids):
     if not ids:
         return
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.executemany("UPDATE tenders SET sent = 1 WHERE id = ?", [(i,) for i in ids])
-    conn.commit()
-    conn.close()
-
-
-def get_all_tenders():
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT * FROM tenders ORDER BY created_at DESC")
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    conn = connect()
+    with _lock, conn:
+        conn.executemany("UPDATE tenders SET sent = 1 WHERE id = ?", [(i,) for i in ids])
+
+
+# Columns of the rows yielded by iter_tenders() and search()
+LIST_COLUMNS = ["id", "title", "organization", "deadline", "link", "source", "sent", "created_at", "duplicate_of",
+                "deadline_at", "score"]
+
+
+def _list_sql(status=None, source=False, before=False, by_score=False):
+    """
+    SQL of one iter_tenders() listing; parameters are the source name (if
+    source), the id to list before (if before), then LIMIT and OFFSET.
+    """
+    sql = f"SELECT {', '.join(LIST_COLUMNS)} FROM tenders WHERE 1 = 1"
+    if status == "sent":
+        sql += " AND sent = 1"
+    elif status == "pending":
+        sql += " AND sent = 0 AND duplicate_of IS NULL"
+    if source:
+        sql += " AND source COLLATE NOCASE = ?"
+    if before:
+        # Unary + keeps a score listing on its (score, id) index instead of an id range
+        sql += " AND +id < ?" if by_score else " AND id < ?"
+    sql += " ORDER BY score DESC, id DESC" if by_score else " ORDER BY id DESC"
+    return sql + " LIMIT ? OFFSET ?"
+
+
+# Next stored source name (case-insensitively) in [lower, upper); walking it
+# finds the sources matching a prefix in one index search each
+NEXT_SOURCE_SQL = """
+    SELECT source FROM tenders WHERE source COLLATE NOCASE >= ? AND source COLLATE NOCASE < ?
+    ORDER BY source COLLATE NOCASE LIMIT 1
+"""
+
+
+def _sources(conn, prefix):
+    """Return the stored source names starting with prefix, case-insensitively (one per spelling)."""
+    names, lower, upper = [], prefix, prefix + "\U0010ffff"
+    while True:
+        row = conn.execute(NEXT_SOURCE_SQL, (lower, upper)).fetchone()
+        if row is None:
+            return names
+        names.append(row[0])
+        lower = row[0] + "\0"
+
+
+def iter_tenders(status=None, source=None, before=None, limit=None, offset=0, by_score=False):
+    """
+    Yield stored tenders newest first (or best score first), streaming from
+    the cursor.
+
+    status is "sent" or "pending" (unsent and not a near-duplicate); source
+    matches the start of the source name, case-insensitively. before=id
+    continues a newest-first listing after the last id shown (keyset
+    paging, which stays fast however deep the page); limit/offset work as
+    in SQL.
+
+    Every matching source is read from its own index range and the ranges
+    are merged, so no listing needs a sort.
+    """
+    sql = _list_sql(status, bool(source), before is not None, by_score)
+    params = [] if before is None else [before]
+    with _lock:
+        conn = connect()
+        if not source:
+            yield from conn.execute(sql, params + [-1 if limit is None else limit, offset])
+            return
+        names = _sources(conn, source)
+        if len(names) == 1:
+            yield from conn.execute(sql, [names[0]] + params + [-1 if limit is None else limit, offset])
+            return
+        # Each source needs at most offset + limit rows before the merge
+        head = -1 if limit is None else offset + limit
+        streams = [conn.execute(sql, [name] + params + [head, 0]) for name in names]
+        key = (lambda row: (row[-1] is None, -(row[-1] or 0), -row[0])) if by_score else (lambda row: -row[0])
+        merged = heapq.merge(*streams, key=key)
+        yield from itertools.islice(merged, offset, None if limit is None else offset + limit)
+
+
+def _fts_query(text):
+    """Turn free text into an FTS5 query: every word must match, as a prefix."""
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def search(text, source=None, since=None, until=None, limit=20, offset=0):
+    """
+    Yield rows of LIST_COLUMNS for the tenders matching text, best match
+    first (bm25; title counts most). source matches the start of the source
+    name, case-insensitively; since/until bound created_at ("YYYY-MM-DD").
+    Near-duplicates are left out.
+    """
+    query = _fts_query(text)
+    if not query:
+        return
+    sql = f"""
+        SELECT {', '.join('t.' + column for column in LIST_COLUMNS)}
+        FROM tenders_fts f JOIN tenders t ON t.id = f.rowid
+        WHERE tenders_fts MATCH ? AND t.duplicate_of IS NULL
+    """
+    params = [query]
+    if source:
+        sql += " AND t.source LIKE ? || '%'"
+        params.append(source)
+    if since:
+        sql += " AND t.created_at >= ?"
+        params.append(since)
+    if until:
+        sql += " AND t.created_at < date(?, '+1 day')"
+        params.append(until)
+    sql += " ORDER BY bm25(tenders_fts, 10.0, 3.0, 1.0), t.id DESC LIMIT ? OFFSET ?"
+    params += [limit, offset]
+    with _lock:
+        for row in connect().execute(sql, params):
+            yield row
+
+
+def export_chunks(columns, after_id=0, since=None, size=5000):
+    """Yield lists of up to size rows with id > after_id, oldest first."""
+    sql = f"SELECT {', '.join(columns)} FROM tenders WHERE id > ?"
+    params = [after_id]
+    if since:
+        sql += " AND created_at >= ?"
+        params.append(since)
+    sql += " ORDER BY id"
+    with _lock:
+        c = connect().execute(sql, params)
+        while True:
+            rows = c.fetchmany(size)
+            if not rows:
+                return
+            yield rows
+
+
+def get_watermark(target):
+    """Return the last row id exported to target (0 if never)."""
+    with _lock:
+        row = connect().execute("SELECT last_id FROM export_watermarks WHERE target = ?", (target,)).fetchone()
+        return row[0] if row else 0
+
+
+def set_watermark(target, last_id):
+    conn = connect()
+    with _lock, conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO export_watermarks (target, last_id, exported_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+        """, (target, last_id))
+
+
+def get_meta(key, default=None):
+    with _lock:
+        row = connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+
+def set_meta(key, value):
+    conn = connect()
+    with _lock, conn:
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+
+def load_circuits():
+    """Return the stored circuit breaker state as {host: (failures, opened_at)}."""
+    with _lock:
+        rows = connect().execute("SELECT host, failures, opened_at FROM circuit_breakers")
+        return {host: (failures, opened_at) for host, failures, opened_at in rows}
+
+
+def save_circuits(circuits):
+    """Store circuit breaker state; hosts that recovered are removed."""
+    conn = connect()
+    with _lock, conn:
+        conn.executemany("DELETE FROM circuit_breakers WHERE host = ?",
+                         [(host,) for host, (failures, _) in circuits.items() if not failures])
+        conn.executemany("INSERT OR REPLACE INTO circuit_breakers (host, failures, opened_at) VALUES (?, ?, ?)",
+                         [(host, failures, opened_at) for host, (failures, opened_at) in circuits.items() if failures])
+
+
+def save_run(summary):
+    """Store an instrument.summary() dict (with "mode") in the runs table; return its id."""
+    conn = connect()
+    with _lock, conn:
+        return conn.execute("INSERT INTO runs (started_at, mode, duration, summary) VALUES (?, ?, ?, ?)",
+                            (summary["started_at"], summary["mode"], summary["duration"],
+                             json.dumps(summary))).lastrowid
+
+
+def get_url_schedule(urls):
+    """Return {url: (interval, next_at, fetches, changes, new_links)} for the given seed keys."""
+    if not urls:
+        return {}
+    with _lock:
+        rows = connect().execute(f"""
+            SELECT url, interval, next_at, fetches, changes, new_links FROM url_schedule
+            WHERE url IN ({", ".join("?" * len(urls))})
+        """, urls)
+        return {url: tuple(rest) for url, *rest in rows}
+
+
+def save_url_schedule(rows):
+    """Store (url, interval, next_at, fetches, changes, new_links) rows."""
+    conn = connect()
+    with _lock, conn:
+        conn.executemany("""
+            INSERT OR REPLACE INTO url_schedule (url, interval, next_at, fetches, changes, new_links)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, rows)
+
+
+METRIC_COLUMNS = ["pages", "unchanged", "errors", "checked", "matched", "new", "duplicates",
+                  "fetch_p50", "fetch_p90", "fetch_p99"]
+
+
+def save_run_metrics(run_id, snapshot):
+    """Store a metrics.snapshot() for a run: one run_metrics row per source."""
+    conn = connect()
+    with _lock, conn:
+        conn.executemany(f"""
+            INSERT OR REPLACE INTO run_metrics (run_id, source, {", ".join(METRIC_COLUMNS)})
+            VALUES (?, ?, {", ".join("?" * len(METRIC_COLUMNS))})
+        """, [(run_id, source, *(figures[c] for c in METRIC_COLUMNS))
+              for source, figures in snapshot["sources"].items()])
+        if snapshot["email"]:
+            conn.execute("UPDATE runs SET email = ? WHERE id = ?", (snapshot["email"]["status"], run_id))
+
+
+HISTORY_COLUMNS = ["day", "source", "runs", "pages", "unchanged", "errors", "checked", "matched", "match_rate",
+                   "new", "duplicates", "fetch_p50", "fetch_p90", "fetch_p99", "emails_sent"]
+
+
+# Every run since a day, newest first, with its per-source metrics (none
+# for a run that stored no metrics)
+HISTORY_SQL = f"""
+    SELECT date(r.started_at), r.id, r.email, m.source, {", ".join("m." + c for c in METRIC_COLUMNS)}
+    FROM runs r LEFT JOIN run_metrics m ON m.run_id = r.id
+    WHERE r.started_at >= date('now', ?)
+    ORDER BY r.started_at DESC
+"""
+
+
+def _round(value):
+    return None if value is None else round(value, 4)
+
+
+def metric_history(days=30):
+    """
+    Roll run_metrics up per day and source, newest day first; rows follow
+    HISTORY_COLUMNS. Latency figures are the mean of the runs' p50/p90 and
+    the worst p99; emails_sent counts the day's runs whose email went out.
+
+    The runs are read in started_at order and grouped here, which keeps
+    the query on idx_runs_started_at instead of a temporary sort.
+    """
+    with _lock:
+        rows = connect().execute(HISTORY_SQL, (f"-{days} days",)).fetchall()
+    groups, emails = {}, {}
+    for day, run_id, email, source, *figures in rows:
+        if email == "sent":
+            emails.setdefault(day, set()).add(run_id)
+        if source is not None:
+            groups.setdefault((day, source), []).append(dict(zip(METRIC_COLUMNS, figures)))
+    history = []
+    for (day, source), runs in groups.items():
+        totals = {c: sum(run[c] for run in runs) for c in METRIC_COLUMNS[:7]}
+        p50, p90, p99 = ([run[c] for run in runs if run[c] is not None] for c in METRIC_COLUMNS[7:])
+        history.append((
+            day, source, len(runs), *(totals[c] for c in ("pages", "unchanged", "errors", "checked", "matched")),
+            _round(totals["matched"] / totals["checked"]) if totals["checked"] else None,
+            totals["new"], totals["duplicates"],
+            _round(sum(p50) / len(p50)) if p50 else None, _round(sum(p90) / len(p90)) if p90 else None,
+            _round(max(p99)) if p99 else None, len(emails.get(day, ())),
+        ))
+    history.sort(key=lambda row: row[1])
+    history.sort(key=lambda row: row[0], reverse=True)
+    return history
+
+
+ARCHIVE_OLD_SQL = """
+    SELECT * FROM tenders
+    WHERE created_at < datetime('now', ?)
+        AND (sent = 1 OR duplicate_of IS NOT NULL OR deadline_at < date('now'))
+"""
+
+
+def archive_old(days):
+    """
+    Move sent, expired and clustered near-duplicate tenders older than
+    days into tenders_archive as zlib-compressed JSON; return how many
+    were moved.
+
+    Their canonical key and link hash stay searchable, so an archived
+    tender is never stored or emailed again. They leave the full-text and
+    near-duplicate indexes.
+    """
+    conn = connect()
+    moved = 0
+    with _lock, conn:
+        c = conn.execute(ARCHIVE_OLD_SQL, (f"-{days} days",))
+        columns = [d[0] for d in c.description]
+        while True:
+            rows = [dict(zip(columns, row)) for row in c.fetchmany(1000)]
+            if not rows:
+                break
+            conn.executemany("""
+                INSERT OR REPLACE INTO tenders_archive (id, canonical_key, link_hash, created_at, data)
+                VALUES (?, ?, ?, ?, ?)
+            """, [(r["id"], r["canonical_key"], r["link_hash"], r["created_at"],
+                   zlib.compress(json.dumps(r, ensure_ascii=False).encode("utf-8")))
+                  for r in rows])
+            conn.executemany("DELETE FROM tenders WHERE id = ?", [(r["id"],) for r in rows])
+            for r in rows:
+                dedup.unindex(conn, r["id"])
+            moved += len(rows)
+    return moved
+
+
+def _db_bytes():
+    return sum(os.path.getsize(DB_NAME + suffix) for suffix in ("", "-wal")
+               if os.path.exists(DB_NAME + suffix))
+
+
+def compact(retention_days):
+    """
+    Archive old tenders, then VACUUM and ANALYZE the database.
+
+    Returns (tenders archived, bytes before, bytes after), sizes including
+    the WAL file.
+    """
+    before = _db_bytes()
+    archived = archive_old(retention_days)
+    with _lock:
+        conn = connect()
+        conn.commit()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    set_meta("compacted_at", time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()))
+    return archived, before, _db_bytes()
+
+
+def compaction_due(every_days):
+    """
+    True if compact() has not run in the last every_days days. A database
+    that was never compacted counts from its first tender, so a fresh one
+    is not due.
+    """
+    last = get_meta("compacted_at")
+    with _lock:
+        conn = connect()
+        if not last:
+            row = conn.execute("SELECT created_at FROM tenders ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                return False
+            last = row[0]
+        return bool(conn.execute("SELECT ? < datetime('now', ?)", (last, f"-{every_days} days")).fetchone()[0])
+
+
+# Hot queries that must be served by an index. check_query_plans() fails if
+# any of them reads a table or a full (non-partial) index instead of
+# searching one, or sorts in a temporary b-tree.
+def _list_name(status, source, before, by_score):
+    return "_".join(["iter_tenders"] + [part for part, used in [
+        (status, status), ("source", source), ("before", before), ("by_score", by_score)] if used])
+
+
+INDEXED_QUERIES = {
+    "get_unsent": UNSENT_SQL,
+    "next_source": NEXT_SOURCE_SQL,
+    **{_list_name(*flags): _list_sql(*flags)
+       for flags in itertools.product([None, "sent", "pending"], [False, True], [False, True], [False, True])},
+    "known_links": _known_links_sql(2),
+    "link_hashes": LINK_HASHES_SQL,
+    "archive_old": ARCHIVE_OLD_SQL,
+    "metric_history": HISTORY_SQL,
+    "near_duplicates": dedup.candidates_sql(),
+}
+
+
+# Unfiltered listings return every tender by design: they may walk the table
+# or a whole index, as long as it is read in order (no temporary sort) and
+# LIMIT stops it
+ORDERED_SCANS = {_list_name(None, False, before, by_score) for before in (False, True) for by_score in (False, True)}
+
+_PLAN_INDEX = re.compile(r"USING (?:COVERING )?INDEX (\S+)")
+
+
+def check_query_plans(conn, queries=None):
+    """Return a list of problems found in the query plans of queries (default INDEXED_QUERIES)."""
+    partial = {row[0] for row in conn.execute(
+        "SELECT il.name FROM sqlite_master m, pragma_index_list(m.name) il WHERE m.type = 'table' AND il.partial"
+    )}
+    problems = []
+    for name, sql in (INDEXED_QUERIES if queries is None else queries).items():
+        params = (None,) * sql.count("?")
+        for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params):
+            detail = row[-1]
+            index = _PLAN_INDEX.search(detail)
+            scan_ok = name in ORDERED_SCANS or (index and index.group(1) in partial)
+            if "TEMP B-TREE" in detail or (detail.startswith("SCAN") and not scan_ok):
+                problems.append(f"{name}: {detail}")
+    return problems
+
+
+if __name__ == "__main__":
+    # Self-check: build the schema in memory and verify the hot queries are indexed
+    conn = sqlite3.connect(":memory:")
+    migrate(conn)
+    problems = check_query_plans(conn)
+    for problem in problems:
+        print(f"[DB] Unindexed query plan - {problem}")
+    if problems:
+        raise SystemExit(1)
+    print(f"[DB] Query plans OK ({len(INDEXED_QUERIES)} queries, schema v{len(MIGRATIONS)})")
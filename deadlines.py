@@ -0,0 +1,95 @@
+"""
+Deadline parsing for the free-text deadlines the scrapers collect.
+
+Sites give deadlines as "Deadline: 15 March 2026", "2026-03-15T00:00:00",
+"15/03/2026", "Mar 15, 2026", "15 mars 2026" or not at all ("Check
+listing", "N/A", a location). parse_deadline() returns an ISO date
+("YYYY-MM-DD") only when the text holds something that is clearly a date:
+a numeric date or a month name with a day next to it, so a stray
+number is never mistaken for one. Numeric dates are read day first. A date
+without a year is taken to be the next such day from today (allowing a
+month for listings that just closed).
+
+The same strings repeat on every run, so results are memoised.
+"""
+
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from dateutil import parser as dateparser
+
+MONTHS = (r"jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+          r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?")
+
+# French month names -> English for dateutil
+FRENCH_MONTHS = {
+    "janvier": "january", "fevrier": "february", "février": "february", "mars": "march",
+    "avril": "april", "mai": "may", "juin": "june", "juillet": "july", "aout": "august",
+    "août": "august", "septembre": "september", "octobre": "october", "novembre": "november",
+    "decembre": "december", "décembre": "december",
+}
+_FRENCH = re.compile(r"\b(" + "|".join(FRENCH_MONTHS) + r")\b", re.I)
+
+_ISO = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})")
+_NUMERIC = re.compile(r"\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{4}|\d{2})\b")
+_DAY = r"\d{1,2}(?:st|nd|rd|th)?"
+_NAMED = re.compile(
+    rf"\b(?:{_DAY}\s+(?:of\s+)?(?:{MONTHS})\.?(?:,?\s+\d{{4}})?"    # 15 March 2026, 15 March
+    rf"|(?:{MONTHS})\.?\s+{_DAY}(?:,?\s+\d{{4}})?)\b",              # March 15, 2026
+    re.I,
+)
+
+# A yearless date this far in the past is read as next year's
+YEARLESS_GRACE = timedelta(days=31)
+
+
+def _with_year(found, has_year, today):
+    """found, or next year's for a yearless date already past (None if that is 29 Feb)."""
+    if has_year or found >= today - YEARLESS_GRACE:
+        return found
+    try:
+        return found.replace(year=found.year + 1)
+    except ValueError:
+        return None
+
+
+def parse_deadline(text, today=None):
+    """Return the deadline in text as "YYYY-MM-DD", or None if there is no clear date."""
+    if not text:
+        return None
+    return _parse(text, today or date.today())
+
+
+@lru_cache(maxsize=4096)
+def _parse(text, today):
+    text = _FRENCH.sub(lambda m: FRENCH_MONTHS[m.group(1).lower()], text)
+
+    m = _ISO.search(text)
+    if m:
+        try:
+            return date(*map(int, m.groups())).isoformat()
+        except ValueError:
+            return None
+
+    m = _NUMERIC.search(text)
+    if m:
+        day, month, year = map(int, m.groups())
+        if year < 100:
+            year += 2000
+        try:
+            return date(year, month, day).isoformat()
+        except ValueError:
+            return None
+
+    m = _NAMED.search(text)
+    if m:
+        span = m.group(0)
+        try:
+            found = dateparser.parse(span, dayfirst=True, default=datetime(today.year, 1, 1)).date()
+        except (ValueError, OverflowError):
+            return None
+        found = _with_year(found, bool(re.search(r"\d{4}", span)), today)
+        return found.isoformat() if found else None
+
+    return None
@@ -0,0 +1,168 @@
+"""
+Near-duplicate detection for tenders (MinHash + LSH).
+
+A tender re-posted with a slightly different title, or picked up by
+another aggregator under another URL, is not caught by the canonical URL.
+Instead each tender's title is reduced to a set of words and summarised
+by a MinHash signature: NUM_PERM hash minimums whose agreement rate
+estimates the Jaccard similarity of two word sets.
+
+Signatures are split into BANDS bands of ROWS values and every band is
+hashed into a bucket (the tender_lsh table). Tenders that share a bucket
+are candidates; a candidate is a duplicate when its signatures agree on at
+least NEAR_DUPLICATE_THRESHOLD of the values, both titles mention the same
+numbers in the same order (so "lot 2" and "lot 3", or "tender 0 1" and
+"tender 1 0", stay apart), their organisations match and it was stored
+within the last NEAR_DUPLICATE_DAYS days. A lookup is BANDS primary-key
+searches, so its cost does not grow with the size of the history.
+
+Organisations are compared separately, and only real ones: scrapers fill
+in a placeholder when a listing names none ("TenderAfrica Listing",
+"BrighterMonday Kenya", "Devex", the Google site, "Unknown"), and those
+words would make unrelated tenders from one source look alike. Two
+tenders' organisations match when one's words include the other's, or
+when exactly one of them is a placeholder (the same tender picked up by
+an aggregator); with no real organisation on either side there is too
+little to go on and they are kept apart.
+
+The functions take an open connection so db.insert_tenders() can run them
+inside its own transaction.
+"""
+
+import hashlib
+import re
+import struct
+
+from config import NEAR_DUPLICATE_THRESHOLD, NEAR_DUPLICATE_DAYS
+from matcher import normalize
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Too few words to tell a re-post from a different tender
+MIN_WORDS = 3
+
+# Organisations scrapers fill in when they can't find one (besides the source's own name)
+PLACEHOLDER_ORGS = {"unknown", "n/a", "na", "none", "check listing"}
+
+STOPWORDS = {
+    "a", "an", "and", "at", "by", "for", "in", "of", "on", "or", "the", "to", "with",
+    "de", "des", "du", "et", "la", "le", "les", "pour", "na", "ya", "wa",
+}
+
+_SIGNATURE = struct.Struct(f"<{NUM_PERM}I")
+_BAND = struct.Struct(f"<{ROWS}I")
+
+
+def _words(text):
+    return {w for w in re.findall(r"\w+", normalize(text or "")) if w not in STOPWORDS}
+
+
+def organization(org, source):
+    """
+    Words of a tender's organisation, or None if it is a placeholder: none
+    given, one of PLACEHOLDER_ORGS, or derived from the source's name.
+    """
+    if not org or normalize(org) in PLACEHOLDER_ORGS:
+        return None
+    org_words, source_words = _words(org), _words(source)
+    if not org_words or org_words <= source_words or (source_words and source_words <= org_words):
+        return None
+    return frozenset(org_words)
+
+
+def same_organization(a, b):
+    """True if organization() results a and b may name the same organisation."""
+    if a is None and b is None:
+        return False
+    return a is None or b is None or a <= b or b <= a
+
+
+def signature(title):
+    """MinHash signature (tuple of NUM_PERM ints), or None if there is too little text."""
+    tokens = _words(title)
+    if len(tokens) < MIN_WORDS:
+        return None
+    # One extendable-output hash per word yields all NUM_PERM hash values at once
+    hashed = [_SIGNATURE.unpack(hashlib.shake_128(w.encode("utf-8")).digest(_SIGNATURE.size))
+              for w in tokens]
+    return tuple(map(min, zip(*hashed)))
+
+
+def _numbers(title):
+    """The numbers in a title, in order of appearance."""
+    return [w for w in re.findall(r"\w+", normalize(title or "")) if w.isdigit()]
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of the word sets behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def buckets(sig):
+    """[(band, bucket)] for a signature."""
+    result = []
+    for band in range(BANDS):
+        values = _BAND.pack(*sig[band * ROWS:(band + 1) * ROWS])
+        digest = hashlib.blake2b(values, digest_size=8).digest()
+        result.append((band, int.from_bytes(digest, "big", signed=True)))
+    return result
+
+
+def is_duplicate(sig, title, org, other_sig, other_title, other_org):
+    """
+    Return the similarity of two tenders if they are near-duplicates, else
+    None; org and other_org are organization() results.
+    """
+    score = similarity(sig, other_sig)
+    if (score < NEAR_DUPLICATE_THRESHOLD or _numbers(title) != _numbers(other_title)
+            or not same_organization(org, other_org)):
+        return None
+    return score
+
+
+def candidates_sql(bands=BANDS):
+    """SQL of the recent tenders sharing one of bands LSH buckets (band, bucket pairs, then the age bound)."""
+    condition = " OR ".join(["(l.band = ? AND l.bucket = ?)"] * bands)
+    return f"""
+        SELECT l.tender_id, m.signature, COALESCE(t.duplicate_of, t.id), t.title, t.organization, t.source
+        FROM tender_lsh l
+        JOIN tender_minhash m ON m.tender_id = l.tender_id
+        JOIN tenders t ON t.id = l.tender_id
+        WHERE ({condition}) AND t.created_at >= datetime('now', ?)
+    """
+
+
+def find_duplicate(conn, title, org, source, sig):
+    """Return the id of the cluster a tender belongs to, or None."""
+    pairs = buckets(sig)
+    params = [value for pair in pairs for value in pair]
+    rows = conn.execute(candidates_sql(len(pairs)), params + [f"-{NEAR_DUPLICATE_DAYS} days"])
+
+    org = organization(org, source)
+    best = None
+    for tender_id, packed, cluster, other_title, other_org, other_source in rows:
+        score = is_duplicate(sig, title, org, _SIGNATURE.unpack(packed), other_title,
+                             organization(other_org, other_source))
+        if score is not None and (best is None or (score, -tender_id) > best[:2]):
+            best = (score, -tender_id, cluster)
+    return best[2] if best else None
+
+
+def index(conn, tender_id, sig):
+    """Store a tender's signature and LSH buckets."""
+    conn.execute("INSERT OR REPLACE INTO tender_minhash (tender_id, signature) VALUES (?, ?)",
+                 (tender_id, _SIGNATURE.pack(*sig)))
+    conn.executemany("INSERT OR IGNORE INTO tender_lsh (band, bucket, tender_id) VALUES (?, ?, ?)",
+                     [(band, bucket, tender_id) for band, bucket in buckets(sig)])
+
+
+def unindex(conn, tender_id):
+    """Remove a tender's signature and LSH buckets."""
+    row = conn.execute("SELECT signature FROM tender_minhash WHERE tender_id = ?", (tender_id,)).fetchone()
+    if not row:
+        return
+    conn.executemany("DELETE FROM tender_lsh WHERE band = ? AND bucket = ? AND tender_id = ?",
+                     [(band, bucket, tender_id) for band, bucket in buckets(_SIGNATURE.unpack(row[0]))])
+    conn.execute("DELETE FROM tender_minhash WHERE tender_id = ?", (tender_id,))
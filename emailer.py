@@ -1,36 +1,55 @@
-import os
+from collections import Counter
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
 from datetime import datetime
-from config import SENDGRID_API_KEY, SENDGRID_TEMPLATE_ID, EMAIL_FROM, EMAIL_TO
+import metrics
+from config import SENDGRID_API_KEY, SENDGRID_TEMPLATE_ID, EMAIL_FROM, EMAIL_TO, DIGEST_TOP_N
+
+
+def summarize(tenders):
+    """Count tenders per source, largest first: [{"source", "count"}]."""
+    counts = Counter(t[5] for t in tenders)
+    return [{"source": source, "count": count} for source, count in counts.most_common()]
 
 
 def send_email(tenders):
-    """Send email with tender opportunities using SendGrid dynamic template."""
+    """
+    Send email with tender opportunities using SendGrid dynamic template.
+
+    tenders come ranked (db.get_unsent); the first DIGEST_TOP_N are listed
+    and the rest are summarised by source (radar.py only marks the listed
+    ones sent).
+    """
 
     if not SENDGRID_API_KEY:
         print("[Email] SENDGRID_API_KEY not set. Skipping email send.")
         print("[Email] Set the SENDGRID_API_KEY environment variable to enable emails.")
+        metrics.email("skipped", len(tenders))
         return False
 
     if not SENDGRID_TEMPLATE_ID:
         print("[Email] SENDGRID_TEMPLATE_ID not set. Skipping email send.")
+        metrics.email("skipped", len(tenders))
         return False
 
     today_short = datetime.now().strftime("%d %b %Y")
     today_full = datetime.now().strftime("%d %B, %Y").lstrip("0")  # e.g., "5 February, 2026"
 
+    top, rest = tenders[:DIGEST_TOP_N], tenders[DIGEST_TOP_N:]
+
     # Build items array for SendGrid dynamic template
     # Template expects: {{#each items}} with {{org}}, {{company}}, {{details}}, {{deadline}}, {{link}}
+    # and, when there are more, {{more_count}} and {{#each more}} with {{source}}, {{count}}
     items = []
-    for t in tenders:
-        # t is a tuple: (id, title, organization, deadline, link, source)
+    for t in top:
+        # t is a tuple: (id, title, organization, deadline, link, source, score)
         items.append({
             "org": t[2] or "Unknown Organization",
             "company": t[5],  # source (e.g., "JobInRwanda")
             "details": t[1],  # title
             "deadline": t[3] or "Not specified",
             "link": t[4],
+            "score": t[6],
         })
 
     message = Mail(
@@ -43,6 +62,8 @@ def send_email(tenders):
         "subject": f"Kamagram Tender Radar - {len(tenders)} New Opportunities ({today_short})",
         "items": items,
         "count": len(tenders),
+        "more_count": len(rest),
+        "more": summarize(rest),
         "date": today_full,
     }
 
@@ -50,16 +71,20 @@ def send_email(tenders):
         sg = SendGridAPIClient(SENDGRID_API_KEY)
         response = sg.send(message)
         print(f"[Email] Successfully sent to {EMAIL_TO} (status: {response.status_code})")
+        metrics.email("sent", len(tenders))
         return True
     except Exception as e:
         print(f"[Email] Failed to send: {e}")
+        metrics.email("failed", len(tenders))
         return False
 
 
 if __name__ == "__main__":
     # Test with dummy data
     test_tenders = [
-        (1, "Website Development for Ministry", "Ministry of ICT", "15 Feb 2026", "https://example.com/tender1", "TestSource"),
-        (2, "Mobile App Development", "Rwanda Revenue Authority", "20 Feb 2026", "https://example.com/tender2", "TestSource"),
+        (1, "Website Development for Ministry", "Ministry of ICT", "15 Feb 2026", "https://example.com/tender1",
+         "TestSource", 2.0),
+        (2, "Mobile App Development", "Rwanda Revenue Authority", "20 Feb 2026", "https://example.com/tender2",
+         "TestSource", 6.0),
     ]
     send_email(test_tenders)
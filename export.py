@@ -0,0 +1,121 @@
+"""
+Bulk export of the tender history for offline analysis.
+
+Rows are streamed from the database in chunks (oldest first), so memory
+stays flat whatever the size of the table. Formats:
+    csv      header + one line per tender
+    jsonl    one JSON object per line
+    parquet  columnar, for pandas/DuckDB/Spark (needs pyarrow)
+
+Every export records the last row id written to its target file. With
+incremental=True only rows added since then are written: appended to a
+CSV/JSONL file, or written to a new "<name>.from-<id>.parquet" file next to
+a Parquet one (Parquet files cannot be appended to).
+
+Usage:
+    python radar.py --export tenders.csv
+    python radar.py --export tenders.parquet --incremental
+"""
+
+import csv
+import json
+import os
+
+import db
+
+EXPORT_COLUMNS = db.LIST_COLUMNS + ["canonical_key"]
+INTEGER_COLUMNS = {"id", "sent", "duplicate_of"}
+FLOAT_COLUMNS = {"score"}
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+
+CHUNK_ROWS = 5000
+
+
+def format_for(path):
+    """Guess the export format from a file name."""
+    fmt = FORMATS.get(os.path.splitext(path)[1].lower())
+    if not fmt:
+        raise ValueError(f"can't tell the export format of {path} (use .csv, .jsonl or .parquet)")
+    return fmt
+
+
+def _write_csv(f, chunks, header):
+    writer = csv.writer(f)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield rows
+
+
+def _write_jsonl(f, chunks):
+    for rows in chunks:
+        f.writelines(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n" for row in rows)
+        yield rows
+
+
+def _write_parquet(path, chunks):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet export needs pyarrow (pip install -r requirements-optional.txt)")
+
+    def arrow_type(column):
+        if column in INTEGER_COLUMNS:
+            return pa.int64()
+        if column in FLOAT_COLUMNS:
+            return pa.float64()
+        return pa.string()
+
+    schema = pa.schema([(c, arrow_type(c)) for c in EXPORT_COLUMNS])
+    writer = None
+    try:
+        for rows in chunks:
+            if writer is None:
+                writer = pq.ParquetWriter(path, schema)
+            columns = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            yield rows
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def export(path, fmt=None, incremental=False, since=None):
+    """
+    Export tenders to path; return (rows written, file written to).
+
+    since ("YYYY-MM-DD") limits the export to tenders added on or after
+    that date. The file differs from path only for incremental Parquet
+    exports, and a Parquet export with no rows writes no file.
+    """
+    fmt = fmt or format_for(path)
+    target = os.path.abspath(path)
+    after_id = db.get_watermark(target) if incremental else 0
+    chunks = db.export_chunks(EXPORT_COLUMNS, after_id=after_id, since=since, size=CHUNK_ROWS)
+
+    if fmt == "parquet":
+        out = path
+        if after_id:
+            out = f"{os.path.splitext(path)[0]}.from-{after_id + 1}.parquet"
+        written = _write_parquet(out, chunks)
+        f = None
+    else:
+        out = path
+        append = bool(after_id) and os.path.exists(path)
+        f = open(path, "a" if append else "w", encoding="utf-8", newline="")
+        written = _write_csv(f, chunks, header=not append) if fmt == "csv" else _write_jsonl(f, chunks)
+
+    count, last_id = 0, after_id
+    try:
+        for rows in written:
+            count += len(rows)
+            last_id = rows[-1][0]
+    finally:
+        if f is not None:
+            f.close()
+
+    db.set_watermark(target, last_id)
+    return count, out
@@ -0,0 +1,326 @@
+"""
+Helper code as it stood when each db.MIGRATIONS step shipped.
+
+A migration runs once per database, possibly long after it was written,
+so it has to compute what it computed then. The callables in
+db.MIGRATIONS use these copies, never the live canonical, dedup,
+deadlines or scoring modules, whose behaviour moves on. Names end in the
+number of the first migration that needs them.
+
+Never edit a copy: a behaviour change is a new migration, with a new copy
+if it needs one. Keyword lists, weights and source priors are read from
+config, like every run does; only the code is frozen.
+"""
+
+import hashlib
+import re
+import struct
+import unicodedata
+from datetime import date, datetime, timedelta
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from dateutil import parser as dateparser
+
+from config import KEYWORDS, KEYWORD_SYNONYMS, KEYWORD_WEIGHTS, TITLE_WEIGHT, ORG_WEIGHT, SOURCE_PRIORS
+
+
+def _normalize(text):
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.split())
+
+
+# 3: hashed links -----------------------------------------------------------
+
+def link_hash_3(link):
+    digest = hashlib.blake2b(link.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+# 4: canonical URL keys -----------------------------------------------------
+
+_TRACKING_PARAMS_4 = {"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "_ga", "ref", "referrer"}
+_DEFAULT_PORTS_4 = {"http": 80, "https": 443}
+_SITE_IDS_4 = [
+    (re.compile(r"jobinrwanda\.com$"), re.compile(r"^/job/(?P<id>[^/]+)"), "{host}/job/{id}"),
+    (re.compile(r"brightermonday\.co\.(ke|ug|tz)$"), re.compile(r"^/listings/(?:.*-)?(?P<id>[a-z0-9]+)$"),
+     "{host}/listings/{id}"),
+    (re.compile(r"devex\.com$"), re.compile(r"^/(?P<kind>jobs|funding)/(?:.*-)?(?P<id>\d+)$"), "{host}/{kind}/{id}"),
+    (re.compile(r"reliefweb\.int$"), re.compile(r"^/(?P<kind>job|report|training)/(?P<id>\d+)"), "{host}/{kind}/{id}"),
+]
+
+
+def _host_4(parts):
+    host = (parts.hostname or "").rstrip(".")
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port != _DEFAULT_PORTS_4.get(parts.scheme.lower()):
+        host = f"{host}:{port}"
+    return host
+
+
+def canonical_key_4(url):
+    url = (url or "").strip()
+    parts = urlsplit(url)
+    if parts.scheme.lower() not in _DEFAULT_PORTS_4 or not parts.hostname:
+        return url
+
+    host = _host_4(parts)
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/")
+    for host_pattern, path_pattern, key in _SITE_IDS_4:
+        if host_pattern.search(host):
+            m = path_pattern.match(path)
+            if m:
+                return key.format(host=host, **m.groupdict())
+
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if k.lower() not in _TRACKING_PARAMS_4 and not k.lower().startswith("utm_")))
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+def link_hash_4(link):
+    digest = hashlib.blake2b(canonical_key_4(link).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+# 5: MinHash signatures and LSH buckets ---------------------------------------
+
+_NUM_PERM_5, _BANDS_5 = 64, 16
+_ROWS_5 = _NUM_PERM_5 // _BANDS_5
+_MIN_WORDS_5 = 3
+_STOPWORDS_5 = {
+    "a", "an", "and", "at", "by", "for", "in", "of", "on", "or", "the", "to", "with",
+    "de", "des", "du", "et", "la", "le", "les", "pour", "na", "ya", "wa",
+}
+_SIGNATURE_5 = struct.Struct(f"<{_NUM_PERM_5}I")
+_BAND_5 = struct.Struct(f"<{_ROWS_5}I")
+
+
+def _words_5(text):
+    return {w for w in re.findall(r"\w+", _normalize(text or "")) if w not in _STOPWORDS_5}
+
+
+def _minhash_5(tokens):
+    if len(tokens) < _MIN_WORDS_5:
+        return None
+    hashed = [_SIGNATURE_5.unpack(hashlib.shake_128(w.encode("utf-8")).digest(_SIGNATURE_5.size))
+              for w in tokens]
+    return tuple(map(min, zip(*hashed)))
+
+
+def signature_5(title, org):
+    """Signature over a tender's title and organisation words."""
+    return _minhash_5(_words_5(f"{title or ''} {org or ''}"))
+
+
+def index_5(conn, tender_id, sig):
+    """Store a signature and its LSH buckets."""
+    conn.execute("INSERT OR REPLACE INTO tender_minhash (tender_id, signature) VALUES (?, ?)",
+                 (tender_id, _SIGNATURE_5.pack(*sig)))
+    buckets = []
+    for band in range(_BANDS_5):
+        values = _BAND_5.pack(*sig[band * _ROWS_5:(band + 1) * _ROWS_5])
+        digest = hashlib.blake2b(values, digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, "big", signed=True), tender_id))
+    conn.executemany("INSERT OR IGNORE INTO tender_lsh (band, bucket, tender_id) VALUES (?, ?, ?)", buckets)
+
+
+# 9: deadlines ---------------------------------------------------------------
+
+_MONTHS_9 = (r"jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+             r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?")
+_FRENCH_MONTHS_9 = {
+    "janvier": "january", "fevrier": "february", "février": "february", "mars": "march",
+    "avril": "april", "mai": "may", "juin": "june", "juillet": "july", "aout": "august",
+    "août": "august", "septembre": "september", "octobre": "october", "novembre": "november",
+    "decembre": "december", "décembre": "december",
+}
+_FRENCH_9 = re.compile(r"\b(" + "|".join(_FRENCH_MONTHS_9) + r")\b", re.I)
+_ISO_9 = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})")
+_NUMERIC_9 = re.compile(r"\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{4}|\d{2})\b")
+_DAY_9 = r"\d{1,2}(?:st|nd|rd|th)?"
+_NAMED_9 = re.compile(
+    rf"\b(?:{_DAY_9}\s+(?:of\s+)?(?:{_MONTHS_9})\.?(?:,?\s+\d{{4}})?"
+    rf"|(?:{_MONTHS_9})\.?\s+{_DAY_9}(?:,?\s+\d{{4}})?)\b",
+    re.I,
+)
+
+
+def parse_deadline_9(text, today=None):
+    """ISO deadline date in text, or None (with the later fix for a passed yearless 29 Feb)."""
+    if not text:
+        return None
+    today = today or date.today()
+    text = _FRENCH_9.sub(lambda m: _FRENCH_MONTHS_9[m.group(1).lower()], text)
+
+    m = _ISO_9.search(text)
+    if m:
+        try:
+            return date(*map(int, m.groups())).isoformat()
+        except ValueError:
+            return None
+
+    m = _NUMERIC_9.search(text)
+    if m:
+        day, month, year = map(int, m.groups())
+        if year < 100:
+            year += 2000
+        try:
+            return date(year, month, day).isoformat()
+        except ValueError:
+            return None
+
+    m = _NAMED_9.search(text)
+    if m:
+        span = m.group(0)
+        try:
+            found = dateparser.parse(span, dayfirst=True, default=datetime(today.year, 1, 1)).date()
+        except (ValueError, OverflowError):
+            return None
+        if not re.search(r"\d{4}", span) and found < today - timedelta(days=31):
+            try:
+                found = found.replace(year=found.year + 1)
+            except ValueError:
+                return None
+        return found.isoformat()
+
+    return None
+
+
+# 10: relevance score ----------------------------------------------------------
+
+def _trie_pattern_10(terms):
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node):
+        end = node.get("", False)
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            body = "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+def _matcher_10():
+    forms = {}
+    for keyword in KEYWORDS:
+        forms.setdefault(_normalize(keyword), []).append(keyword)
+    for keyword, variants in KEYWORD_SYNONYMS.items():
+        for variant in variants:
+            forms.setdefault(_normalize(variant), []).append(keyword)
+    forms.pop("", None)
+    regex = re.compile(r"(?<!\w)(?=(" + _trie_pattern_10(forms) + "))")
+
+    def match(text):
+        found = []
+        for m in regex.finditer(_normalize(text or "")):
+            for keyword in forms[m.group(1)]:
+                if keyword not in found:
+                    found.append(keyword)
+        return found
+
+    return match
+
+
+def scorer_10():
+    """Return score(title, org, source) as migration 10 computed it."""
+    match = _matcher_10()
+    priors = sorted(SOURCE_PRIORS.items(), key=lambda item: -len(item[0]))
+
+    def score(title, org, source):
+        in_title = match(title)
+        in_org = [k for k in match(org) if k not in in_title]
+        total = (sum(KEYWORD_WEIGHTS.get(k, 1.0) for k in in_title) * TITLE_WEIGHT
+                 + sum(KEYWORD_WEIGHTS.get(k, 1.0) for k in in_org) * ORG_WEIGHT)
+        prior = next((p for prefix, p in priors if (source or "").startswith(prefix)), 1.0)
+        return round(total * prior, 2)
+
+    return score
+
+
+# 15: title-only signatures, real organisations compared separately ------------
+
+_THRESHOLD_15 = 0.8
+_PLACEHOLDER_ORGS_15 = {"unknown", "n/a", "na", "none", "check listing"}
+
+
+def signature_15(title):
+    """Signature over a tender's title words only."""
+    return _minhash_5(_words_5(title))
+
+
+def organization_15(org, source):
+    """Words of a real organisation, or None for a placeholder."""
+    if not org or _normalize(org) in _PLACEHOLDER_ORGS_15:
+        return None
+    org_words, source_words = _words_5(org), _words_5(source)
+    if not org_words or org_words <= source_words or (source_words and source_words <= org_words):
+        return None
+    return frozenset(org_words)
+
+
+def is_duplicate_15(sig, title, org, other_sig, other_title, other_org):
+    """True if two tenders are near-duplicates; org and other_org are organization_15() results."""
+    score = sum(x == y for x, y in zip(sig, other_sig)) / _NUM_PERM_5
+    numbers = {w for w in _words_5(title) if w.isdigit()}
+    other_numbers = {w for w in _words_5(other_title) if w.isdigit()}
+    if org is None and other_org is None:
+        return False
+    same_org = org is None or other_org is None or org <= other_org or other_org <= org
+    return score >= _THRESHOLD_15 and numbers == other_numbers and same_org
+
+
+# 18: numbers compared in order -------------------------------------------------
+
+def numbers_18(title):
+    """The numbers in a title, in order of appearance."""
+    return [w for w in re.findall(r"\w+", _normalize(title or "")) if w.isdigit()]
+
+
+# 19: BrighterMonday ids must mix letters and digits ------------------------------
+
+_SITE_IDS_19 = [
+    (re.compile(r"jobinrwanda\.com$"), re.compile(r"^/job/(?P<id>[^/]+)"), "{host}/job/{id}"),
+    (re.compile(r"brightermonday\.co\.(ke|ug|tz)$"),
+     re.compile(r"^/listings/(?:.*-)?(?P<id>(?=[a-z]*\d)(?=\d*[a-z])[a-z0-9]{4,})$"), "{host}/listings/{id}"),
+    (re.compile(r"devex\.com$"), re.compile(r"^/(?P<kind>jobs|funding)/(?:.*-)?(?P<id>\d+)$"), "{host}/{kind}/{id}"),
+    (re.compile(r"reliefweb\.int$"), re.compile(r"^/(?P<kind>job|report|training)/(?P<id>\d+)"), "{host}/{kind}/{id}"),
+]
+
+
+def canonical_key_19(url):
+    url = (url or "").strip()
+    parts = urlsplit(url)
+    if parts.scheme.lower() not in _DEFAULT_PORTS_4 or not parts.hostname:
+        return url
+
+    host = _host_4(parts)
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/")
+    for host_pattern, path_pattern, key in _SITE_IDS_19:
+        if host_pattern.search(host):
+            m = path_pattern.match(path)
+            if m:
+                return key.format(host=host, **m.groupdict())
+
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if k.lower() not in _TRACKING_PARAMS_4 and not k.lower().startswith("utm_")))
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+def link_hash_19(link):
+    digest = hashlib.blake2b(canonical_key_19(link).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
@@ -0,0 +1,161 @@
+"""
+Lightweight timing and counters for radar runs.
+
+Code paths worth watching are wrapped in span(name), which adds the time
+spent to a per-name total; count(name) bumps a counter. Both are a couple
+of dict updates under a lock, cheap enough for per-page and per-title
+paths and safe to use from the scraper threads. Names are dotted, most
+general first ("fetch.JobInRwanda", "parse.Devex", "step.save"). Spans of
+work that runs concurrently can add up to more than the wall time.
+
+Time spent on each scraper URL is also kept per URL (add_url(): download
+and parse of every page), so one slow category or search page stands out
+from the per-source totals; summary() lists the URLs slowest first and
+report() prints the slowest SLOWEST_URLS.
+
+Parse worker processes keep their own figures; they send snapshot() back
+with their results and the parent merge()s them.
+
+At the end of a scan radar.py prints report(), stores summary() in the
+runs table and writes it to last_run.json.
+
+Usage:
+    import instrument
+    with instrument.span("fetch.JobInRwanda"):
+        ...
+    instrument.count("pages.unchanged")
+    instrument.add_url("https://...", "fetch", 0.42)
+    instrument.summary()   # -> JSON-serialisable dict
+"""
+
+import json
+import threading
+import time
+
+# URLs printed by report()
+SLOWEST_URLS = 5
+
+_spans = {}     # name -> [count, total seconds, max seconds]
+_counters = {}
+_urls = {}      # URL -> {stage: seconds}
+_lock = threading.Lock()
+_clock = time.perf_counter
+_started = time.perf_counter()
+_started_at = time.time()
+
+
+def reset():
+    """Start a new run: forget all spans and counters."""
+    global _started, _started_at
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _urls.clear()
+        _started = time.perf_counter()
+        _started_at = time.time()
+
+
+def add(name, seconds, calls=1):
+    """Record seconds spent in name (for durations measured elsewhere)."""
+    with _lock:
+        entry = _spans.get(name)
+        if entry is None:
+            _spans[name] = [calls, seconds, seconds]
+        else:
+            entry[0] += calls
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+
+
+class span:
+    """Context manager timing the enclosed block under name."""
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = _clock()
+        return self
+
+    def __exit__(self, *exc):
+        add(self.name, _clock() - self.start)
+
+
+def add_url(url, stage, seconds):
+    """Record seconds spent on one URL in stage ("fetch", "wait" or "parse")."""
+    with _lock:
+        stages = _urls.get(url)
+        if stages is None:
+            stages = _urls[url] = {}
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+
+def count(name, n=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def snapshot():
+    """Raw spans, counters and URL timings, for merge() in another process."""
+    with _lock:
+        return {k: list(v) for k, v in _spans.items()}, dict(_counters), {k: dict(v) for k, v in _urls.items()}
+
+
+def merge(snap):
+    """Add a snapshot() taken in a worker process."""
+    spans, counters, urls = snap
+    with _lock:
+        for name, (calls, total, longest) in spans.items():
+            entry = _spans.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += calls
+            entry[1] += total
+            entry[2] = max(entry[2], longest)
+        for name, n in counters.items():
+            _counters[name] = _counters.get(name, 0) + n
+        for url, stages in urls.items():
+            entry = _urls.setdefault(url, {})
+            for stage, seconds in stages.items():
+                entry[stage] = entry.get(stage, 0.0) + seconds
+
+
+def summary():
+    """The run so far as a JSON-serialisable dict."""
+    with _lock:
+        return {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(_started_at)),
+            "duration": round(time.perf_counter() - _started, 4),
+            "spans": {name: {"count": calls, "total": round(total, 4), "max": round(longest, 4)}
+                      for name, (calls, total, longest) in sorted(_spans.items())},
+            "counters": dict(sorted(_counters.items())),
+            "urls": {url: dict({stage: round(seconds, 4) for stage, seconds in sorted(stages.items())},
+                               total=round(sum(stages.values()), 4))
+                     for url, stages in sorted(_urls.items(), key=lambda item: -sum(item[1].values()))},
+        }
+
+
+def write(path, data=None):
+    """Write summary() (or data) to path as JSON."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data or summary(), f, indent=2)
+        f.write("\n")
+
+
+def report(data=None):
+    """Print spans (longest total first) and counters."""
+    data = data or summary()
+    print(f"[Timing] Run took {data['duration']:.2f}s")
+    spans = sorted(data["spans"].items(), key=lambda item: -item[1]["total"])
+    for name, s in spans:
+        calls = f" ({s['count']} calls, max {s['max'] * 1000:.1f} ms)" if s["count"] > 1 else ""
+        print(f"[Timing]   {name:<32} {s['total']:8.3f}s{calls}")
+    urls = [(url, stages) for url, stages in data.get("urls", {}).items() if stages["total"] > 0][:SLOWEST_URLS]
+    if urls:
+        print("[Timing] Slowest URLs:")
+        for url, stages in urls:
+            detail = ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in stages.items() if stage != "total")
+            print(f"[Timing]   {stages['total']:8.3f}s  {url} ({detail})")
+    if data["counters"]:
+        print("[Timing] " + ", ".join(f"{name}={n}" for name, n in data["counters"].items()))
@@ -0,0 +1,79 @@
+"""
+In-memory index of the links already stored in tenders.db.
+
+Every stored link has a 64-bit hash (tenders.link_hash). The index keeps
+those hashes in a sorted array of machine integers, 8 bytes per link, so a
+few hundred thousand historical links cost a few MB. The array is saved as
+one packed blob (the link_index table) whenever new rows are saved, so
+loading it is a single read plus the rows added since: milliseconds, where
+reading every row back would take a few hundred.
+
+A lookup that misses the index is definitely new and never touches the
+database. A hit is confirmed with an exact query on the link, so a hash
+collision can never hide a new tender.
+
+Usage:
+    import linkindex
+    linkindex.known(["https://..."])   # -> set of links already stored
+    linkindex.save()                   # after inserting new rows
+"""
+
+import threading
+from array import array
+from bisect import bisect_left, insort
+
+import db
+
+# Above this many rows newer than the snapshot, re-sort instead of inserting one by one
+RESORT_AFTER = 1000
+
+_hashes = None
+_max_id = 0
+_stale = False
+_lock = threading.Lock()
+
+
+def load():
+    """(Re)build the index from the stored snapshot plus any newer rows."""
+    global _hashes, _max_id, _stale
+    snapshot_id, packed = db.load_link_snapshot()
+    hashes = array("q")
+    hashes.frombytes(packed)
+    max_id, newer = db.link_hashes(after_id=snapshot_id)
+    if len(newer) > RESORT_AFTER:
+        hashes = array("q", sorted(hashes.tolist() + newer))
+    else:
+        for h in newer:
+            insort(hashes, h)
+    with _lock:
+        _hashes = hashes
+        _max_id = max_id
+        _stale = max_id != snapshot_id
+
+
+def save():
+    """Store the index as a snapshot if rows were added since the last one."""
+    load()
+    if _stale:
+        db.save_link_snapshot(_max_id, _hashes.tobytes())
+
+
+def reset():
+    """Forget the loaded index; the next lookup reloads it."""
+    global _hashes
+    with _lock:
+        _hashes = None
+
+
+def _contains(h):
+    i = bisect_left(_hashes, h)
+    return i < len(_hashes) and _hashes[i] == h
+
+
+def known(links):
+    """Return the subset of links already stored (exact)."""
+    if _hashes is None:
+        load()
+    with _lock:
+        candidates = [link for link in links if _contains(db.link_hash(link))]
+    return db.known_links(candidates) if candidates else set()
@@ -0,0 +1,117 @@
+"""
+Keyword matcher shared by all scrapers.
+
+The keyword list (plus synonyms and translations) is compiled once into a
+single regex shaped like a trie, so matching a title costs roughly one
+pass over the title no matter how many keywords there are. Titles and
+keywords are case-folded and accent-stripped before matching, so
+"Développeur Web" matches "developpeur web". A keyword must start at a
+word boundary ("coding" does not match "decoding") but may be followed by
+more letters ("programmer" matches "programmers").
+
+Inside a tally() block, match() also counts the titles it checks and how
+many matched, for the per-source match rate (metrics.py).
+
+Usage:
+    from matcher import match
+    match("Senior Web Developer")   # -> ["web developer"]
+"""
+
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+from contextlib import contextmanager
+
+import instrument
+from config import KEYWORDS, KEYWORD_SYNONYMS
+
+
+def normalize(text):
+    """Case-fold, strip accents and collapse whitespace."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.split())
+
+
+def _trie_pattern(terms):
+    """Build a regex alternation that shares common prefixes between terms."""
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node):
+        end = node.get("", False)
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            body = "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class Matcher:
+    """Compiled multi-keyword matcher; match() returns the keywords found."""
+
+    def __init__(self, keywords, synonyms=None):
+        # Every surface form maps back to the keyword(s) it stands for
+        self._keywords = {}
+        for keyword in keywords:
+            self._keywords.setdefault(normalize(keyword), []).append(keyword)
+        for keyword, variants in (synonyms or {}).items():
+            for variant in variants:
+                self._keywords.setdefault(normalize(variant), []).append(keyword)
+        self._keywords.pop("", None)
+
+        # The lookahead reports a match at every word start, so overlapping
+        # keywords ("mobile app development" / "app development") are all found
+        self._regex = re.compile(r"(?<!\w)(?=(" + _trie_pattern(self._keywords) + "))")
+        self.fingerprint = hashlib.sha256(
+            json.dumps([self._regex.pattern, sorted(self._keywords.items())]).encode()
+        ).hexdigest()[:16]
+
+    def match(self, text):
+        """Return the distinct keywords found in text, in order of appearance."""
+        if not text:
+            return []
+        found = []
+        for m in self._regex.finditer(normalize(text)):
+            for keyword in self._keywords[m.group(1)]:
+                if keyword not in found:
+                    found.append(keyword)
+        return found
+
+
+_default = Matcher(KEYWORDS, KEYWORD_SYNONYMS)
+FINGERPRINT = _default.fingerprint
+
+
+_tally = threading.local()
+
+
+def match(text):
+    """Return the config.KEYWORDS entries found in text (empty list if none)."""
+    with instrument.span("match"):
+        found = _default.match(text)
+    counts = getattr(_tally, "counts", None)
+    if counts is not None:
+        counts[0] += 1
+        counts[1] += bool(found)
+    return found
+
+
+@contextmanager
+def tally():
+    """Count match() calls in this thread; yields [titles checked, titles matched]."""
+    counts = _tally.counts = [0, 0]
+    try:
+        yield counts
+    finally:
+        _tally.counts = None
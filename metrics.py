@@ -0,0 +1,200 @@
+"""
+Per-source run metrics for dashboards and alerts.
+
+While a scan runs, the scrapers, radar.save_tenders() and
+emailer.send_email() feed a few figures per source into this module:
+pages fetched (unchanged, failed), fetch latency (time until the response
+headers arrive, so rate-limit waits and retries' backoff are left out),
+titles checked against the keywords and how many matched, tenders stored
+as new or as near-duplicates, and whether the digest email went out. Each
+update is a few integer additions under a lock; latencies are kept as a
+plain list per source, since a run makes at most a few hundred requests.
+
+At the end of the scan radar.py:
+    - writes a Prometheus text-format snapshot to METRICS_TEXTFILE (for
+      node_exporter's textfile collector) and/or pushes it to the
+      Pushgateway at METRICS_PUSHGATEWAY,
+    - stores one row per source in the run_metrics table, next to the
+      run's timings in runs. db.metric_history() rolls them up per day
+      (radar.py --history).
+
+Sources are the scraper NAMEs; a stored tender is counted under the
+scraper whose name its source starts with ("Devex Funding" -> "Devex").
+
+Usage:
+    import metrics
+    metrics.observe_fetch("JobInRwanda", 0.42, "ok")
+    metrics.write_textfile("/var/lib/node_exporter/textfile_collector/radar.prom", metrics.prometheus())
+"""
+
+import os
+import threading
+import time
+
+import requests
+
+COUNTS = ("pages", "unchanged", "errors", "checked", "matched", "new", "duplicates")
+QUANTILES = (0.5, 0.9, 0.99)
+
+PUSH_JOB = "kamagram_radar"
+
+_sources = {}   # name -> {count name: int, "latency": [seconds]}
+_email = None   # (status, tenders) once send_email() has run
+_started_at = time.time()
+_lock = threading.Lock()
+
+
+def reset():
+    """Start a new run."""
+    global _email, _started_at
+    with _lock:
+        _sources.clear()
+        _email = None
+        _started_at = time.time()
+
+
+def _source(name):
+    entry = _sources.get(name)
+    if entry is None:
+        entry = _sources[name] = dict.fromkeys(COUNTS, 0)
+        entry["latency"] = []
+    return entry
+
+
+def add(source, **counts):
+    """Add to a source's counts, e.g. add("Devex", checked=40, matched=3)."""
+    with _lock:
+        entry = _source(source)
+        for name, n in counts.items():
+            entry[name] += n
+
+
+def observe_fetch(source, seconds, status):
+    """Record one page download; status is "ok", "unchanged" or "error", seconds None if no response came."""
+    with _lock:
+        entry = _source(source)
+        entry["pages"] += 1
+        if status != "ok":
+            entry["unchanged" if status == "unchanged" else "errors"] += 1
+        if seconds is not None:
+            entry["latency"].append(seconds)
+
+
+def saved(tenders):
+    """Count stored tenders (db.insert_tenders() results) as new or duplicate per source."""
+    with _lock:
+        names = sorted(_sources, key=len, reverse=True)
+        for t in tenders:
+            source = next((name for name in names if t["source"].startswith(name)), t["source"])
+            _source(source)["duplicates" if t["duplicate_of"] else "new"] += 1
+
+
+def email(status, tenders):
+    """Record the digest result: status is "sent", "failed" or "skipped"."""
+    global _email
+    with _lock:
+        _email = (status, tenders)
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of values (None if empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
+
+
+def snapshot():
+    """The run so far: {"started_at", "sources": {name: counts + latency figures}, "email"}."""
+    with _lock:
+        sources = {}
+        for name, entry in sorted(_sources.items()):
+            figures = {count: entry[count] for count in COUNTS}
+            latency = entry["latency"]
+            for q in QUANTILES:
+                figures[f"fetch_p{round(q * 100)}"] = percentile(latency, q)
+            figures["fetch_seconds"] = sum(latency)
+            figures["fetch_count"] = len(latency)
+            sources[name] = figures
+        return {
+            "started_at": _started_at,
+            "sources": sources,
+            "email": {"status": _email[0], "tenders": _email[1]} if _email else None,
+        }
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _value(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def prometheus(snap=None, duration=None):
+    """Render a snapshot in the Prometheus text exposition format."""
+    snap = snap or snapshot()
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            if value is None:
+                continue
+            label_text = ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+            lines.append(f"{name}{{{label_text}}} {_value(value)}" if label_text else f"{name} {_value(value)}")
+
+    sources = snap["sources"]
+
+    def per_source(key):
+        return [({"source": name}, figures[key]) for name, figures in sources.items()]
+
+    metric("radar_last_run_timestamp_seconds", "gauge", "Start of the last radar scan (Unix time).",
+           [({}, snap["started_at"])])
+    if duration is not None:
+        metric("radar_run_duration_seconds", "gauge", "Wall time of the last radar scan.", [({}, duration)])
+    metric("radar_pages_fetched", "gauge", "Pages requested in the last scan.", per_source("pages"))
+    metric("radar_pages_unchanged", "gauge", "Pages unchanged since the previous scan (HTTP cache hits).",
+           per_source("unchanged"))
+    metric("radar_fetch_errors", "gauge", "Pages that could not be fetched in the last scan.", per_source("errors"))
+    latency = []
+    for name, figures in sources.items():
+        for q in QUANTILES:
+            latency.append(({"source": name, "quantile": q}, figures[f"fetch_p{round(q * 100)}"]))
+    metric("radar_fetch_latency_seconds", "summary", "Page fetch latency in the last scan.", latency)
+    lines.extend(f'radar_fetch_latency_seconds_sum{{source="{_label(name)}"}} {_value(figures["fetch_seconds"])}'
+                 for name, figures in sources.items())
+    lines.extend(f'radar_fetch_latency_seconds_count{{source="{_label(name)}"}} {figures["fetch_count"]}'
+                 for name, figures in sources.items())
+    metric("radar_titles_checked", "gauge", "Listing titles checked against the keywords in the last scan.",
+           per_source("checked"))
+    metric("radar_listings_matched", "gauge", "Listings matching the keywords in the last scan.",
+           per_source("matched"))
+    metric("radar_match_ratio", "gauge", "Share of checked titles that matched the keywords.",
+           [({"source": name}, figures["matched"] / figures["checked"])
+            for name, figures in sources.items() if figures["checked"]])
+    metric("radar_tenders_new", "gauge", "New tenders stored in the last scan.", per_source("new"))
+    metric("radar_tenders_duplicate", "gauge", "Near-duplicate tenders clustered in the last scan.",
+           per_source("duplicates"))
+    if snap["email"]:
+        metric("radar_email_success", "gauge", "1 if the last digest email was sent, 0 if it failed or was skipped.",
+               [({}, int(snap["email"]["status"] == "sent"))])
+        metric("radar_email_tenders", "gauge", "Tenders in the last digest email.", [({}, snap["email"]["tenders"])])
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path, text):
+    """Write text to path atomically (the textfile collector may read at any time)."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def push(url, text, job=PUSH_JOB):
+    """Replace this job's metrics on a Prometheus Pushgateway."""
+    r = requests.put(f"{url.rstrip('/')}/metrics/job/{job}", data=text.encode("utf-8"),
+                     headers={"Content-Type": "text/plain; version=0.0.4"}, timeout=10)
+    r.raise_for_status()
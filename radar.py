@@ -8,130 +8,447 @@ development opportunities and sends daily email alerts.
 Usage:
     python radar.py              # Run full scan and send email
     python radar.py --dry-run    # Run scan without sending email
-    python radar.py --list       # List all tenders in database
+    python radar.py --list       # List all tenders in database, newest first
+    python radar.py --list --status pending --source JobInRwanda --limit 50
+    python radar.py --list --sort score   # Best-scoring tenders first
+    python radar.py --list --format jsonl > tenders.jsonl   # or --format csv
+    python radar.py --export tenders.parquet --incremental   # or .csv / .jsonl
+    python radar.py --compact    # Archive old sent tenders, VACUUM and ANALYZE
+    python radar.py --workers 8  # Fetch sources and pages concurrently
+    python radar.py --no-cache   # Re-download and re-parse every page
+    python radar.py --parse-procs 4  # Parse big page batches in 4 processes
+    python radar.py --daemon     # Stay up, polling each source on its own interval
+    python radar.py --dry-run --profile  # Save a cProfile of the run to radar.prof
+    python radar.py --history 14 # Per-day, per-source run metrics (also --format jsonl/csv)
+    python radar.py --search "mobile app" --source BrighterMonday --since 2026-01-01
+                                 # Ranked full-text search (--limit/--offset to page)
 """
 
 import argparse
+import csv
+import json
+import os
+import sys
+import time
 from datetime import datetime
 
-from db import init_db, save_tender, get_unsent, mark_sent, get_all_tenders
-from scrapers import jobinrwanda, brightermonday, devex, tenderafrica, reliefweb, google_search
-from config import SOURCES
-from emailer import send_email
+import requests
 
+import daemon
+import export
+import instrument
+import linkindex
+import metrics
+from config import (RETENTION_DAYS, COMPACT_EVERY_DAYS, DIGEST_TOP_N, METRICS_TEXTFILE, METRICS_PUSHGATEWAY,
+                    DAEMON_DIGEST_EVERY)
+from db import (init_db, insert_tenders, get_unsent, mark_sent, iter_tenders, search, LIST_COLUMNS,
+                compact, compaction_due, load_circuits, save_circuits, save_run, save_run_metrics,
+                metric_history, HISTORY_COLUMNS, get_meta, set_meta, DB_NAME, close as close_db)
+import scrapers
+from scrapers import adaptive, client, engine, httpcache, policy
+from scrapers.concurrency import configure as configure_concurrency, map_ordered
+from emailer import send_email, summarize
 
-def run_scrapers():
-    """Run all enabled scrapers and return results."""
-    all_tenders = []
+# Timing/counter summary of the last scan (also kept in the runs table)
+RUN_SUMMARY = os.path.join(os.path.dirname(DB_NAME), "last_run.json")
 
-    if SOURCES.get("jobinrwanda"):
-        print("[Scraper] Fetching from JobInRwanda...")
-        tenders = jobinrwanda.fetch()
-        print(f"[Scraper] Found {len(tenders)} matching tenders from JobInRwanda")
-        all_tenders.extend(tenders)
+# Held by every mode that writes (scans, the daemon, --export, --compact)
+# so only one radar works on the database
+LOCK_NAME = os.path.join(os.path.dirname(DB_NAME), "radar.lock")
 
-    if SOURCES.get("brightermonday"):
-        print("[Scraper] Fetching from BrighterMonday (Kenya, Uganda, Tanzania)...")
-        tenders = brightermonday.fetch()
-        print(f"[Scraper] Found {len(tenders)} matching tenders from BrighterMonday")
-        all_tenders.extend(tenders)
 
-    if SOURCES.get("devex"):
-        print("[Scraper] Fetching from Devex...")
-        tenders = devex.fetch()
-        print(f"[Scraper] Found {len(tenders)} matching tenders from Devex")
-        all_tenders.extend(tenders)
+def _run_scraper(entry):
+    _, module = entry
+    print(f"[Scraper] Fetching from {module.DESCRIPTION}...")
+    with instrument.span(f"source.{module.NAME}"):
+        tenders = module.fetch()
+    print(f"[Scraper] Found {len(tenders)} new matching tenders from {module.NAME}")
+    return tenders
 
-    if SOURCES.get("tenderafrica"):
-        print("[Scraper] Fetching from TenderAfrica...")
-        tenders = tenderafrica.fetch()
-        print(f"[Scraper] Found {len(tenders)} matching tenders from TenderAfrica")
-        all_tenders.extend(tenders)
 
-    if SOURCES.get("reliefweb"):
-        print("[Scraper] Fetching from ReliefWeb...")
-        tenders = reliefweb.fetch()
-        print(f"[Scraper] Found {len(tenders)} matching tenders from ReliefWeb")
-        all_tenders.extend(tenders)
+def run_scrapers(sources=None):
+    """Run the given [(key, module)] scrapers (default: all enabled) and return results."""
+    all_tenders = []
 
-    if SOURCES.get("google_search"):
-        print("[Scraper] Fetching from Google Custom Search...")
-        tenders = google_search.fetch()
-        print(f"[Scraper] Found {len(tenders)} matching tenders from Google")
+    # Sources run concurrently when --workers > 1; results are still
+    # collected in registry order so the output matches a sequential run
+    client.reset_stats()
+    policy.load(load_circuits())
+    for tenders in map_ordered(_run_scraper, sources or scrapers.enabled()):
         all_tenders.extend(tenders)
+    client.print_stats()
+    save_circuits(policy.state())
+    for host, failures, retry_at in policy.open_circuits():
+        print(f"[HTTP] Skipping {host} until {time.strftime('%Y-%m-%d %H:%M', time.localtime(retry_at))} "
+              f"({failures} failed requests in a row)")
 
     return all_tenders
 
 
 def save_tenders(tenders):
-    """Save tenders to database, return count of new ones."""
-    new_count = 0
-    for t in tenders:
-        if save_tender(t):
-            new_count += 1
-            print(f"[DB] New tender saved: {t['title'][:50]}...")
-    return new_count
+    """Save tenders to database in one transaction, return count of new ones."""
+    with instrument.span("db.insert"):
+        stored = insert_tenders(tenders)
+    with instrument.span("db.linkindex"):
+        linkindex.save()
+    new = [t for t in stored if t["duplicate_of"] is None]
+    for t in new:
+        print(f"[DB] New tender saved: {t['title'][:50]}...")
+    duplicates = len(stored) - len(new)
+    metrics.saved(stored)
+    instrument.count("tenders.new", len(new))
+    instrument.count("tenders.duplicates", duplicates)
+    if duplicates:
+        print(f"[DB] {duplicates} near-duplicates of stored tenders clustered, not queued")
+    return len(new)
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Kamagram Tender Radar")
-    parser.add_argument("--dry-run", action="store_true", help="Run without sending email")
-    parser.add_argument("--list", action="store_true", help="List all tenders in database")
-    args = parser.parse_args()
+def print_tender(t):
+    """Print one row of db.LIST_COLUMNS."""
+    status = "DUPLICATE" if t[8] else "SENT" if t[6] else "PENDING"
+    print(f"[{status}] {t[1][:50]}...")
+    print(f"         Source: {t[5]} | Deadline: {t[3]} | Score: {t[10] or 0:.1f}")
+    print(f"         Link: {t[4]}")
+    print()
 
-    print("=" * 60)
-    print("Kamagram Tender Radar")
-    print(f"Run time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("=" * 60)
 
-    # Initialize database
-    init_db()
+def write_rows(rows, fmt):
+    """Write rows of db.LIST_COLUMNS to stdout as they arrive; return (count, last row)."""
+    count, last = 0, None
+    if fmt == "csv":
+        writer = csv.writer(sys.stdout)
+        writer.writerow(LIST_COLUMNS)
+    for t in rows:
+        if fmt == "jsonl":
+            print(json.dumps(dict(zip(LIST_COLUMNS, t)), ensure_ascii=False))
+        elif fmt == "csv":
+            writer.writerow(t)
+        else:
+            print_tender(t)
+        count, last = count + 1, t
+    return count, last
+
+
+def run_list(args):
+    """Stream stored tenders, newest first, a page at a time if --limit is given."""
+    rows = iter_tenders(status=args.status, source=args.source, before=args.before,
+                        limit=args.limit, offset=args.offset, by_score=args.sort == "score")
+    if args.format != "text":
+        write_rows(rows, args.format)
+        return
+    print()
+    count, last = write_rows(rows, args.format)
+    print(f"Tenders listed: {count}")
+    if args.limit and count == args.limit:
+        if args.sort == "score":
+            print(f"More: --offset {args.offset + count}")
+        else:
+            print(f"More: --before {last[0]}")
+
+
+def run_search(args):
+    """Print one page of ranked search results as they are read."""
+    limit = args.limit or 20
+    rows = search(args.search, source=args.source, since=args.since, until=args.until,
+                  limit=limit, offset=args.offset)
+    if args.format != "text":
+        write_rows(rows, args.format)
+        return
+
+    start = time.perf_counter()
+    count = 0
+    print(f"\nSearch: {args.search}\n")
+    for t in rows:
+        count += 1
+        print(f"{args.offset + count:>4}. ", end="")
+        print_tender(t)
+    elapsed = (time.perf_counter() - start) * 1000
+    if not count:
+        print(f"No matching tenders ({elapsed:.0f} ms).")
+        return
+    print(f"Results {args.offset + 1}-{args.offset + count} ({elapsed:.0f} ms)")
+    if count == limit:
+        print(f"More: --offset {args.offset + count}")
+
+
+def run_export(args):
+    """Write the tender history (or, with --incremental, its new rows) to a file."""
+    start = time.perf_counter()
+    try:
+        count, path = export.export(args.export, incremental=args.incremental, since=args.since)
+    except ValueError as e:
+        print(f"[Export] {e}")
+        return
+    new = "new " if args.incremental else ""
+    print(f"[Export] {count} {new}tenders -> {path} ({time.perf_counter() - start:.1f}s)")
 
+
+def run_compact():
+    """Archive old tenders and VACUUM/ANALYZE, reporting the space reclaimed."""
+    print(f"\n[DB] Compacting (archiving sent and expired tenders older than {RETENTION_DAYS} days)...")
+    archived, before, after = compact(RETENTION_DAYS)
+    print(f"[DB] Archived {archived} tenders; {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB "
+          f"({max(0, before - after) / 1e6:.1f} MB reclaimed)")
+
+
+def run(args):
+    """Run one scan (or list/search/export/compact mode) against an initialised database."""
     # List mode
     if args.list:
-        tenders = get_all_tenders()
-        print(f"\nTotal tenders in database: {len(tenders)}\n")
-        for t in tenders:
-            sent_status = "SENT" if t[6] else "PENDING"
-            print(f"[{sent_status}] {t[1][:50]}...")
-            print(f"         Source: {t[5]} | Deadline: {t[3]}")
-            print(f"         Link: {t[4]}")
-            print()
+        run_list(args)
+        return
+
+    # Search mode
+    if args.search is not None:
+        run_search(args)
+        return
+
+    # History mode
+    if args.history is not None:
+        run_history(args)
+        return
+
+    # The other modes write to the database: not while another radar does
+    try:
+        with daemon.instance_lock(LOCK_NAME):
+            if args.export:
+                run_export(args)
+            elif args.compact:
+                run_compact()
+            elif args.daemon:
+                run_daemon(args)
+            else:
+                scan(args)
+    except daemon.AlreadyRunning as e:
+        print(f"[Radar] Not starting: {e}")
+        sys.exit(1)
+
+
+def scan(args, sources=None, digest=True):
+    """One recorded scan of sources (default: all enabled); returns True if a digest went out."""
+    instrument.reset()
+    metrics.reset()
+    sent = run_scan(args, sources, digest)
+
+    # Periodic housekeeping keeps the working set small; a dry run skips it,
+    # as compaction archives rows and rewrites the database file
+    if not args.dry_run and compaction_due(COMPACT_EVERY_DAYS):
+        with instrument.span("step.compact"):
+            run_compact()
+
+    mode = "dry-run" if args.dry_run else "scan"
+    record_run(f"daemon {mode}" if args.daemon else mode)
+    return sent
+
+
+def run_daemon(args):
+    """Poll every enabled source on its own interval until stopped."""
+    adaptive.configure(enabled=True)
+    sources = dict(scrapers.enabled())
+    settings = {key: engine.source_settings(key) for key in sources}
+    print(f"\n[Daemon] Started (pid {os.getpid()}); digest at most every {DAEMON_DIGEST_EVERY} min")
+    for key, module in sources.items():
+        print(f"[Daemon]   {module.NAME}: every {settings[key]['interval']}-{settings[key]['max_interval']} min "
+              f"per page, depending on how often it changes")
+
+    def poll(keys):
+        print(f"\n[Daemon] {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} polling "
+              f"{', '.join(sources[key].NAME for key in keys)}")
+        last_digest = float(get_meta("digest_at", 0))
+        digest = time.time() - last_digest >= DAEMON_DIGEST_EVERY * 60
+        if scan(args, [(key, sources[key]) for key in keys], digest):
+            set_meta("digest_at", time.time())
+        return {key: adaptive.next_poll(sources[key]) for key in keys}
+
+    daemon.serve(poll, {key: s["interval"] * 60 for key, s in settings.items()})
+
+
+def record_run(mode):
+    """Print the run's timings, store them and its metrics, and export the metrics."""
+    summary = instrument.summary()
+    summary["mode"] = mode
+    print()
+    instrument.report(summary)
+    summary["run_id"] = save_run(summary)
+    instrument.write(RUN_SUMMARY, summary)
+    print(f"[Timing] Summary saved to {RUN_SUMMARY} (run {summary['run_id']})")
+
+    snap = metrics.snapshot()
+    save_run_metrics(summary["run_id"], snap)
+    if METRICS_TEXTFILE or METRICS_PUSHGATEWAY:
+        text = metrics.prometheus(snap, duration=summary["duration"])
+        if METRICS_TEXTFILE:
+            metrics.write_textfile(METRICS_TEXTFILE, text)
+            print(f"[Metrics] Written to {METRICS_TEXTFILE}")
+        if METRICS_PUSHGATEWAY:
+            try:
+                metrics.push(METRICS_PUSHGATEWAY, text)
+                print(f"[Metrics] Pushed to {METRICS_PUSHGATEWAY}")
+            except requests.RequestException as e:
+                print(f"[Metrics] Push to {METRICS_PUSHGATEWAY} failed: {e}")
+
+
+def run_history(args):
+    """Print per-day, per-source run metrics for the last args.history days."""
+    rows = metric_history(args.history)
+    if args.format == "jsonl":
+        for row in rows:
+            print(json.dumps(dict(zip(HISTORY_COLUMNS, row))))
+        return
+    if args.format == "csv":
+        writer = csv.writer(sys.stdout)
+        writer.writerow(HISTORY_COLUMNS)
+        writer.writerows(rows)
         return
 
+    print(f"\nRun history, last {args.history} days\n")
+    print(f"{'Day':<10}  {'Source':<16} {'Runs':>4} {'Pages':>6} {'Errors':>6} {'Match':>6} "
+          f"{'New':>5} {'Dups':>5} {'p50 s':>6} {'p99 s':>6}")
+    for row in rows:
+        r = dict(zip(HISTORY_COLUMNS, row))
+        match_rate = f"{r['match_rate']:.1%}" if r["match_rate"] is not None else "-"
+        p50 = f"{r['fetch_p50']:.2f}" if r["fetch_p50"] is not None else "-"
+        p99 = f"{r['fetch_p99']:.2f}" if r["fetch_p99"] is not None else "-"
+        print(f"{r['day']:<10}  {r['source'][:16]:<16} {r['runs']:>4} {r['pages']:>6} {r['errors']:>6} "
+              f"{match_rate:>6} {r['new']:>5} {r['duplicates']:>5} {p50:>6} {p99:>6}")
+    if not rows:
+        print("No runs recorded.")
+
+
+def run_scan(args, sources=None, digest=True):
+    """Scrape, save, and (with digest) email the unsent tenders; return True if a digest went out."""
     # Run scrapers
     print("\n[Step 1] Running scrapers...")
-    tenders = run_scrapers()
+    with instrument.span("step.scrape"):
+        tenders = run_scrapers(sources)
+    instrument.count("tenders.found", len(tenders))
     print(f"Total tenders found: {len(tenders)}")
 
     # Save to database
     print("\n[Step 2] Saving to database...")
-    new_count = save_tenders(tenders)
+    with instrument.span("step.save"):
+        new_count = save_tenders(tenders)
     print(f"New tenders saved: {new_count}")
 
+    if not digest:
+        print("\n[Done] Next digest not due yet.")
+        return False
+
     # Get unsent tenders
     print("\n[Step 3] Checking for unsent tenders...")
-    unsent = get_unsent()
+    with instrument.span("step.unsent"):
+        unsent = get_unsent()
+    instrument.count("tenders.unsent", len(unsent))
     print(f"Unsent tenders: {len(unsent)}")
 
     if not unsent:
         print("\n[Done] No new tenders to send.")
-        return
+        return False
 
     # Send email
+    sent = True
     if args.dry_run:
         print("\n[Dry Run] Would send email with these tenders:")
-        for t in unsent:
-            print(f"  - {t[1]}")
+        for t in unsent[:DIGEST_TOP_N]:
+            print(f"  - [{t[6]:.1f}] {t[1]}")
+        for entry in summarize(unsent[DIGEST_TOP_N:]):
+            print(f"  + {entry['count']} more from {entry['source']}")
     else:
         print("\n[Step 4] Sending email...")
-        if send_email(unsent):
-            mark_sent([t[0] for t in unsent])
-            print(f"[Done] Email sent with {len(unsent)} tenders.")
+        with instrument.span("step.email"):
+            sent = send_email(unsent)
+        instrument.count("email.sent" if sent else "email.failed")
+        if sent:
+            # Only the tenders the digest lists; the rest stay in the queue
+            listed = unsent[:DIGEST_TOP_N]
+            mark_sent([t[0] for t in listed])
+            print(f"[Done] Email sent listing {len(listed)} of {len(unsent)} tenders.")
         else:
             print("[Done] Email not sent (check SMTP settings).")
 
     print("\n" + "=" * 60)
+    return sent
+
+
+def run_profiled(args):
+    """run(args) under cProfile; saves the stats and prints the top functions."""
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(run, args)
+    finally:
+        profiler.dump_stats(args.profile)
+        print(f"\n[Profile] Top functions by cumulative time (full stats: python -m pstats {args.profile})")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kamagram Tender Radar")
+    parser.add_argument("--dry-run", action="store_true", help="Run without sending email")
+    parser.add_argument("--list", action="store_true", help="List all tenders in database")
+    parser.add_argument("--workers", type=int, metavar="N",
+                        help="Fetch sources and pages concurrently with up to N requests in flight")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the HTTP cache and re-parse every page")
+    parser.add_argument("--parse-procs", type=int, metavar="N",
+                        help="Parse large page batches in N worker processes")
+    parser.add_argument("--search", metavar="QUERY", help="Search stored tenders by title, organization and source")
+    parser.add_argument("--source", help="With --list/--search: only sources whose name starts with this")
+    parser.add_argument("--since", metavar="YYYY-MM-DD",
+                        help="With --search/--export: only tenders added on or after this date")
+    parser.add_argument("--until", metavar="YYYY-MM-DD", help="With --search: only tenders added on or before this date")
+    parser.add_argument("--status", choices=["sent", "pending"], help="With --list: only sent or pending tenders")
+    parser.add_argument("--limit", type=int, metavar="N",
+                        help="Rows per page (default: all for --list, 20 for --search)")
+    parser.add_argument("--offset", type=int, default=0, metavar="N", help="Skip the first N rows")
+    parser.add_argument("--before", type=int, metavar="ID", help="With --list: continue after the last id shown")
+    parser.add_argument("--sort", choices=["newest", "score"], default="newest",
+                        help="With --list: newest first (default) or best score first")
+    parser.add_argument("--format", choices=["text", "jsonl", "csv"], default="text",
+                        help="Output format for --list/--search/--history (default: text)")
+    parser.add_argument("--export", metavar="FILE",
+                        help="Export the tender history to FILE (.csv, .jsonl or .parquet)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="With --export: only write tenders added since the last export to FILE")
+    parser.add_argument("--compact", action="store_true",
+                        help="Archive old sent tenders, then VACUUM and ANALYZE the database")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Keep running, polling each source every SOURCES interval minutes (stop with SIGTERM)")
+    parser.add_argument("--history", type=int, nargs="?", const=30, metavar="DAYS",
+                        help="Show per-day, per-source run metrics for the last DAYS days (default: 30)")
+    parser.add_argument("--profile", nargs="?", const="radar.prof", metavar="FILE",
+                        help="Profile the run with cProfile and save the stats to FILE (default: radar.prof); "
+                             "scraper threads started by --workers are not profiled")
+    args = parser.parse_args()
+
+    if args.workers:
+        configure_concurrency(workers=args.workers)
+    if args.no_cache:
+        httpcache.configure(enabled=False)
+    if args.parse_procs:
+        engine.configure(parse_procs=args.parse_procs)
+
+    # jsonl/csv output goes to stdout on its own, so it can be piped
+    if args.format == "text":
+        print("=" * 60)
+        print("Kamagram Tender Radar")
+        print(f"Run time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print("=" * 60)
+
+    # Initialize database and load the seen-link index
+    init_db()
+    linkindex.load()
+    try:
+        if args.profile:
+            run_profiled(args)
+        else:
+            run(args)
+    finally:
+        httpcache.close()
+        engine.close()
+        client.close()
+        close_db()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,36 @@
+"""
+Relevance score for a tender, computed once when it is stored.
+
+Every config.KEYWORDS entry found in the title counts its weight from
+config.KEYWORD_WEIGHTS (1.0 if unlisted) times TITLE_WEIGHT; keywords
+found only in the organisation name count ORG_WEIGHT instead. The sum is
+multiplied by the prior of the source (config.SOURCE_PRIORS, matched by
+the longest name prefix), so a web development tender on TenderAfrica
+outranks an IT officer post on a job board.
+
+Usage:
+    from scoring import score
+    score("Website development for RRA", "Rwanda Revenue Authority", "TenderAfrica")
+"""
+
+from config import KEYWORD_WEIGHTS, TITLE_WEIGHT, ORG_WEIGHT, SOURCE_PRIORS
+from matcher import match
+
+# Longest prefix first, so "Devex Funding" wins over a plain "Devex"
+_PRIORS = sorted(SOURCE_PRIORS.items(), key=lambda item: -len(item[0]))
+
+
+def source_prior(source):
+    for prefix, prior in _PRIORS:
+        if (source or "").startswith(prefix):
+            return prior
+    return 1.0
+
+
+def score(title, org, source):
+    """Return the relevance score (0 when no keyword matches)."""
+    in_title = match(title)
+    in_org = [k for k in match(org) if k not in in_title]
+    total = (sum(KEYWORD_WEIGHTS.get(k, 1.0) for k in in_title) * TITLE_WEIGHT
+             + sum(KEYWORD_WEIGHTS.get(k, 1.0) for k in in_org) * ORG_WEIGHT)
+    return round(total * source_prior(source), 2)
@@ -1 +1,21 @@
 # Scrapers package
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from scrapers import engine, jobinrwanda, brightermonday, devex, tenderafrica, reliefweb, google_search
+
+# config.SOURCES key -> scraper module (see engine.py for the module contract)
+REGISTRY = {
+    "jobinrwanda": jobinrwanda,
+    "brightermonday": brightermonday,
+    "devex": devex,
+    "tenderafrica": tenderafrica,
+    "reliefweb": reliefweb,
+    "google_search": google_search,
+}
+
+
+def enabled():
+    """Return [(name, module)] for every source switched on in config.SOURCES."""
+    return [(name, module) for name, module in REGISTRY.items() if engine.source_settings(name)["enabled"]]
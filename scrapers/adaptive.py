@@ -0,0 +1,113 @@
+"""
+Adaptive polling interval for every seed URL (daemon mode).
+
+Seed URLs (a scraper's urls(): jobinrwanda.CATEGORY_PATHS,
+brightermonday's country x CATEGORY_PATHS, devex.SEARCH_URLS, ...) do not
+change at the same rate: a tenders category gets new posts daily, a
+funding search once a month. Each seed keeps its own interval in the
+url_schedule table, between its source's "interval" and "max_interval"
+(config.SOURCES, minutes), learned from what every poll of it found:
+
+    new listings (links not stored yet)    interval * ADAPTIVE_SPEED_UP
+    page changed (body hash), nothing new  interval kept
+    page unchanged (304 / same body)       interval * ADAPTIVE_SLOW_DOWN
+
+so a busy seed converges on the shortest interval and a quiet one drifts
+to the longest, and one new post is enough to bring it back. When
+enabled, engine.fetch() only crawls the seeds that are due and the daemon
+sleeps until the next one is (next_poll()). A seed whose download failed
+keeps its interval; the circuit breaker (policy.py) handles dead hosts.
+
+Seeds are stored by URL; for scrapers with label() (URLs that carry an
+API key) only the label and a digest of the URL are stored.
+"""
+
+import hashlib
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import db
+from config import ADAPTIVE_SPEED_UP, ADAPTIVE_SLOW_DOWN
+
+_enabled = False
+_seeds = {}     # scraper NAME -> url_schedule keys of its seeds
+_next = {}      # scraper NAME -> time its next seed is due
+_lock = threading.Lock()
+
+
+def configure(enabled=None):
+    """Turn adaptive seed scheduling on (radar.py --daemon) or off."""
+    global _enabled
+    if enabled is not None:
+        _enabled = enabled
+
+
+def enabled():
+    return _enabled
+
+
+def key(scraper, url):
+    """url_schedule key of a seed URL."""
+    if not hasattr(scraper, "label"):
+        return url
+    return f"{scraper.label(url)} #{hashlib.blake2b(url.encode('utf-8'), digest_size=6).hexdigest()}"
+
+
+def bounds(settings):
+    """(shortest, longest) interval in seconds for a source's engine.source_settings()."""
+    shortest = settings["interval"] * 60
+    return shortest, max(shortest, settings["max_interval"] * 60)
+
+
+def due(scraper, seeds, settings, now=None):
+    """Return the seeds whose next poll time has come (all of them the first time)."""
+    now = now or time.time()
+    keys = {url: key(scraper, url) for url in seeds}
+    schedule = db.get_url_schedule(list(keys.values()))
+    ready = [url for url in seeds if keys[url] not in schedule or schedule[keys[url]][1] <= now]
+    with _lock:
+        _seeds[scraper.NAME] = list(keys.values())
+        if not ready:
+            _next[scraper.NAME] = min((next_at for _, next_at, *_ in schedule.values()),
+                                      default=now + bounds(settings)[0])
+    return ready
+
+
+def observe(scraper, results, settings, now=None):
+    """
+    Learn from one poll; results are (seed, changed, new listings) for the
+    seeds that were fetched (changed None if the download failed).
+    """
+    now = now or time.time()
+    shortest, longest = bounds(settings)
+    schedule = db.get_url_schedule([key(scraper, seed) for seed, _, _ in results])
+    rows = []
+    for seed, changed, new in results:
+        interval, _, fetches, changes, new_links = schedule.get(key(scraper, seed), (shortest, 0, 0, 0, 0))
+        if changed is not None:
+            if new:
+                interval *= ADAPTIVE_SPEED_UP
+            elif not changed:
+                interval *= ADAPTIVE_SLOW_DOWN
+            fetches += 1
+            changes += bool(changed or new)
+            new_links += new
+        interval = min(longest, max(shortest, interval))
+        rows.append((key(scraper, seed), interval, now + interval, fetches, changes, new_links))
+    db.save_url_schedule(rows)
+
+    # The source is next polled when its first seed is due
+    with _lock:
+        keys = _seeds.get(scraper.NAME, [])
+    upcoming = db.get_url_schedule(keys)
+    with _lock:
+        _next[scraper.NAME] = min((next_at for _, next_at, *_ in upcoming.values()), default=now + shortest)
+
+
+def next_poll(scraper):
+    """Time (epoch seconds) the source's next seed is due, or None if unknown."""
+    with _lock:
+        return _next.get(scraper.NAME)
@@ -1,11 +1,15 @@
-import requests
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 import sys
 import os
 import re
+from urllib.parse import urlsplit
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from config import KEYWORDS
+from matcher import match
+from scrapers import engine, parsing
+
+NAME = "BrighterMonday"
+DESCRIPTION = "BrighterMonday (Kenya, Uganda, Tanzania)"
 
 # BrighterMonday sites for East Africa
 SITES = {
@@ -22,107 +26,112 @@ CATEGORY_PATHS = [
     "/jobs?q=web+developer",
 ]
 
+# Job cards are found by data-cy attribute; nothing outside them is needed
+# unless the title link wraps the card, which select_cards() then parses
+# the full page for
+CARD_SELECTOR = '[data-cy="listing-cards-components"]'
+STRAINER = SoupStrainer(attrs={"data-cy": "listing-cards-components"})
 
-def fetch():
-    """Fetch IT/software jobs from BrighterMonday East Africa."""
-    results = []
-    seen_links = set()
 
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.5",
-    }
+def _title_link(card):
+    """The card's link to its listing: inside the card, or wrapping it."""
+    return (card.select_one('a[data-cy="listing-title-link"]') or card.select_one('a[href*="/listings/"]')
+            or card.find_parent("a", href=re.compile(r"/listings/")))
+
+
+def urls():
+    """Every country x category page, in country order."""
+    return [base_url + path for base_url in SITES.values() for path in CATEGORY_PATHS]
+
 
+def page_url(url, number):
+    return engine.with_query(url, page=number)
+
+
+def _site_for(url):
+    """Return (country, base_url) of the BrighterMonday site serving url."""
     for country, base_url in SITES.items():
-        country_count = 0
-        for path in CATEGORY_PATHS:
-            url = base_url + path
-            try:
-                r = requests.get(url, timeout=20, headers=headers, allow_redirects=True)
-                if r.status_code != 200:
-                    continue
-
-                soup = BeautifulSoup(r.text, "html.parser")
-
-                # Find job cards by data-cy attribute
-                job_cards = soup.select('[data-cy="listing-cards-components"]')
-
-                for card in job_cards:
-                    try:
-                        # Find the title link
-                        title_link = card.select_one('a[data-cy="listing-title-link"]')
-                        if not title_link:
-                            title_link = card.select_one('a[href*="/listings/"]')
-
-                        if not title_link:
-                            continue
-
-                        href = title_link.get("href", "")
-                        if not href:
-                            continue
-
-                        # Build full link
-                        if href.startswith("/"):
-                            full_link = base_url + href
-                        elif href.startswith("http"):
-                            full_link = href
-                        else:
-                            continue
-
-                        if full_link in seen_links:
-                            continue
-
-                        # Get title text
-                        title_elem = title_link.select_one("p") or title_link
-                        title_text = title_elem.get_text(strip=True)
-
-                        if not title_text:
-                            continue
-
-                        # Check keyword match
-                        title_lower = title_text.lower()
-                        if not any(k.lower() in title_lower for k in KEYWORDS):
-                            continue
-
-                        seen_links.add(full_link)
-
-                        # Get company name
-                        org = f"BrighterMonday {country}"
-                        company_elem = card.select_one('p.text-blue-700, p.text-sm.text-blue-700')
-                        if company_elem:
-                            company_text = company_elem.get_text(strip=True)
-                            if company_text and company_text != title_text:
-                                org = company_text
-
-                        # Get location/deadline info
-                        deadline = "Check listing"
-                        location_elem = card.select_one('span.bg-brand-secondary-100')
-                        if location_elem:
-                            deadline = location_elem.get_text(strip=True)
-
-                        results.append({
-                            "title": title_text[:200],
-                            "org": org,
-                            "deadline": deadline,
-                            "link": full_link,
-                            "source": f"BrighterMonday {country}"
-                        })
-                        country_count += 1
-
-                    except Exception as e:
-                        continue
-
-            except requests.RequestException as e:
-                print(f"[BrighterMonday] Error fetching {url}: {e}")
+        if url.startswith(base_url):
+            return country, base_url
+    parts = urlsplit(url)
+    return "East Africa", f"{parts.scheme}://{parts.netloc}"
+
+
+def parse(html, url):
+    """Extract keyword-matching job cards from a BrighterMonday listing page."""
+    country, base_url = _site_for(url)
+    results = []
+    job_cards = parsing.select_cards(html, CARD_SELECTOR, STRAINER, has_listing=_title_link)
+
+    for card in job_cards:
+        try:
+            # Find the title link
+            title_link = _title_link(card)
+            if not title_link:
+                continue
+
+            href = title_link.get("href", "")
+            if not href:
+                continue
+
+            # Build full link
+            if href.startswith("/"):
+                full_link = base_url + href
+            elif href.startswith("http"):
+                full_link = href
+            else:
+                continue
+
+            # Get title text
+            title_elem = title_link.select_one("p") or title_link
+            title_text = title_elem.get_text(strip=True)
+
+            if not title_text:
+                continue
+
+            # Check keyword match
+            if not match(title_text):
                 continue
 
-        print(f"[BrighterMonday] {country}: {country_count} matches")
+            # Get company name
+            org = f"BrighterMonday {country}"
+            company_elem = card.select_one('p.text-blue-700, p.text-sm.text-blue-700')
+            if company_elem:
+                company_text = company_elem.get_text(strip=True)
+                if company_text and company_text != title_text:
+                    org = company_text
+
+            # Get location/deadline info
+            deadline = "Check listing"
+            location_elem = card.select_one('span.bg-brand-secondary-100')
+            if location_elem:
+                deadline = location_elem.get_text(strip=True)
+
+            results.append({
+                "title": title_text[:200],
+                "org": org,
+                "deadline": deadline,
+                "link": full_link,
+                "source": f"BrighterMonday {country}"
+            })
+
+        except Exception as e:
+            continue
 
-    print(f"[BrighterMonday] Total: {len(results)} matches")
     return results
 
 
+def report(results):
+    for country in SITES:
+        count = sum(1 for t in results if t["source"] == f"BrighterMonday {country}")
+        print(f"[BrighterMonday] {country}: {count} matches")
+
+
+def fetch():
+    """Fetch IT/software jobs from BrighterMonday East Africa."""
+    return engine.fetch(sys.modules[__name__])
+
+
 if __name__ == "__main__":
     tenders = fetch()
     print(f"\nFound {len(tenders)} matching listings:")
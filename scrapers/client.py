@@ -0,0 +1,139 @@
+"""
+Shared HTTP client for all scrapers.
+
+One requests.Session with keep-alive connection pools per host, the common
+browser headers and a single place to set timeouts. Repeated requests to
+the same host reuse an open connection instead of paying a new TCP+TLS
+handshake. Every request goes through the fetch policy (policy.py): per-host
+rate limits, retries with backoff and circuit breakers. stats() reports
+requests, new connections and reused connections per host for the current
+run. request_seconds() is the time the calling thread's last get() spent
+on the network, without the policy's throttle and backoff waits.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from config import HTTP_TIMEOUT, HTTP_CONNECT_TIMEOUT, MAX_WORKERS_PER_HOST
+from scrapers import policy
+from scrapers.concurrency import host_slot
+
+try:
+    import brotli  # noqa: F401  (urllib3 decodes "br" when it is installed)
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": ACCEPT_ENCODING,
+}
+
+# Number of hosts to keep pools for, and connections kept open per host
+POOL_HOSTS = 32
+POOL_SIZE = max(4, MAX_WORKERS_PER_HOST)
+
+_session = None
+_lock = threading.Lock()
+_baseline = {}
+_timing = threading.local()
+
+
+def session():
+    """Return the shared session, creating it on first use."""
+    global _session
+    with _lock:
+        if _session is None:
+            s = requests.Session()
+            s.headers.update(HEADERS)
+            adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_SIZE)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _session = s
+        return _session
+
+
+def get(url, timeout=None, **kwargs):
+    """GET url through the shared session, within the concurrency caps and fetch policy."""
+    timeout = timeout or (HTTP_CONNECT_TIMEOUT, HTTP_TIMEOUT)
+    _timing.seconds = 0.0
+
+    def send():
+        with host_slot(url):
+            start = time.perf_counter()
+            try:
+                return session().get(url, timeout=timeout, **kwargs)
+            finally:
+                _timing.seconds += time.perf_counter() - start
+
+    return policy.call(url, send)
+
+
+def request_seconds():
+    """Seconds the calling thread's last get() spent sending requests (every attempt)."""
+    return getattr(_timing, "seconds", 0.0)
+
+
+def _pool_counters():
+    counters = {}
+    if _session is None:
+        return counters
+    for adapter in set(_session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            counters[pool.host] = (pool.num_requests, pool.num_connections)
+    return counters
+
+
+def reset_stats():
+    """Start a new counting window (e.g. at the start of a run)."""
+    global _baseline
+    _baseline = _pool_counters()
+
+
+def stats():
+    """Return {host: {"requests", "connections", "reused"}} since reset_stats()."""
+    result = {}
+    for host, (requests_made, connections) in _pool_counters().items():
+        base_requests, base_connections = _baseline.get(host, (0, 0))
+        requests_made -= base_requests
+        connections -= base_connections
+        if not requests_made:
+            continue
+        result[host] = {
+            "requests": requests_made,
+            "connections": connections,
+            "reused": max(0, requests_made - connections),
+        }
+    return result
+
+
+def print_stats():
+    per_host = stats()
+    if not per_host:
+        return
+    total_requests = sum(s["requests"] for s in per_host.values())
+    total_connections = sum(s["connections"] for s in per_host.values())
+    print(f"[HTTP] {total_requests} requests, {total_connections} new connections, "
+          f"{total_requests - total_connections} reused")
+    for host, s in sorted(per_host.items()):
+        print(f"[HTTP]   {host}: {s['requests']} requests, {s['connections']} new, {s['reused']} reused")
+
+
+def close():
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,59 @@
+"""
+Concurrency helpers shared by the scrapers.
+
+Sources and the URLs inside each scraper can be fetched in parallel with
+map_ordered(). Network calls are wrapped in host_slot(), which enforces a
+global cap on in-flight requests and a smaller cap per host so a single
+site is never hammered. With MAX_WORKERS = 1 everything runs sequentially,
+exactly like the original scrapers.
+"""
+
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from config import MAX_WORKERS, MAX_WORKERS_PER_HOST
+
+_workers = MAX_WORKERS
+_per_host = MAX_WORKERS_PER_HOST
+_global_slots = threading.BoundedSemaphore(_workers)
+_host_slots = {}
+_lock = threading.Lock()
+
+
+def configure(workers=None, per_host=None):
+    """Override the concurrency caps (e.g. from radar.py --workers)."""
+    global _workers, _per_host, _global_slots
+    with _lock:
+        if workers is not None:
+            _workers = max(1, workers)
+            _global_slots = threading.BoundedSemaphore(_workers)
+        if per_host is not None:
+            _per_host = max(1, per_host)
+        _host_slots.clear()
+
+
+@contextmanager
+def host_slot(url):
+    """Hold one global and one per-host slot for the duration of a request."""
+    host = urlsplit(url).netloc
+    with _lock:
+        global_slots = _global_slots
+        slots = _host_slots.get(host)
+        if slots is None:
+            slots = _host_slots[host] = threading.BoundedSemaphore(_per_host)
+    with global_slots, slots:
+        yield
+
+
+def map_ordered(func, items):
+    """Apply func to every item, in parallel when enabled, keeping input order."""
+    items = list(items)
+    if _workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(_workers, len(items))) as pool:
+        return list(pool.map(func, items))
@@ -0,0 +1,336 @@
+"""
+Shared fetch pipeline for all scrapers.
+
+Every scraper module provides:
+    NAME         display name used in log lines, e.g. "JobInRwanda"
+    DESCRIPTION  what radar.py prints before fetching
+    urls()       the pages to download (may print a reason and return [])
+    parse(body, url) -> listings
+                 pure function: page body in, keyword-matching listing dicts out
+and optionally:
+    CACHEABLE    False for API sources that should bypass the HTTP cache
+    page_url(url, n) -> URL of page n (n >= 2) of a paginated listing
+    label(url)   how to show a URL in log lines (e.g. to hide API keys)
+    report(results)  extra summary lines after a fetch
+
+The pipeline is URL generation -> download -> parse -> merge. Downloads
+run concurrently (see concurrency.py); parse never touches the network, so
+it can be cached, benchmarked or moved to another worker on its own. With
+parse_procs > 1, batches of at least PARSE_POOL_MIN_PAGES pages are parsed
+in a process pool; only (module name, body, url) go to the workers and only
+listing dicts come back. Smaller batches are parsed in-process, where the
+cost of starting workers would outweigh the gain.
+
+Paginated listings are crawled breadth-first, one page number at a time
+across all seed URLs, up to the source's max_pages. A seed stops early when
+its page is unchanged since the last run (HTTP cache hit), when a page only
+repeats listings already seen, or when stop_after_known listings in a row
+are already in the database, so a run fetches only the pages with new items.
+
+Listings are told apart by canonical URL (canonical.py), so the same
+listing reached through two category pages is kept once. Every listing is
+looked up once in the seen-link index (linkindex.py) as its page is
+parsed, and fetch() returns only the listings not stored yet.
+
+In daemon mode (adaptive.py) only the seeds that are due are crawled, and
+what each crawl found (new listings, changed first page) sets when that
+seed is polled next.
+
+Downloads and parses are timed per source with instrument.py
+("fetch.<NAME>", "fetch.<NAME>.wait" for the time until the response
+headers arrive, i.e. DNS, connect and server time, and "parse.<NAME>",
+which includes keyword matching), and per URL (instrument.add_url(),
+under the URL's label()): "fetch" is the time spent on the network,
+"wait" the time queued for a host slot, throttled or backing off before
+retries. Per-source page counts, fetch latencies and match rates also go
+to metrics.py.
+"""
+
+import importlib
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from config import PARSE_PROCS, PARSE_POOL_MIN_PAGES, SOURCES, DAEMON_INTERVAL, ADAPTIVE_MAX_INTERVAL
+import instrument
+import linkindex
+import metrics
+from canonical import canonical_key
+from matcher import tally
+from scrapers import adaptive, client, httpcache
+from scrapers.concurrency import map_ordered
+
+# instrument.py counter for each download outcome
+PAGE_COUNTERS = {"ok": "pages.fetched", "unchanged": "pages.unchanged", "error": "pages.failed"}
+
+# Shorter waits before a download are left out of its per-URL timings
+URL_WAIT_MIN = 0.001
+
+_parse_procs = PARSE_PROCS
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def configure(parse_procs=None):
+    """Set the number of parse worker processes (radar.py --parse-procs)."""
+    global _parse_procs
+    if parse_procs is not None:
+        _parse_procs = max(1, parse_procs)
+
+
+def _process_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: downloads are still running on other threads
+            _pool = ProcessPoolExecutor(max_workers=_parse_procs,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def close():
+    """Shut down the parse pool, if one was started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+def source_settings(key):
+    """Return config.SOURCES[key] with defaults filled in (plain booleans allowed)."""
+    value = SOURCES.get(key, False)
+    if not isinstance(value, dict):
+        value = {"enabled": bool(value)}
+    return {"enabled": False, "max_pages": 1, "stop_after_known": 10, "interval": DAEMON_INTERVAL,
+            "max_interval": ADAPTIVE_MAX_INTERVAL, **value}
+
+
+def with_query(url, **params):
+    """Return url with the given query parameters set (others kept in order)."""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in params]
+    query += [(k, str(v)) for k, v in params.items()]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _label(scraper, url):
+    return scraper.label(url) if hasattr(scraper, "label") else url
+
+
+class Page:
+    """A downloaded page. listings is set when the HTTP cache had it unchanged."""
+
+    def __init__(self, url, response, listings=None):
+        self.url = url
+        self.response = response
+        self.listings = listings
+
+    @property
+    def body(self):
+        return self.response.text
+
+
+def download(scraper, url):
+    """Fetch one page; returns a Page, or None if it could not be fetched."""
+    start = time.perf_counter()
+    try:
+        if getattr(scraper, "CACHEABLE", True):
+            r, cached = httpcache.get(url)
+        else:
+            r, cached = client.get(url), None
+    except requests.RequestException as e:
+        print(f"[{scraper.NAME}] Error fetching {_label(scraper, url)}: {e}")
+        _observe(scraper, url, start, None, "error")
+        return None
+
+    if r.status_code not in (200, 304):
+        print(f"[{scraper.NAME}] {_label(scraper, url)} returned {r.status_code}")
+        _observe(scraper, url, start, r, "error")
+        return None
+    _observe(scraper, url, start, r, "unchanged" if cached is not None else "ok")
+    return Page(url, r, cached)
+
+
+def _observe(scraper, url, start, response, status):
+    seconds = time.perf_counter() - start
+    instrument.add(f"fetch.{scraper.NAME}", seconds)
+    network = min(client.request_seconds(), seconds)
+    instrument.add_url(_label(scraper, url), "fetch", network)
+    if seconds - network >= URL_WAIT_MIN:
+        instrument.add_url(_label(scraper, url), "wait", seconds - network)
+    instrument.count(PAGE_COUNTERS[status])
+    wait = response.elapsed.total_seconds() if response is not None else None
+    if wait is not None:
+        instrument.add(f"fetch.{scraper.NAME}.wait", wait)
+    metrics.observe_fetch(scraper.NAME, wait, status)
+
+
+def _parse_one(job):
+    """(module name, body, url) -> (listings, error, titles checked)."""
+    module_name, body, url = job
+    with tally() as counts:
+        try:
+            module = importlib.import_module(module_name)
+            start = time.perf_counter()
+            try:
+                return module.parse(body, url), None, counts[0]
+            finally:
+                seconds = time.perf_counter() - start
+                instrument.add(f"parse.{module.NAME}", seconds)
+                instrument.add_url(_label(module, url), "parse", seconds)
+        except Exception as e:
+            return [], str(e), counts[0]
+
+
+def _parse_in_worker(job):
+    """Process pool entry point: _parse_one() plus the worker's timings."""
+    instrument.reset()
+    return _parse_one(job) + (instrument.snapshot(),)
+
+
+def parse_all(scraper, pages):
+    """Return listings for every page (None where the download failed)."""
+    results = [page.listings if page else None for page in pages]
+    pending = [i for i, page in enumerate(pages) if page and page.listings is None]
+    if not pending:
+        return results
+
+    jobs = [(scraper.__name__, pages[i].body, pages[i].url) for i in pending]
+    use_pool = (_parse_procs > 1 and len(jobs) >= PARSE_POOL_MIN_PAGES
+                and scraper.__name__ != "__main__")
+    if use_pool:
+        chunksize = max(1, len(jobs) // (_parse_procs * 2))
+        parsed = []
+        for listings, error, checked, timings in _process_pool().map(_parse_in_worker, jobs, chunksize=chunksize):
+            instrument.merge(timings)
+            parsed.append((listings, error, checked))
+    else:
+        parsed = [_parse_one(job) for job in jobs]
+
+    for i, (listings, error, checked) in zip(pending, parsed):
+        page = pages[i]
+        if error:
+            print(f"[{scraper.NAME}] Error parsing {_label(scraper, page.url)}: {error}")
+        elif getattr(scraper, "CACHEABLE", True):
+            httpcache.store(page.url, page.response, listings)
+        results[i] = listings
+        metrics.add(scraper.NAME, checked=checked, matched=len(listings))
+    return results
+
+
+class Crawl:
+    """Listings collected from one seed URL and its following pages."""
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.listings = None  # None until the first page downloads
+        self.keys = set()
+        self.known = set()
+        self.pages = 0
+        self.known_run = 0
+        self.changed = None  # whether the first page changed since the last run
+
+    def add(self, listings, unchanged, stop_after_known):
+        """
+        Record one page; return True if the next page is worth fetching. A
+        page with no listings does not stop the crawl (it may only lack
+        keyword matches); max_pages bounds it.
+        """
+        if self.listings is None:
+            self.listings = []
+            self.changed = not unchanged
+        self.pages += 1
+        new = []
+        for t in listings:
+            key = canonical_key(t["link"])
+            if key not in self.keys:
+                self.keys.add(key)
+                new.append(t)
+        self.listings.extend(new)
+        known = linkindex.known(t["link"] for t in new)
+        self.known |= known
+
+        if unchanged:
+            return False
+        if listings and not new:
+            return False  # the site served a page we have already seen
+        for t in new:
+            self.known_run = self.known_run + 1 if t["link"] in known else 0
+            if self.known_run >= stop_after_known:
+                return False
+        return True
+
+
+def crawl(scraper, seeds, max_pages, stop_after_known):
+    """Fetch every seed URL, following pagination while it keeps finding new listings."""
+    crawls = [Crawl(url) for url in seeds]
+    active = crawls
+    for number in range(1, max_pages + 1):
+        urls = [c.seed if number == 1 else scraper.page_url(c.seed, number) for c in active]
+        pages = map_ordered(lambda url: download(scraper, url), urls)
+        unchanged = [page is not None and page.listings is not None for page in pages]
+        page_listings = parse_all(scraper, pages)
+
+        still_active = []
+        for c, listings, cached in zip(active, page_listings, unchanged):
+            if listings is None:
+                continue
+            if c.add(listings, cached, stop_after_known) and number < max_pages:
+                still_active.append(c)
+        active = still_active
+        if not active:
+            break
+    return crawls
+
+
+def merge(scraper, crawls):
+    """Concatenate listings in seed order, keeping the first copy of each canonical URL."""
+    results = []
+    seen_keys = set()
+    for c in crawls:
+        if c.listings is None:
+            continue
+        for t in c.listings:
+            key = canonical_key(t["link"])
+            if key in seen_keys:
+                continue
+            seen_keys.add(key)
+            results.append(t)
+        pages = f" ({c.pages} pages)" if c.pages > 1 else ""
+        print(f"[{scraper.NAME}] {_label(scraper, c.seed)}: {len(results)} matches total{pages}")
+    return results
+
+
+def fetch(scraper):
+    """Run the whole pipeline for one scraper module and return its new listings."""
+    key = os.path.splitext(os.path.basename(scraper.__file__))[0]
+    settings = source_settings(key)
+    max_pages = settings["max_pages"] if hasattr(scraper, "page_url") else 1
+
+    seeds = scraper.urls()
+    if adaptive.enabled():
+        due = adaptive.due(scraper, seeds, settings)
+        if len(due) < len(seeds):
+            print(f"[{scraper.NAME}] {len(due)} of {len(seeds)} pages due")
+        seeds = due
+
+    crawls = crawl(scraper, seeds, max(1, max_pages), settings["stop_after_known"])
+    results = merge(scraper, crawls)
+    known = set().union(*(c.known for c in crawls))
+    if adaptive.enabled() and crawls:
+        adaptive.observe(scraper, [(c.seed, c.changed, sum(t["link"] not in c.known for t in c.listings or []))
+                                   for c in crawls], settings)
+
+    if hasattr(scraper, "report"):
+        scraper.report(results)
+    new = [t for t in results if t["link"] not in known]
+    print(f"[{scraper.NAME}] Total: {len(results)} matches, {len(new)} new")
+    return new
@@ -11,14 +11,19 @@ Set environment variables:
 - GOOGLE_CSE_ID: Your Custom Search Engine ID
 """
 
+import json
 import os
-import requests
-from datetime import datetime, timedelta
 import sys
+from urllib.parse import parse_qs, urlencode, urlsplit
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from config import KEYWORDS
+from scrapers import engine
 
+NAME = "Google"
+DESCRIPTION = "Google Custom Search"
+CACHEABLE = False  # API responses carry the key; always fetch fresh
+API_URL = "https://www.googleapis.com/customsearch/v1"
 GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY", "")
 GOOGLE_CSE_ID = os.environ.get("GOOGLE_CSE_ID", "")
 
@@ -33,67 +38,72 @@ SITES_TO_SEARCH = [
 ]
 
 
-def fetch():
-    """Use Google Custom Search to find tender opportunities."""
+def urls():
     if not GOOGLE_API_KEY or not GOOGLE_CSE_ID:
         print("[GoogleSearch] API key or CSE ID not set. Skipping.")
         print("[GoogleSearch] Set GOOGLE_API_KEY and GOOGLE_CSE_ID environment variables.")
         return []
 
-    results = []
-
     # Build search query
     keyword_query = " OR ".join([f'"{k}"' for k in KEYWORDS[:5]])  # Limit to avoid query length issues
 
     # Search recent results (last 7 days)
     date_restrict = "d7"  # Last 7 days
 
+    result = []
     for site in SITES_TO_SEARCH:
-        query = f"site:{site} tender ({keyword_query})"
+        params = {
+            "key": GOOGLE_API_KEY,
+            "cx": GOOGLE_CSE_ID,
+            "q": f"site:{site} tender ({keyword_query})",
+            "dateRestrict": date_restrict,
+            "num": 10,
+        }
+        result.append(f"{API_URL}?{urlencode(params)}")
+    return result
+
 
-        try:
-            url = "https://www.googleapis.com/customsearch/v1"
-            params = {
-                "key": GOOGLE_API_KEY,
-                "cx": GOOGLE_CSE_ID,
-                "q": query,
-                "dateRestrict": date_restrict,
-                "num": 10,
-            }
+def _site(url):
+    return parse_qs(urlsplit(url).query)["q"][0].split()[0][len("site:"):]
 
-            r = requests.get(url, params=params, timeout=15)
 
-            if r.status_code != 200:
-                print(f"[GoogleSearch] API error for {site}: {r.status_code}")
-                continue
+def label(url):
+    return _site(url)
 
-            data = r.json()
-            items = data.get("items", [])
 
-            for item in items:
-                title = item.get("title", "")
-                link = item.get("link", "")
-                snippet = item.get("snippet", "")
+def parse(body, url):
+    """Turn one site-restricted search response into listings."""
+    results = []
+    site = _site(url)
 
-                # Extract date from snippet if possible
-                deadline = "Check listing"
+    data = json.loads(body)
+    items = data.get("items", [])
 
-                results.append({
-                    "title": title,
-                    "org": site,
-                    "deadline": deadline,
-                    "link": link,
-                    "source": f"Google ({site})"
-                })
+    for item in items:
+        title = item.get("title", "")
+        link = item.get("link", "")
+        snippet = item.get("snippet", "")
 
-            print(f"[GoogleSearch] {site}: Found {len(items)} results")
+        # Extract date from snippet if possible
+        deadline = "Check listing"
 
-        except Exception as e:
-            print(f"[GoogleSearch] Error searching {site}: {e}")
+        results.append({
+            "title": title,
+            "org": site,
+            "deadline": deadline,
+            "link": link,
+            "source": f"Google ({site})"
+        })
 
+    print(f"[GoogleSearch] {site}: Found {len(items)} results")
     return results
 
 
+def fetch():
+    """Use Google Custom Search to find tender opportunities."""
+    return engine.fetch(sys.modules[__name__])
+
+
 if __name__ == "__main__":
     tenders = fetch()
     print(f"\nFound {len(tenders)} total results")
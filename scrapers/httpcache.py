@@ -0,0 +1,146 @@
+"""
+On-disk HTTP cache for listing pages (http_cache.db, next to tenders.db).
+
+For every URL we keep the ETag / Last-Modified validators, a hash of the
+body and the listings parsed from it. The next request is sent as a
+conditional GET; on a 304, or when the body hash is unchanged, the stored
+listings are returned and the page is not parsed again. Entries are keyed
+to the keyword matcher, so editing config.KEYWORDS invalidates them, and the
+least recently used entries are evicted once the cache grows past
+HTTP_CACHE_MAX_BYTES.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from config import HTTP_CACHE_MAX_BYTES
+from db import DB_NAME
+import matcher
+from scrapers import client
+
+CACHE_NAME = os.path.join(os.path.dirname(DB_NAME), "http_cache.db")
+
+# Changes whenever the keyword filter changes, so cached listings stay valid
+FINGERPRINT = matcher.FINGERPRINT
+
+_enabled = True
+_conn = None
+_lock = threading.Lock()
+
+
+def configure(enabled=True):
+    """Enable or disable the cache (radar.py --no-cache)."""
+    global _enabled
+    _enabled = enabled
+
+
+def _connection():
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(CACHE_NAME, check_same_thread=False)
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT,
+                fingerprint TEXT,
+                listings TEXT,
+                size INTEGER,
+                accessed_at REAL
+            )
+        """)
+        _conn.commit()
+    return _conn
+
+
+def _lookup(url):
+    with _lock:
+        row = _connection().execute(
+            "SELECT etag, last_modified, body_hash, listings FROM http_cache WHERE url = ? AND fingerprint = ?",
+            (url, FINGERPRINT),
+        ).fetchone()
+    return row
+
+
+def get(url, **kwargs):
+    """
+    Conditional GET through the shared client.
+
+    Returns (response, listings). listings is the cached parse result when
+    the page is unchanged (304 or identical body), otherwise None and the
+    caller should parse response.text and call store().
+    """
+    if not _enabled:
+        return client.get(url, **kwargs), None
+
+    entry = _lookup(url)
+    headers = dict(kwargs.pop("headers", None) or {})
+    if entry:
+        etag, last_modified, _, _ = entry
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    r = client.get(url, headers=headers, **kwargs)
+
+    if not entry or r.status_code not in (200, 304):
+        return r, None
+
+    _, _, body_hash, listings = entry
+    if r.status_code == 200 and hashlib.sha256(r.content).hexdigest() != body_hash:
+        return r, None
+
+    with _lock:
+        conn = _connection()
+        conn.execute("UPDATE http_cache SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        conn.commit()
+    return r, json.loads(listings)
+
+
+def store(url, response, listings):
+    """Remember the validators, body hash and parsed listings for url."""
+    if not _enabled or response.status_code != 200:
+        return
+
+    payload = json.dumps(listings)
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    size = len(url) + len(payload) + len(etag or "") + len(last_modified or "")
+
+    with _lock:
+        conn = _connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO http_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (url, etag, last_modified, hashlib.sha256(response.content).hexdigest(),
+             FINGERPRINT, payload, size, time.time()),
+        )
+        _evict(conn)
+        conn.commit()
+
+
+def _evict(conn):
+    """Drop least recently used entries until the cache fits HTTP_CACHE_MAX_BYTES."""
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+    if total <= HTTP_CACHE_MAX_BYTES:
+        return
+    for url, size in conn.execute("SELECT url, size FROM http_cache ORDER BY accessed_at").fetchall():
+        conn.execute("DELETE FROM http_cache WHERE url = ?", (url,))
+        total -= size
+        if total <= HTTP_CACHE_MAX_BYTES:
+            break
+
+
+def close():
+    global _conn
+    with _lock:
+        if _conn is not None:
+            _conn.close()
+            _conn = None
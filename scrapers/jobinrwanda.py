@@ -1,106 +1,108 @@
-import requests
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 import sys
 import os
 import re
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from config import KEYWORDS
+from matcher import match
+from scrapers import engine, parsing
 
+NAME = "JobInRwanda"
+DESCRIPTION = "JobInRwanda"
 BASE_URL = "https://www.jobinrwanda.com"
 
+# Try different category pages (correct paths found from site)
+CATEGORY_PATHS = [
+    "/jobs/tender",       # Tenders category
+    "/jobs/consultancy",  # Consultancy opportunities
+    "/jobs/all",          # All jobs
+]
 
-def fetch():
-    """Fetch tenders/jobs from JobInRwanda that match our keywords."""
+# Job cards are found by the h5.card-title selector; only the Bootstrap
+# .card containers (title link, employer link, deadline) need parsing.
+# The strainer sees the raw class attribute ("card h-100 shadow-sm"), so it
+# matches "card" as a word. Where the job link wraps the whole card it is
+# cut off by the strainer, and select_cards() parses the full page instead.
+CARD_SELECTOR = "h5.card-title"
+STRAINER = SoupStrainer(class_=re.compile(r"(?:^|\s)card(?:\s|$)"))
+
+
+def _job_link(card):
+    return card.find_parent("a", href=True)
+
+
+def urls():
+    """Listing pages to scan, in priority order."""
+    return [BASE_URL + path for path in CATEGORY_PATHS]
+
+
+def page_url(url, number):
+    """Drupal pager: ?page=0 is the first page."""
+    return engine.with_query(url, page=number - 1)
+
+
+def parse(html, url):
+    """Extract keyword-matching listings from a JobInRwanda listing page."""
     results = []
+    cards = parsing.select_cards(html, CARD_SELECTOR, STRAINER, has_listing=_job_link)
 
-    # Try different category pages (correct paths found from site)
-    urls_to_try = [
-        f"{BASE_URL}/jobs/tender",       # Tenders category
-        f"{BASE_URL}/jobs/consultancy",  # Consultancy opportunities
-        f"{BASE_URL}/jobs/all",          # All jobs
-    ]
-
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.5",
-    }
-
-    seen_links = set()
-
-    for url in urls_to_try:
-        try:
-            r = requests.get(url, timeout=20, headers=headers)
-            if r.status_code != 200:
-                print(f"[JobInRwanda] {url} returned {r.status_code}")
-                continue
-
-            soup = BeautifulSoup(r.text, "html.parser")
-
-            # Find job cards by the h5.card-title selector
-            cards = soup.select("h5.card-title")
-
-            for card in cards:
-                # Get the parent link
-                parent_link = card.find_parent("a")
-                if not parent_link:
-                    continue
-
-                href = parent_link.get("href", "")
-                if not href or href in seen_links:
-                    continue
-
-                seen_links.add(href)
-                title_text = card.get_text(strip=True)
-
-                if not title_text:
-                    continue
-
-                # Check if any keyword matches
-                title_lower = title_text.lower()
-                if any(k.lower() in title_lower for k in KEYWORDS):
-                    # Build full link
-                    if href.startswith("/"):
-                        full_link = BASE_URL + href
-                    elif href.startswith("http"):
-                        full_link = href
-                    else:
-                        full_link = BASE_URL + "/" + href
-
-                    # Try to find org and deadline from the card's container
-                    container = card.find_parent(["div", "article"])
-                    org = "JobInRwanda"
-                    deadline = "Check listing"
-
-                    if container:
-                        # Look for employer link
-                        employer_link = container.find("a", href=re.compile(r"/employer/"))
-                        if employer_link:
-                            org = employer_link.get_text(strip=True)
-
-                        # Look for deadline info
-                        deadline_elem = container.find(string=re.compile(r"deadline", re.I))
-                        if deadline_elem:
-                            deadline = str(deadline_elem).strip()[:30]
-
-                    results.append({
-                        "title": title_text,
-                        "org": org,
-                        "deadline": deadline,
-                        "link": full_link,
-                        "source": "JobInRwanda"
-                    })
-
-            print(f"[JobInRwanda] {url}: {len(results)} matches total")
-
-        except requests.RequestException as e:
-            print(f"[JobInRwanda] Error fetching {url}: {e}")
+    for card in cards:
+        # Get the parent link
+        parent_link = _job_link(card)
+        if not parent_link:
             continue
 
+        href = parent_link.get("href", "")
+        if not href:
+            continue
+
+        title_text = card.get_text(strip=True)
+
+        if not title_text:
+            continue
+
+        # Check if any keyword matches
+        if match(title_text):
+            # Build full link
+            if href.startswith("/"):
+                full_link = BASE_URL + href
+            elif href.startswith("http"):
+                full_link = href
+            else:
+                full_link = BASE_URL + "/" + href
+
+            # Try to find org and deadline from the card's container
+            container = card.find_parent(["div", "article"])
+            org = "JobInRwanda"
+            deadline = "Check listing"
+
+            if container:
+                # Look for employer link
+                employer_link = container.find("a", href=re.compile(r"/employer/"))
+                if employer_link:
+                    org = employer_link.get_text(strip=True)
+
+                # Look for deadline info
+                deadline_elem = container.find(string=re.compile(r"deadline", re.I))
+                if deadline_elem:
+                    deadline = str(deadline_elem).strip()[:30]
+
+            results.append({
+                "title": title_text,
+                "org": org,
+                "deadline": deadline,
+                "link": full_link,
+                "source": "JobInRwanda"
+            })
+
     return results
 
 
+def fetch():
+    """Fetch tenders/jobs from JobInRwanda that match our keywords."""
+    return engine.fetch(sys.modules[__name__])
+
+
 if __name__ == "__main__":
     # Test the scraper
     tenders = fetch()
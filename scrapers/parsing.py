@@ -0,0 +1,67 @@
+"""
+HTML parsing backend shared by the scrapers.
+
+make_soup() uses lxml (C-accelerated) when it is installed and falls back
+to Python's html.parser otherwise. Scrapers declare their card selector
+and, where the page structure allows it, a SoupStrainer once at module
+level; select_cards() then builds a tree for just the card containers
+instead of the whole page. If the restricted tree has no cards, or none
+the scraper can read a listing from (e.g. the site moved the link outside
+the card), the page is parsed in full, as before.
+"""
+
+import os
+import sys
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from config import HTML_PARSER
+
+try:
+    import lxml  # noqa: F401
+    FAST_BACKEND = "lxml"
+except ImportError:
+    FAST_BACKEND = None
+
+_backend = None
+_strain = True
+
+
+def configure(backend=None, strain=None):
+    """Override the backend ("lxml", "html.parser" or "auto") or turn straining off."""
+    global _backend, _strain
+    if backend is not None:
+        _backend = None if backend == "auto" else backend
+    if strain is not None:
+        _strain = strain
+
+
+def backend():
+    """Return the BeautifulSoup tree builder in use."""
+    if _backend:
+        return _backend
+    if HTML_PARSER != "auto":
+        return HTML_PARSER
+    return FAST_BACKEND or "html.parser"
+
+
+def make_soup(html, strainer=None):
+    """Parse html, keeping only the elements matched by strainer when given."""
+    if strainer is not None and _strain:
+        return BeautifulSoup(html, backend(), parse_only=strainer)
+    return BeautifulSoup(html, backend())
+
+
+def select_cards(html, selector, strainer=None, has_listing=None):
+    """
+    Return the elements matching selector, parsing as little of the page as
+    possible. has_listing(card) tells whether a card holds what the scraper
+    reads (before keyword matching); the strained cards are only used if
+    one of them does.
+    """
+    if strainer is not None and _strain:
+        cards = make_soup(html, strainer).select(selector)
+        if cards and (has_listing is None or any(map(has_listing, cards))):
+            return cards
+    return make_soup(html).select(selector)
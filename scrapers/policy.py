@@ -0,0 +1,208 @@
+"""
+Fetch policy shared by all scrapers: rate limits, retries and circuit breakers.
+
+Every request made through client.get() goes through call():
+    rate limit   each host has a token bucket refilled at RATE_LIMIT_PER_HOST
+                 requests per second (bursts up to RATE_LIMIT_BURST), so a
+                 site is never sent more than that however many workers run
+    retries      429 and 5xx responses and connection errors/timeouts are
+                 retried up to MAX_RETRIES times, waiting a random time up
+                 to BACKOFF_BASE * 2^attempt (capped at BACKOFF_MAX), or the
+                 server's Retry-After when it gives one
+    breaker      after CIRCUIT_FAILURES failed requests in a row (connection
+                 errors, timeouts, or 429/5xx once retries are used up) a
+                 host's circuit opens: requests to it raise CircuitOpenError
+                 at once instead of waiting for timeouts. After
+                 CIRCUIT_COOLDOWN seconds one request is let through again;
+                 success closes the circuit, failure keeps it open for
+                 another cooldown. Any other response, 404 and 410
+                 included, is about that URL (a page past the last one, a
+                 removed listing) and shows the host is up.
+
+Time spent waiting for a token or backing off is recorded with
+instrument.py ("policy.throttle", "policy.backoff"), so it is not mistaken
+for network time.
+
+Breaker state is plain data (state() / load()) so radar.py can keep it in
+the database between runs: a source that was dead last week costs one
+probe request this week, not a timeout per URL.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import instrument
+from config import (
+    RATE_LIMIT_PER_HOST, RATE_LIMIT_BURST, MAX_RETRIES, BACKOFF_BASE, BACKOFF_MAX,
+    CIRCUIT_FAILURES, CIRCUIT_COOLDOWN,
+)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_ERRORS = (requests.ConnectionError, requests.Timeout)
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling a host whose circuit is open."""
+
+
+class TokenBucket:
+    """Allow rate requests per second on average, at most burst at once."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, sleeping until one is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_buckets = {}
+_circuits = {}      # host -> [consecutive failures, opened at (epoch seconds) or None]
+_probing = set()    # hosts with a trial request in flight
+_changed = set()    # hosts whose circuit changed since load()
+_lock = threading.Lock()
+
+
+def _host(url):
+    return urlsplit(url).netloc
+
+
+def _bucket(host):
+    with _lock:
+        bucket = _buckets.get(host)
+        if bucket is None and RATE_LIMIT_PER_HOST:
+            bucket = _buckets[host] = TokenBucket(RATE_LIMIT_PER_HOST, RATE_LIMIT_BURST)
+        return bucket
+
+
+def _check(host):
+    """Raise CircuitOpenError if host may not be called now."""
+    with _lock:
+        failures, opened_at = _circuits.get(host, (0, None))
+        if opened_at is None:
+            return
+        retry_at = opened_at + CIRCUIT_COOLDOWN
+        if time.time() < retry_at or host in _probing:
+            until = time.strftime("%Y-%m-%d %H:%M", time.localtime(retry_at))
+            instrument.count("http.circuit_open")
+            raise CircuitOpenError(f"circuit open for {host} after {failures} failures (retry after {until})")
+        _probing.add(host)
+
+
+def _record(host, ok):
+    """Count a request to host as a success or failure (ok None: neither, e.g. a bad URL)."""
+    with _lock:
+        _probing.discard(host)
+        if ok is None:
+            return
+        failures, opened_at = _circuits.get(host, (0, None))
+        if ok:
+            if failures:
+                _circuits[host] = [0, None]
+                _changed.add(host)
+            return
+        failures += 1
+        if failures >= CIRCUIT_FAILURES:
+            opened_at = time.time()
+        _circuits[host] = [failures, opened_at]
+        _changed.add(host)
+
+
+def _backoff(attempt, response):
+    """Seconds to wait before retry number attempt + 1."""
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            seconds = float(retry_after)
+        except ValueError:
+            try:
+                seconds = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                seconds = None
+        if seconds is not None:
+            return min(BACKOFF_MAX, max(0.0, seconds))
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def call(url, send):
+    """
+    Make a request to url with send() under the fetch policy.
+
+    Returns the last response (which may still be a 429/5xx once retries
+    are used up); re-raises the last connection error; raises
+    CircuitOpenError without calling send() if the host's circuit is open.
+    """
+    host = _host(url)
+    _check(host)
+    bucket = _bucket(host)
+    response = error = None
+    try:
+        for attempt in range(MAX_RETRIES + 1):
+            if attempt:
+                instrument.count("http.retries")
+                with instrument.span("policy.backoff"):
+                    time.sleep(_backoff(attempt - 1, response))
+            if bucket:
+                with instrument.span("policy.throttle"):
+                    bucket.acquire()
+            response = error = None
+            try:
+                response = send()
+            except RETRY_ERRORS as e:
+                error = e
+                continue
+            if response.status_code not in RETRY_STATUSES:
+                break
+    except BaseException:
+        _record(host, ok=None)
+        raise
+
+    _record(host, ok=error is None and response.status_code not in RETRY_STATUSES)
+    if error is not None:
+        raise error
+    return response
+
+
+def load(circuits):
+    """Restore breaker state from {host: (failures, opened_at)}."""
+    with _lock:
+        _circuits.clear()
+        _circuits.update({host: [failures, opened_at] for host, (failures, opened_at) in circuits.items()})
+        _probing.clear()
+        _changed.clear()
+
+
+def state(changed_only=True):
+    """Breaker state as {host: (failures, opened_at)}, by default only hosts that changed."""
+    with _lock:
+        hosts = _changed if changed_only else _circuits
+        return {host: tuple(_circuits[host]) for host in hosts}
+
+
+def open_circuits():
+    """[(host, failures, retry at)] for the hosts currently skipped."""
+    with _lock:
+        return sorted((host, failures, opened_at + CIRCUIT_COOLDOWN)
+                      for host, (failures, opened_at) in _circuits.items()
+                      if opened_at is not None and time.time() < opened_at + CIRCUIT_COOLDOWN)
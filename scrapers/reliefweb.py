@@ -8,79 +8,89 @@ Set environment variable:
 - RELIEFWEB_APPNAME: Your approved appname
 """
 
-import requests
+import json
 import os
 import sys
+from urllib.parse import parse_qs, urlencode, urlsplit
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from config import KEYWORDS
+from matcher import match
+from scrapers import engine
 
+NAME = "ReliefWeb"
+DESCRIPTION = "ReliefWeb"
+CACHEABLE = False  # API responses carry the appname; always fetch fresh
 API_URL = "https://api.reliefweb.int/v1/jobs"
 RELIEFWEB_APPNAME = os.environ.get("RELIEFWEB_APPNAME", "")
 
 
-def fetch():
-    """Fetch IT/technology jobs from ReliefWeb API."""
-    results = []
-
+def urls():
     if not RELIEFWEB_APPNAME:
         print("[ReliefWeb] RELIEFWEB_APPNAME not set. Skipping.")
         print("[ReliefWeb] Register at: https://apidoc.reliefweb.int/parameters#appname")
-        return results
-
-    try:
-        # Use GET with query parameters
-        params = {
-            "appname": RELIEFWEB_APPNAME,
-            "filter[field]": "career_categories.name",
-            "filter[value]": "Information Technology",
-            "fields[include][]": ["title", "source.name", "date.closing", "url", "country.name"],
-            "sort[]": "date.created:desc",
-            "limit": 50,
-        }
-
-        r = requests.get(API_URL, params=params, timeout=20)
-
-        if r.status_code != 200:
-            print(f"[ReliefWeb] API returned {r.status_code}: {r.text[:200]}")
-            return results
-
-        data = r.json()
-        jobs = data.get("data", [])
-
-        for job in jobs:
-            fields = job.get("fields", {})
-            title = fields.get("title", "")
-            title_lower = title.lower()
-
-            # Check if any keyword matches
-            if any(k.lower() in title_lower for k in KEYWORDS):
-                source = fields.get("source", [{}])
-                org = source[0].get("name", "Unknown") if source else "Unknown"
-
-                closing = fields.get("date", {}).get("closing", "N/A")
-                if closing and closing != "N/A":
-                    closing = closing[:10]
-
-                country = fields.get("country", [{}])
-                country_name = country[0].get("name", "") if country else ""
-
-                results.append({
-                    "title": f"{title} ({country_name})" if country_name else title,
-                    "org": org,
-                    "deadline": closing,
-                    "link": fields.get("url", "https://reliefweb.int/jobs"),
-                    "source": "ReliefWeb"
-                })
-
-        print(f"[ReliefWeb] Found {len(results)} matching jobs from {len(jobs)} IT jobs")
-
-    except Exception as e:
-        print(f"[ReliefWeb] Error: {e}")
+        return []
+
+    # Use GET with query parameters
+    params = {
+        "appname": RELIEFWEB_APPNAME,
+        "filter[field]": "career_categories.name",
+        "filter[value]": "Information Technology",
+        "fields[include][]": ["title", "source.name", "date.closing", "url", "country.name"],
+        "sort[]": "date.created:desc",
+        "limit": 50,
+    }
+    return [f"{API_URL}?{urlencode(params, doseq=True)}"]
+
+
+def page_url(url, number):
+    """The API pages with offset, in steps of the request's limit."""
+    limit = int(parse_qs(urlsplit(url).query).get("limit", ["50"])[0])
+    return engine.with_query(url, offset=limit * (number - 1))
+
 
+def label(url):
+    return API_URL
+
+
+def parse(body, url):
+    """Extract keyword-matching jobs from a ReliefWeb API response."""
+    results = []
+    data = json.loads(body)
+    jobs = data.get("data", [])
+
+    for job in jobs:
+        fields = job.get("fields", {})
+        title = fields.get("title", "")
+
+        # Check if any keyword matches
+        if match(title):
+            source = fields.get("source", [{}])
+            org = source[0].get("name", "Unknown") if source else "Unknown"
+
+            closing = fields.get("date", {}).get("closing", "N/A")
+            if closing and closing != "N/A":
+                closing = closing[:10]
+
+            country = fields.get("country", [{}])
+            country_name = country[0].get("name", "") if country else ""
+
+            results.append({
+                "title": f"{title} ({country_name})" if country_name else title,
+                "org": org,
+                "deadline": closing,
+                "link": fields.get("url", "https://reliefweb.int/jobs"),
+                "source": "ReliefWeb"
+            })
+
+    print(f"[ReliefWeb] Found {len(results)} matching jobs from {len(jobs)} IT jobs")
     return results
 
 
+def fetch():
+    """Fetch IT/technology jobs from ReliefWeb API."""
+    return engine.fetch(sys.modules[__name__])
+
+
 if __name__ == "__main__":
     tenders = fetch()
     print(f"\nFound {len(tenders)} matching jobs:")
@@ -1,88 +1,85 @@
-import requests
-from bs4 import BeautifulSoup
 import sys
 import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from config import KEYWORDS
+from matcher import match
+from scrapers import engine, parsing
 
+NAME = "TenderAfrica"
+DESCRIPTION = "TenderAfrica"
 BASE_URL = "https://www.tenderafrica.net"
 
+# Try different selectors based on site structure (first one with >1 hits wins)
+TENDER_SELECTORS = [
+    ".tender",
+    ".tender-item",
+    ".listing",
+    "article",
+    ".item",
+    "tr",
+]
+
+
+def urls():
+    return [BASE_URL]
 
-def fetch():
-    """Fetch tenders from TenderAfrica that match our keywords."""
-    results = []
 
-    try:
-        r = requests.get(BASE_URL, timeout=15, headers={
-            "User-Agent": "Mozilla/5.0 (compatible; KamagramTenderRadar/1.0)"
-        })
-
-        if r.status_code != 200:
-            print(f"[TenderAfrica] HTTP {r.status_code}")
-            return results
-
-        soup = BeautifulSoup(r.text, "html.parser")
-
-        # Try different selectors based on site structure
-        tender_selectors = [
-            ".tender",
-            ".tender-item",
-            ".listing",
-            "article",
-            ".item",
-            "tr",
-        ]
-
-        for selector in tender_selectors:
-            items = soup.select(selector)
-            if items and len(items) > 1:  # Avoid header rows, etc.
-                for item in items:
-                    title_elem = (
-                        item.select_one("a") or
-                        item.select_one("h2") or
-                        item.select_one("h3") or
-                        item.select_one(".title")
+def parse(html, url):
+    """Extract keyword-matching tenders from the TenderAfrica front page."""
+    results = []
+    soup = parsing.make_soup(html)
+
+    for selector in TENDER_SELECTORS:
+        items = soup.select(selector)
+        if items and len(items) > 1:  # Avoid header rows, etc.
+            for item in items:
+                title_elem = (
+                    item.select_one("a") or
+                    item.select_one("h2") or
+                    item.select_one("h3") or
+                    item.select_one(".title")
+                )
+
+                if not title_elem:
+                    continue
+
+                title_text = title_elem.get_text(strip=True)
+
+                # Check if any keyword matches
+                if match(title_text):
+                    link = title_elem.get("href", "") if title_elem.name == "a" else ""
+                    if not link:
+                        link_elem = item.select_one("a")
+                        if link_elem:
+                            link = link_elem.get("href", "")
+
+                    if link and not link.startswith("http"):
+                        link = BASE_URL + link
+
+                    deadline_elem = (
+                        item.select_one(".deadline") or
+                        item.select_one(".date") or
+                        item.select_one("time")
                     )
+                    deadline = deadline_elem.get_text(strip=True) if deadline_elem else "N/A"
 
-                    if not title_elem:
-                        continue
-
-                    title_text = title_elem.get_text(strip=True).lower()
-
-                    # Check if any keyword matches
-                    if any(k.lower() in title_text for k in KEYWORDS):
-                        link = title_elem.get("href", "") if title_elem.name == "a" else ""
-                        if not link:
-                            link_elem = item.select_one("a")
-                            if link_elem:
-                                link = link_elem.get("href", "")
-
-                        if link and not link.startswith("http"):
-                            link = BASE_URL + link
-
-                        deadline_elem = (
-                            item.select_one(".deadline") or
-                            item.select_one(".date") or
-                            item.select_one("time")
-                        )
-                        deadline = deadline_elem.get_text(strip=True) if deadline_elem else "N/A"
-
-                        results.append({
-                            "title": title_elem.get_text(strip=True),
-                            "org": "TenderAfrica Listing",
-                            "deadline": deadline,
-                            "link": link or BASE_URL,
-                            "source": "TenderAfrica"
-                        })
-                break  # Found items with this selector
-
-    except Exception as e:
-        print(f"[TenderAfrica] Error fetching: {e}")
+                    results.append({
+                        "title": title_elem.get_text(strip=True),
+                        "org": "TenderAfrica Listing",
+                        "deadline": deadline,
+                        "link": link or BASE_URL,
+                        "source": "TenderAfrica"
+                    })
+            break  # Found items with this selector
 
     return results
 
 
+def fetch():
+    """Fetch tenders from TenderAfrica that match our keywords."""
+    return engine.fetch(sys.modules[__name__])
+
+
 if __name__ == "__main__":
     # Test the scraper
     tenders = fetch()
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import db
+
+
+@pytest.fixture
+def tmp_db(tmp_path, monkeypatch):
+    """Point the run-wide connection at a fresh database file."""
+    db.close()
+    monkeypatch.setattr(db, "DB_NAME", str(tmp_path / "tenders.db"))
+    yield db
+    db.close()
@@ -0,0 +1,43 @@
+import types
+
+from config import ADAPTIVE_SPEED_UP, ADAPTIVE_SLOW_DOWN
+from scrapers import adaptive
+
+SCRAPER = types.SimpleNamespace(NAME="Fake")
+SEED = "https://example.org/jobs"
+SETTINGS = {"interval": 10, "max_interval": 60}  # minutes: 600 s to 3600 s
+
+
+def poll(changed, new, now):
+    adaptive.observe(SCRAPER, [(SEED, changed, new)], SETTINGS, now=now)
+    return adaptive.db.get_url_schedule([SEED])[SEED]
+
+
+def test_unchanged_page_slows_down_and_new_listings_speed_up(tmp_db):
+    interval, next_at, fetches, changes, new_links = poll(False, 0, now=1000)
+    assert interval == 600 * ADAPTIVE_SLOW_DOWN and next_at == 1000 + interval
+    assert poll(True, 0, now=2000)[0] == interval  # changed, nothing new: kept
+    assert poll(True, 3, now=3000)[0] == max(600, interval * ADAPTIVE_SPEED_UP)
+    assert poll(True, 3, now=4000)[2:] == (4, 3, 6)
+
+
+def test_interval_clamped_to_source_bounds(tmp_db):
+    for n in range(20):
+        interval = poll(False, 0, now=1000 + n)[0]
+    assert interval == 3600
+    for n in range(20):
+        interval = poll(True, 1, now=2000 + n)[0]
+    assert interval == 600
+
+
+def test_failed_download_keeps_interval(tmp_db):
+    interval = poll(False, 0, now=1000)[0]
+    assert poll(None, 0, now=2000)[:3] == (interval, 2000 + interval, 1)
+
+
+def test_only_due_seeds_are_polled(tmp_db):
+    other = "https://example.org/tenders"
+    assert adaptive.due(SCRAPER, [SEED, other], SETTINGS, now=1000) == [SEED, other]
+    adaptive.observe(SCRAPER, [(SEED, False, 0), (other, True, 2)], SETTINGS, now=1000)
+    assert adaptive.due(SCRAPER, [SEED, other], SETTINGS, now=1700) == [other]
+    assert adaptive.next_poll(SCRAPER) == 1600
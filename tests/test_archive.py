@@ -0,0 +1,61 @@
+import types
+
+import radar
+
+
+def tender(n, link=None):
+    return {"title": f"Web developer {n}", "org": "RRA", "deadline": None,
+            "link": link or f"https://example.org/job/{n}", "source": "Test"}
+
+
+def age(conn, days):
+    with conn:
+        conn.execute("UPDATE tenders SET created_at = datetime('now', ?)", (f"-{days} days",))
+
+
+def test_archived_tenders_leave_tenders(tmp_db):
+    stored = tmp_db.insert_tenders([tender(1), tender(2), tender(3)])
+    tmp_db.mark_sent([stored[0]["id"], stored[1]["id"]])
+    conn = tmp_db.connect()
+    age(conn, 200)
+
+    assert tmp_db.archive_old(90) == 2
+    assert [row[0] for row in conn.execute("SELECT id FROM tenders")] == [stored[2]["id"]]
+    assert conn.execute("SELECT COUNT(*) FROM tenders_archive").fetchone()[0] == 2
+    assert conn.execute("SELECT COUNT(*) FROM tender_minhash").fetchone()[0] == 1
+    assert [row[0] for row in tmp_db.search("developer")] == [stored[2]["id"]]
+
+
+def test_archived_key_is_not_stored_again(tmp_db):
+    stored = tmp_db.insert_tenders([tender(1)])
+    tmp_db.mark_sent([stored[0]["id"]])
+    age(tmp_db.connect(), 200)
+    tmp_db.archive_old(90)
+
+    # Same canonical key, other spelling: the trigger drops the row
+    assert tmp_db.insert_tenders([tender(1, "http://www.example.org/job/1/")]) == []
+    assert tmp_db.connect().execute("SELECT COUNT(*) FROM tenders").fetchone()[0] == 0
+    assert tmp_db.known_links(["https://example.org/job/1"]) == {"https://example.org/job/1"}
+
+
+def test_compaction_due(tmp_db):
+    assert not tmp_db.compaction_due(7)  # fresh database
+    tmp_db.insert_tenders([tender(1)])
+    assert not tmp_db.compaction_due(7)
+    age(tmp_db.connect(), 8)
+    assert tmp_db.compaction_due(7)
+    tmp_db.compact(90)
+    assert not tmp_db.compaction_due(7)
+
+
+def test_dry_run_skips_compaction(monkeypatch):
+    compacted = []
+    monkeypatch.setattr(radar, "run_scan", lambda args, sources, digest: False)
+    monkeypatch.setattr(radar, "compaction_due", lambda days: True)
+    monkeypatch.setattr(radar, "run_compact", lambda: compacted.append(True))
+    monkeypatch.setattr(radar, "record_run", lambda mode: None)
+
+    radar.scan(types.SimpleNamespace(dry_run=True, daemon=False))
+    assert compacted == []
+    radar.scan(types.SimpleNamespace(dry_run=False, daemon=False))
+    assert compacted == [True]
@@ -0,0 +1,35 @@
+from canonical import canonical_key
+
+
+def test_scheme_www_slash_and_fragment_are_dropped():
+    assert canonical_key("http://www.example.org/tenders/42/#apply") == canonical_key("https://example.org/tenders/42")
+
+
+def test_tracking_parameters_are_dropped_and_query_sorted():
+    assert (canonical_key("https://example.org/t?b=2&utm_source=x&a=1&gclid=y")
+            == canonical_key("https://example.org/t?a=1&b=2"))
+
+
+def test_default_port_is_dropped_other_ports_kept():
+    assert canonical_key("https://example.org:443/t") == canonical_key("https://example.org/t")
+    assert canonical_key("https://example.org:8443/t") != canonical_key("https://example.org/t")
+
+
+def test_listing_reduced_to_site_id():
+    assert canonical_key("http://www.devex.com/jobs/web-developer-123?utm_source=x") == "devex.com/jobs/123"
+    assert (canonical_key("https://www.brightermonday.co.ke/listings/web-developer-abc12")
+            == canonical_key("https://brightermonday.co.ke/listings/senior-web-developer-abc12"))
+
+
+def test_brightermonday_slug_words_are_not_ids():
+    assert (canonical_key("https://www.brightermonday.co.ke/listings/web-developer")
+            != canonical_key("https://www.brightermonday.co.ke/listings/java-developer"))
+    assert (canonical_key("https://www.brightermonday.co.ke/listings/graduate-intern-2024")
+            != canonical_key("https://www.brightermonday.co.ke/listings/ict-intern-2024"))
+    assert canonical_key("https://www.brightermonday.co.ke/listings/web-developer-k1x9") == (
+        "brightermonday.co.ke/listings/k1x9")
+
+
+def test_non_http_returned_stripped():
+    assert canonical_key("  mailto:jobs@example.org ") == "mailto:jobs@example.org"
+    assert canonical_key(None) == ""
@@ -0,0 +1,51 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scrapers import client
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        body = b"<html>jobs</html>"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    client.close()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    client.close()
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_one_session_for_every_caller():
+    sessions = []
+    threads = [threading.Thread(target=lambda: sessions.append(client.session())) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(s) for s in sessions + [client.session()]}) == 1
+    assert client.session().headers["Accept-Encoding"] == client.ACCEPT_ENCODING
+
+
+def test_requests_to_a_host_reuse_its_connection(server):
+    client.reset_stats()
+    for n in range(3):
+        assert client.get(f"{server}/jobs?page={n}").status_code == 200
+    [stats] = client.stats().values()
+    assert stats == {"requests": 3, "connections": 1, "reused": 2}
@@ -0,0 +1,55 @@
+import threading
+import time
+
+import pytest
+
+from config import MAX_WORKERS, MAX_WORKERS_PER_HOST
+from scrapers import concurrency
+
+
+@pytest.fixture(params=[1, 4], ids=["sequential", "parallel"])
+def workers(request):
+    concurrency.configure(workers=request.param)
+    yield request.param
+    concurrency.configure(workers=MAX_WORKERS, per_host=MAX_WORKERS_PER_HOST)
+
+
+def test_map_ordered_keeps_input_order(workers):
+    def slow_square(n):
+        time.sleep(0.01 * (5 - n))  # later items finish first
+        return n * n
+
+    assert concurrency.map_ordered(slow_square, range(5)) == [0, 1, 4, 9, 16]
+
+
+def test_map_ordered_surfaces_errors(workers):
+    def fail_on_three(n):
+        if n == 3:
+            raise ValueError("bad item")
+        return n
+
+    with pytest.raises(ValueError, match="bad item"):
+        concurrency.map_ordered(fail_on_three, range(5))
+
+
+def test_host_slot_caps_requests_per_host():
+    concurrency.configure(workers=8, per_host=2)
+    try:
+        active, peak = {}, {}
+        lock = threading.Lock()
+
+        def request(url):
+            host = url.split("/")[2]
+            with concurrency.host_slot(url):
+                with lock:
+                    active[host] = active.get(host, 0) + 1
+                    peak[host] = max(peak.get(host, 0), active[host])
+                time.sleep(0.02)
+                with lock:
+                    active[host] -= 1
+
+        urls = [f"https://{host}/page/{n}" for host in ("a.example", "b.example") for n in range(4)]
+        concurrency.map_ordered(request, urls)
+        assert peak == {"a.example": 2, "b.example": 2}
+    finally:
+        concurrency.configure(workers=MAX_WORKERS, per_host=MAX_WORKERS_PER_HOST)
@@ -0,0 +1,62 @@
+import types
+
+import pytest
+
+from scrapers import engine
+
+STORED = {"https://example.org/job/stored-1", "https://example.org/job/stored-2"}
+
+
+@pytest.fixture(autouse=True)
+def known(monkeypatch):
+    monkeypatch.setattr(engine.linkindex, "known", lambda links: {link for link in links if link in STORED})
+
+
+def listings(*names):
+    return [{"title": name, "link": f"https://example.org/job/{name}"} for name in names]
+
+
+def test_known_links_in_a_row_stop_the_crawl():
+    crawl = engine.Crawl("https://example.org/jobs")
+    assert crawl.add(listings("new-1", "stored-1"), False, stop_after_known=2)
+    assert not crawl.add(listings("stored-2", "new-2", "stored-1"), False, stop_after_known=1)
+    assert crawl.known == STORED
+
+
+def test_a_new_listing_resets_the_known_run():
+    crawl = engine.Crawl("https://example.org/jobs")
+    assert crawl.add(listings("stored-1", "new-1", "stored-2"), False, stop_after_known=2)
+
+
+def test_repeated_or_unchanged_page_stops_the_crawl():
+    crawl = engine.Crawl("https://example.org/jobs")
+    assert crawl.add(listings("a", "b"), False, stop_after_known=10)
+    assert not crawl.add(listings("b", "a"), False, stop_after_known=10)
+    assert [t["title"] for t in crawl.listings] == ["a", "b"]
+
+    unchanged = engine.Crawl("https://example.org/jobs")
+    assert not unchanged.add(listings("a"), True, stop_after_known=10)
+    assert unchanged.changed is False
+
+
+def test_empty_page_does_not_stop_the_crawl():
+    # A page may just have no keyword matches; max_pages bounds the crawl
+    crawl = engine.Crawl("https://example.org/jobs")
+    assert crawl.add([], False, stop_after_known=10)
+    assert crawl.listings == [] and crawl.pages == 1
+
+
+def test_crawl_stops_at_max_pages(monkeypatch):
+    scraper = types.SimpleNamespace(page_url=lambda url, n: f"{url}?page={n}")
+    fetched = []
+
+    def download(scraper, url):
+        fetched.append(url)
+        return engine.Page(url, None)
+
+    monkeypatch.setattr(engine, "download", download)
+    monkeypatch.setattr(engine, "parse_all", lambda scraper, pages: [listings(page.url[-6:]) for page in pages])
+    [crawl] = engine.crawl(scraper, ["https://example.org/jobs"], max_pages=3, stop_after_known=10)
+    assert fetched == ["https://example.org/jobs", "https://example.org/jobs?page=2",
+                       "https://example.org/jobs?page=3"]
+    assert crawl.pages == 3
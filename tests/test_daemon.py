@@ -0,0 +1,49 @@
+import signal
+
+import pytest
+
+import daemon
+
+
+def test_schedule_polls_every_source_first():
+    schedule = daemon.Schedule({"a": 60, "b": 300}, now=1000)
+    assert schedule.due(1000) == ["a", "b"]
+    schedule.done(["a", "b"], 1000)
+    assert schedule.due(1059) == []
+    assert schedule.wait(1030) == 30
+    assert schedule.due(1060) == ["a"]
+
+
+def test_schedule_without_sources():
+    assert daemon.Schedule({}).wait(1000) is None
+
+
+def test_serve_without_sources_returns():
+    daemon.serve(lambda due: pytest.fail("nothing to poll"), {})
+
+
+def test_failed_poll_does_not_stop_serving(capsys):
+    calls = []
+
+    def poll(due):
+        calls.append(due)
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+        signal.raise_signal(signal.SIGTERM)
+
+    daemon.serve(poll, {"a": 0})
+    assert calls == [["a"], ["a"]]
+    out = capsys.readouterr().out
+    assert "Poll of a failed: RuntimeError('database is locked')" in out
+    assert "[Daemon] Stopped." in out
+
+
+@pytest.mark.skipif(daemon.fcntl is None, reason="no advisory file locks")
+def test_instance_lock_refuses_a_second_holder(tmp_path):
+    path = str(tmp_path / "radar.lock")
+    with daemon.instance_lock(path):
+        with pytest.raises(daemon.AlreadyRunning):
+            with daemon.instance_lock(path):
+                pass
+    with daemon.instance_lock(path):
+        pass
@@ -0,0 +1,38 @@
+from datetime import date
+
+import pytest
+
+from deadlines import parse_deadline
+
+TODAY = date(2026, 5, 1)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Deadline: 15 March 2027", "2027-03-15"),
+    ("2026-03-15T00:00:00", "2026-03-15"),
+    ("15/03/2026", "2026-03-15"),
+    ("Mar 15, 2026", "2026-03-15"),
+    ("15 mars 2026", "2026-03-15"),
+    ("Closing 3rd of June", "2026-06-03"),
+])
+def test_dates(text, expected):
+    assert parse_deadline(text, TODAY) == expected
+
+
+@pytest.mark.parametrize("text", ["Check listing", "N/A", "Kigali, Rwanda", "Lot 12", "", None, "31/02/2026"])
+def test_not_dates(text):
+    assert parse_deadline(text, TODAY) is None
+
+
+def test_yearless_date_in_the_past_is_next_year():
+    assert parse_deadline("Deadline: 15 Jan", TODAY) == "2027-01-15"
+
+
+def test_yearless_date_just_passed_stays_this_year():
+    assert parse_deadline("Deadline: 20 April", TODAY) == "2026-04-20"
+
+
+def test_yearless_leap_day():
+    assert parse_deadline("Deadline: 29 Feb", date(2028, 2, 10)) == "2028-02-29"
+    assert parse_deadline("Deadline: 29 Feb", date(2028, 5, 1)) is None
+    assert parse_deadline("Deadline: 29 Feb", date(2027, 5, 1)) is None
@@ -0,0 +1,87 @@
+import dedup
+
+
+def tender(title, link, org, source):
+    return {"title": title, "org": org, "deadline": None, "link": link, "source": source}
+
+
+def test_placeholder_organizations():
+    assert dedup.organization("TenderAfrica Listing", "TenderAfrica") is None
+    assert dedup.organization("BrighterMonday Kenya", "BrighterMonday Kenya") is None
+    assert dedup.organization("JobInRwanda", "JobInRwanda") is None
+    assert dedup.organization("Devex", "Devex Jobs") is None
+    assert dedup.organization("ungm.org", "Google (ungm.org)") is None
+    assert dedup.organization("Unknown", "ReliefWeb") is None
+    assert dedup.organization("", "ReliefWeb") is None
+    assert dedup.organization("UNDP Rwanda", "ReliefWeb") == {"undp", "rwanda"}
+
+
+def test_same_organization():
+    assert dedup.same_organization(frozenset({"undp", "rwanda"}), frozenset({"undp"}))
+    assert dedup.same_organization(frozenset({"undp"}), None)
+    assert not dedup.same_organization(frozenset({"undp"}), frozenset({"unicef"}))
+    assert not dedup.same_organization(None, None)
+
+
+def test_placeholder_org_does_not_join_different_tenders(tmp_db):
+    stored = tmp_db.insert_tenders([
+        tender("Website development for Ministry of Health", "https://example.org/t/1",
+               "TenderAfrica Listing", "TenderAfrica"),
+        tender("Website development for Ministry of Education", "https://example.org/t/2",
+               "TenderAfrica Listing", "TenderAfrica"),
+    ])
+    assert [t["duplicate_of"] for t in stored] == [None, None]
+
+
+def test_same_title_without_real_orgs_is_kept_apart(tmp_db):
+    stored = tmp_db.insert_tenders([
+        tender("Mobile App Developer", "https://brightermonday.co.ke/listings/mobile-app-developer-abc12",
+               "BrighterMonday Kenya", "BrighterMonday Kenya"),
+        tender("Mobile App Developer", "https://brightermonday.co.ke/listings/mobile-app-developer-xyz89",
+               "BrighterMonday Kenya", "BrighterMonday Kenya"),
+    ])
+    assert [t["duplicate_of"] for t in stored] == [None, None]
+
+
+def test_repost_by_same_org_is_clustered(tmp_db):
+    stored = tmp_db.insert_tenders([
+        tender("Website development for the Ministry of Health", "https://example.org/t/1",
+               "Ministry of Health", "ReliefWeb"),
+        tender("Website Development - Ministry of Health", "https://example.com/t/9",
+               "Ministry of Health Rwanda", "JobInRwanda"),
+    ])
+    assert stored[1]["duplicate_of"] == stored[0]["id"]
+
+
+def test_aggregator_copy_is_clustered(tmp_db):
+    stored = tmp_db.insert_tenders([
+        tender("Website development for the Ministry of Health", "https://example.org/t/1",
+               "Ministry of Health", "ReliefWeb"),
+        tender("Website development for the Ministry of Health", "https://example.com/t/9",
+               "TenderAfrica Listing", "TenderAfrica"),
+    ])
+    assert stored[1]["duplicate_of"] == stored[0]["id"]
+
+
+def test_different_orgs_are_kept_apart(tmp_db):
+    stored = tmp_db.insert_tenders([
+        tender("Website development and hosting services", "https://example.org/t/1", "UNICEF", "ReliefWeb"),
+        tender("Website development and hosting services", "https://example.org/t/2", "UNDP", "ReliefWeb"),
+    ])
+    assert [t["duplicate_of"] for t in stored] == [None, None]
+
+
+def test_different_lot_numbers_are_kept_apart(tmp_db):
+    stored = tmp_db.insert_tenders([
+        tender("Supply of ICT equipment lot 2", "https://example.org/t/1", "Ministry of ICT", "ReliefWeb"),
+        tender("Supply of ICT equipment lot 3", "https://example.org/t/2", "Ministry of ICT", "ReliefWeb"),
+    ])
+    assert [t["duplicate_of"] for t in stored] == [None, None]
+
+
+def test_numbers_in_another_order_are_kept_apart(tmp_db):
+    stored = tmp_db.insert_tenders([
+        tender("Supply of ICT equipment tender 0 1", "https://example.org/t/1", "Ministry of ICT", "ReliefWeb"),
+        tender("Supply of ICT equipment tender 1 0", "https://example.org/t/2", "Ministry of ICT", "ReliefWeb"),
+    ])
+    assert [t["duplicate_of"] for t in stored] == [None, None]
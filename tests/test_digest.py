@@ -0,0 +1,26 @@
+def add(conn, title, deadline_at, score):
+    conn.execute("INSERT INTO tenders (title, link, source, deadline_at, score) VALUES (?, ?, 'Test', ?, ?)",
+                 (title, f"https://example.org/{title}", deadline_at, score))
+
+
+def test_unsent_ranked_by_score_then_soonest_deadline_undated_last(tmp_db):
+    conn = tmp_db.connect()
+    with conn:
+        add(conn, "undated", None, 2.2)
+        add(conn, "march", "2099-03-15", 2.2)
+        add(conn, "january", "2099-01-01", 2.2)
+        add(conn, "best", None, 5.0)
+        add(conn, "low", "2099-01-01", 1.0)
+        add(conn, "expired", "2000-01-01", 9.0)
+    assert [row[1] for row in tmp_db.get_unsent()] == ["best", "january", "march", "undated", "low"]
+
+
+def test_sent_and_duplicates_leave_the_queue(tmp_db):
+    conn = tmp_db.connect()
+    with conn:
+        add(conn, "first", None, 1.0)
+        add(conn, "copy", None, 1.0)
+        conn.execute("UPDATE tenders SET duplicate_of = 1 WHERE title = 'copy'")
+        add(conn, "other", None, 1.0)
+    tmp_db.mark_sent([3])
+    assert [row[1] for row in tmp_db.get_unsent()] == ["first"]
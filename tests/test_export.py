@@ -0,0 +1,37 @@
+import pytest
+
+import export
+
+
+def tender(title, link, org="Ministry of ICT"):
+    return {"title": title, "org": org, "deadline": "30 June 2026", "link": link, "source": "TenderAfrica"}
+
+
+def test_parquet_keeps_score_as_float(tmp_db, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    tmp_db.insert_tenders([tender("Website development", "https://example.org/t/1")])
+
+    count, path = export.export(str(tmp_path / "tenders.parquet"))
+
+    table = pq.read_table(path)
+    assert count == 1
+    assert str(table.schema.field("score").type) == "double"
+    assert table.column("score")[0].as_py() > 0
+    assert table.column("id")[0].as_py() == 1
+
+
+def test_csv_and_jsonl_export(tmp_db, tmp_path):
+    tmp_db.insert_tenders([tender("Website development", "https://example.org/t/1")])
+    for name in ("tenders.csv", "tenders.jsonl"):
+        count, path = export.export(str(tmp_path / name))
+        assert count == 1
+        assert "Website development" in open(path, encoding="utf-8").read()
+
+
+def test_incremental_export_writes_only_new_rows(tmp_db, tmp_path):
+    path = str(tmp_path / "tenders.jsonl")
+    tmp_db.insert_tenders([tender("Website development", "https://example.org/t/1")])
+    assert export.export(path, incremental=True)[0] == 1
+    tmp_db.insert_tenders([tender("Mobile app development", "https://example.org/t/2", org="Ministry of Health")])
+    assert export.export(path, incremental=True)[0] == 1
+    assert len(open(path, encoding="utf-8").readlines()) == 2
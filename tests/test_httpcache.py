@@ -0,0 +1,77 @@
+import itertools
+import types
+
+import pytest
+
+from scrapers import httpcache
+
+LISTINGS = [{"title": "Web Developer", "link": "https://example.org/job/1"}]
+
+
+class Site:
+    """Fake client.get(): serves a body with validators, 304 when they match."""
+
+    def __init__(self, **validators):
+        self.validators = validators
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        headers = headers or {}
+        self.requests.append(headers)
+        if headers and (headers.get("If-None-Match") == self.validators.get("ETag")
+                        or headers.get("If-Modified-Since") == self.validators.get("Last-Modified")):
+            return types.SimpleNamespace(status_code=304, headers={}, content=b"")
+        return types.SimpleNamespace(status_code=200, headers=self.validators, content=b"<html>jobs</html>")
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    httpcache.close()
+    monkeypatch.setattr(httpcache, "CACHE_NAME", str(tmp_path / "http_cache.db"))
+    clock = itertools.count(1000)
+    monkeypatch.setattr(httpcache, "time", types.SimpleNamespace(time=lambda: next(clock)))
+    yield httpcache
+    httpcache.close()
+
+
+@pytest.mark.parametrize("validators, header", [
+    ({"ETag": '"v1"'}, "If-None-Match"),
+    ({"Last-Modified": "Tue, 06 Oct 2026 08:00:00 GMT"}, "If-Modified-Since"),
+])
+def test_conditional_get_round_trip(cache, monkeypatch, validators, header):
+    site = Site(**validators)
+    monkeypatch.setattr(httpcache.client, "get", site.get)
+    url = "https://example.org/jobs"
+
+    response, listings = cache.get(url)
+    assert response.status_code == 200 and listings is None
+    cache.store(url, response, LISTINGS)
+
+    response, listings = cache.get(url)
+    assert site.requests[-1][header] == next(iter(validators.values()))
+    assert response.status_code == 304
+    assert listings == LISTINGS
+
+
+def test_unchanged_body_without_validators_is_a_hit(cache, monkeypatch):
+    site = Site()
+    monkeypatch.setattr(httpcache.client, "get", site.get)
+    response, _ = cache.get("https://example.org/jobs")
+    cache.store("https://example.org/jobs", response, LISTINGS)
+    assert cache.get("https://example.org/jobs")[1] == LISTINGS
+
+
+def test_least_recently_used_entries_are_evicted(cache, monkeypatch):
+    site = Site(ETag='"v1"')
+    monkeypatch.setattr(httpcache.client, "get", site.get)
+    response = site.get("https://example.org/a")
+    size = len("https://example.org/a") + len('[]') + len('"v1"')
+    monkeypatch.setattr(httpcache, "HTTP_CACHE_MAX_BYTES", size * 2)
+
+    cache.store("https://example.org/a", response, [])
+    cache.store("https://example.org/b", response, [])
+    cache.get("https://example.org/a")  # a hit makes a the most recently used
+    cache.store("https://example.org/c", response, [])
+
+    urls = {row[0] for row in cache._connection().execute("SELECT url FROM http_cache")}
+    assert urls == {"https://example.org/a", "https://example.org/c"}
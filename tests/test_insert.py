@@ -0,0 +1,34 @@
+import pytest
+
+
+def tender(n, link=None):
+    return {"title": f"Website for client {n}", "org": f"Org {n}", "deadline": None,
+            "link": link or f"https://example.org/job/{n}", "source": "Test"}
+
+
+def test_one_run_wide_connection(tmp_db):
+    assert tmp_db.connect() is tmp_db.connect()
+
+
+def test_batch_is_one_transaction(tmp_db):
+    conn = tmp_db.connect()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    stored = tmp_db.insert_tenders([tender(n) for n in range(50)])
+    conn.set_trace_callback(None)
+    assert len(stored) == 50
+    assert sum(s.strip().upper().startswith("BEGIN") for s in statements) == 1
+    assert sum(s.strip().upper() == "COMMIT" for s in statements) == 1
+
+
+def test_known_links_are_ignored_not_errors(tmp_db):
+    tmp_db.insert_tenders([tender(1)])
+    stored = tmp_db.insert_tenders([tender(1), tender(2), tender(2), tender(3, "https://www.example.org/job/1/")])
+    assert [t["link"] for t in stored] == ["https://example.org/job/2"]
+    assert tmp_db.connect().execute("SELECT COUNT(*) FROM tenders").fetchone()[0] == 2
+
+
+def test_failed_batch_stores_nothing(tmp_db):
+    with pytest.raises(KeyError):
+        tmp_db.insert_tenders([tender(1), {"title": "No link"}])
+    assert tmp_db.connect().execute("SELECT COUNT(*) FROM tenders").fetchone()[0] == 0
@@ -0,0 +1,76 @@
+import datetime
+import time
+import types
+
+import instrument
+from scrapers import client, engine
+
+
+def test_spans_and_counters():
+    instrument.reset()
+    instrument.add("fetch.A", 0.5)
+    instrument.add("fetch.A", 1.5)
+    instrument.count("pages.fetched", 2)
+    summary = instrument.summary()
+    assert summary["spans"]["fetch.A"] == {"count": 2, "total": 2.0, "max": 1.5}
+    assert summary["counters"] == {"pages.fetched": 2}
+
+
+def test_urls_listed_slowest_first():
+    instrument.reset()
+    instrument.add_url("https://example.org/fast", "fetch", 0.1)
+    instrument.add_url("https://example.org/slow", "fetch", 0.5)
+    instrument.add_url("https://example.org/slow", "parse", 0.25)
+    urls = instrument.summary()["urls"]
+    assert list(urls) == ["https://example.org/slow", "https://example.org/fast"]
+    assert urls["https://example.org/slow"] == {"fetch": 0.5, "parse": 0.25, "total": 0.75}
+
+
+def test_merge_adds_worker_urls():
+    instrument.reset()
+    instrument.add_url("https://example.org/a", "fetch", 0.5)
+    worker = ({"parse.A": [1, 0.25, 0.25]}, {}, {"https://example.org/a": {"parse": 0.25}})
+    instrument.merge(worker)
+    assert instrument.summary()["urls"]["https://example.org/a"] == {"fetch": 0.5, "parse": 0.25, "total": 0.75}
+
+
+def test_engine_times_each_url(monkeypatch):
+    instrument.reset()
+    response = types.SimpleNamespace(status_code=200, text="<html></html>",
+                                     elapsed=datetime.timedelta(milliseconds=30))
+    monkeypatch.setattr(client, "get", lambda url: response)
+    scraper = types.SimpleNamespace(NAME="Fake", CACHEABLE=False, label=lambda url: "search: web (key hidden)")
+
+    assert engine.download(scraper, "https://example.org/api?q=web&key=secret") is not None
+    urls = instrument.summary()["urls"]
+    assert list(urls) == ["search: web (key hidden)"]
+    assert set(urls["search: web (key hidden)"]) == {"fetch", "total"}
+
+
+def test_url_fetch_time_leaves_out_policy_waits(monkeypatch):
+    instrument.reset()
+    response = types.SimpleNamespace(status_code=200, text="<html></html>",
+                                     elapsed=datetime.timedelta(milliseconds=30))
+
+    def slow_get(url, timeout=None, **kwargs):
+        time.sleep(0.02)
+        return response
+
+    def throttled(url, send):
+        time.sleep(0.05)
+        return send()
+
+    monkeypatch.setattr(client, "session", lambda: types.SimpleNamespace(get=slow_get))
+    monkeypatch.setattr(client.policy, "call", throttled)
+    scraper = types.SimpleNamespace(NAME="Fake", CACHEABLE=False)
+
+    engine.download(scraper, "https://example.org/jobs")
+    stages = instrument.summary()["urls"]["https://example.org/jobs"]
+    assert 0.02 <= stages["fetch"] < 0.05
+    assert stages["wait"] >= 0.05
+
+
+def test_report_skips_empty_url_list(capsys):
+    instrument.reset()
+    instrument.report()
+    assert "Slowest URLs" not in capsys.readouterr().out
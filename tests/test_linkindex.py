@@ -0,0 +1,60 @@
+import sqlite3
+
+import pytest
+
+import linkindex
+
+
+@pytest.fixture
+def index(tmp_db):
+    linkindex.reset()
+    yield linkindex
+    linkindex.reset()
+
+
+def tender(n):
+    return {"title": f"Web developer {n}", "org": "RRA", "deadline": None,
+            "link": f"https://example.org/job/{n}", "source": "Test"}
+
+
+def test_membership_after_inserts(index, tmp_db):
+    tmp_db.insert_tenders([tender(1), tender(2)])
+    assert index.known(["https://example.org/job/1", "https://example.org/job/3"]) == {"https://example.org/job/1"}
+
+    tmp_db.insert_tenders([tender(3)])
+    index.load()
+    # Matched by canonical key, so another spelling of a stored link counts
+    assert index.known(["http://www.example.org/job/3/", "https://example.org/job/4"]) == {
+        "http://www.example.org/job/3/"}
+
+
+def test_snapshot_round_trip(index, tmp_db):
+    tmp_db.insert_tenders([tender(n) for n in range(5)])
+    index.save()
+    max_id, packed = tmp_db.load_link_snapshot()
+    assert max_id == 5 and len(packed) == 5 * 8
+
+    tmp_db.insert_tenders([tender(5)])
+    index.reset()
+    index.load()  # snapshot plus the one newer row
+    assert index.known([f"https://example.org/job/{n}" for n in range(7)]) == {
+        f"https://example.org/job/{n}" for n in range(6)}
+    index.save()
+    assert tmp_db.load_link_snapshot()[0] == 6
+
+
+def test_snapshot_dropped_when_hashes_change(index, tmp_db, monkeypatch):
+    # A database saved before canonical keys (migration 4) hashed raw links
+    full = tmp_db.MIGRATIONS
+    conn = sqlite3.connect(tmp_db.DB_NAME)
+    monkeypatch.setattr(tmp_db, "MIGRATIONS", full[:3])
+    tmp_db.migrate(conn)
+    conn.execute("INSERT INTO tenders (title, link, source) VALUES ('Web developer', ?, 'Test')",
+                 ("https://www.example.org/job/1",))
+    conn.execute("INSERT INTO link_index (id, max_id, hashes) VALUES (1, 1, zeroblob(8))")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(tmp_db, "MIGRATIONS", full)
+
+    assert tmp_db.load_link_snapshot() == (0, b"")
+    assert index.known(["https://example.org/job/1"]) == {"https://example.org/job/1"}
@@ -0,0 +1,82 @@
+import csv
+import io
+import json
+import types
+
+import radar
+
+
+def tender(n, source="Test"):
+    return {"title": f"Web developer {n}", "org": "RRA", "deadline": None,
+            "link": f"https://example.org/job/{n}", "source": source}
+
+
+def args(**overrides):
+    values = {"status": None, "source": None, "before": None, "limit": None, "offset": 0,
+              "sort": "newest", "format": "text"}
+    values.update(overrides)
+    return types.SimpleNamespace(**values)
+
+
+def listed(capsys, **overrides):
+    """Run --list --format jsonl with these options and return the ids listed."""
+    radar.run_list(args(format="jsonl", **overrides))
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    return [row["id"] for row in rows]
+
+
+def more(capsys, **overrides):
+    radar.run_list(args(**overrides))
+    lines = capsys.readouterr().out.splitlines()
+    return next((line for line in lines if line.startswith("More: ")), None)
+
+
+def test_pages_continue_before_the_last_id(tmp_db, capsys):
+    ids = [t["id"] for t in tmp_db.insert_tenders([tender(n) for n in range(5)])]
+
+    assert listed(capsys, limit=2) == [ids[4], ids[3]]
+    assert more(capsys, limit=2) == f"More: --before {ids[3]}"
+    assert listed(capsys, limit=2, before=ids[3]) == [ids[2], ids[1]]
+    assert listed(capsys, limit=2, before=ids[1]) == [ids[0]]
+    # A short page is the last one
+    assert more(capsys, limit=2, before=ids[1]) is None
+
+
+def test_score_pages_continue_at_the_offset(tmp_db, capsys):
+    ids = [t["id"] for t in tmp_db.insert_tenders([tender(n) for n in range(4)])]
+    with tmp_db.connect() as conn:
+        conn.executemany("UPDATE tenders SET score = ? WHERE id = ?",
+                         [(2.0, ids[0]), (None, ids[1]), (3.0, ids[2]), (2.0, ids[3])])
+
+    assert listed(capsys, sort="score") == [ids[2], ids[3], ids[0], ids[1]]
+    assert more(capsys, sort="score", limit=2) == "More: --offset 2"
+    assert listed(capsys, sort="score", limit=2, offset=2) == [ids[0], ids[1]]
+
+
+def test_status_and_source_filters(tmp_db, capsys):
+    stored = tmp_db.insert_tenders([tender(1, "JobInRwanda"), tender(2, "BrighterMonday Kenya"),
+                                    tender(3, "BrighterMonday Uganda")])
+    ids = [t["id"] for t in stored]
+    tmp_db.mark_sent([ids[1]])
+
+    assert listed(capsys, status="sent") == [ids[1]]
+    assert listed(capsys, status="pending") == [ids[2], ids[0]]
+    assert listed(capsys, source="brightermonday") == [ids[2], ids[1]]
+    assert listed(capsys, source="BrighterMonday", status="pending") == [ids[2]]
+    assert listed(capsys, source="Devex") == []
+
+
+def test_jsonl_and_csv_rows(tmp_db, capsys):
+    stored = tmp_db.insert_tenders([tender(1), tender(2)])
+
+    radar.run_list(args(format="jsonl"))
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [list(row) for row in rows] == [tmp_db.LIST_COLUMNS] * 2
+    assert rows[0]["title"] == "Web developer 2"
+    assert rows[1]["link"] == "https://example.org/job/1"
+
+    radar.run_list(args(format="csv"))
+    rows = list(csv.reader(io.StringIO(capsys.readouterr().out)))
+    assert rows[0] == tmp_db.LIST_COLUMNS
+    assert [row[0] for row in rows[1:]] == [str(stored[1]["id"]), str(stored[0]["id"])]
+    assert rows[1][1] == "Web developer 2"
@@ -0,0 +1,33 @@
+from matcher import Matcher, match, normalize
+
+
+def test_normalize_folds_case_accents_and_spaces():
+    assert normalize("  Développeur   WEB ") == "developpeur web"
+
+
+def test_keyword_found_in_title():
+    assert match("Senior Web Developer") == ["web developer"]
+
+
+def test_synonym_maps_to_keyword():
+    assert match("Recrutement d'un développeur web") == ["web developer"]
+
+
+def test_keyword_must_start_a_word():
+    m = Matcher(["coding"])
+    assert m.match("Decoding bootcamp") == []
+    assert m.match("Coding bootcamp") == ["coding"]
+
+
+def test_keyword_may_be_followed_by_letters():
+    assert Matcher(["programmer"]).match("Programmers wanted") == ["programmer"]
+
+
+def test_overlapping_keywords_are_all_found():
+    m = Matcher(["mobile app development", "app development"])
+    assert m.match("Mobile app development tender") == ["mobile app development", "app development"]
+
+
+def test_no_match():
+    assert match("Supply of office furniture") == []
+    assert match("") == []
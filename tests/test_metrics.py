@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+import metrics
+
+
+@pytest.fixture
+def run():
+    metrics.reset()
+    yield metrics
+    metrics.reset()
+
+
+def record_run(run):
+    run.observe_fetch("JobInRwanda", 0.2, "ok")
+    run.observe_fetch("JobInRwanda", 0.4, "unchanged")
+    run.observe_fetch("JobInRwanda", None, "error")
+    run.add("JobInRwanda", checked=10, matched=4)
+    run.add("Devex", checked=0)
+    run.saved([{"source": "JobInRwanda", "duplicate_of": None}, {"source": "JobInRwanda", "duplicate_of": 1},
+               {"source": "Devex Funding", "duplicate_of": None}])
+    run.email("sent", 2)
+
+
+def test_prometheus_text(run):
+    record_run(run)
+    lines = run.prometheus(duration=1.5).splitlines()
+    for line in [
+        "# TYPE radar_pages_fetched gauge",
+        'radar_pages_fetched{source="JobInRwanda"} 3',
+        'radar_pages_unchanged{source="JobInRwanda"} 1',
+        'radar_fetch_errors{source="JobInRwanda"} 1',
+        'radar_fetch_latency_seconds{source="JobInRwanda",quantile="0.5"} 0.2',
+        'radar_fetch_latency_seconds{source="JobInRwanda",quantile="0.99"} 0.4',
+        'radar_fetch_latency_seconds_count{source="JobInRwanda"} 2',
+        'radar_match_ratio{source="JobInRwanda"} 0.4',
+        'radar_tenders_new{source="Devex"} 1',
+        'radar_tenders_duplicate{source="JobInRwanda"} 1',
+        "radar_run_duration_seconds 1.5",
+        "radar_email_success 1",
+        "radar_email_tenders 2",
+    ]:
+        assert line in lines
+    # No latency and nothing checked: no quantile or ratio samples for Devex
+    assert not any(line.startswith(("radar_fetch_latency_seconds{source=\"Devex\"",
+                                    "radar_match_ratio{source=\"Devex\"")) for line in lines)
+
+
+def test_label_values_are_escaped(run):
+    run.add('Say "hi"\\', checked=1)
+    assert 'radar_titles_checked{source="Say \\"hi\\"\\\\"} 1' in run.prometheus().splitlines()
+
+
+def test_metric_history_rolls_up_per_day_and_source(run, tmp_db):
+    today = time.strftime("%Y-%m-%d")
+    for email, latency in [("sent", 0.2), ("failed", 0.6)]:
+        run.reset()
+        record_run(run)
+        run.observe_fetch("JobInRwanda", latency, "ok")
+        run_id = tmp_db.save_run({"started_at": f"{today}T08:00:00", "mode": "scan", "duration": 1.0})
+        snap = run.snapshot()
+        snap["email"]["status"] = email
+        tmp_db.save_run_metrics(run_id, snap)
+    tmp_db.save_run({"started_at": "2000-01-01T08:00:00", "mode": "scan", "duration": 1.0})
+
+    history = [dict(zip(tmp_db.HISTORY_COLUMNS, row)) for row in tmp_db.metric_history(30)]
+    assert [(row["day"], row["source"]) for row in history] == [(today, "Devex"), (today, "JobInRwanda")]
+    jobs = history[1]
+    assert (jobs["runs"], jobs["pages"], jobs["checked"], jobs["matched"], jobs["match_rate"]) == (2, 8, 20, 8, 0.4)
+    assert (jobs["new"], jobs["duplicates"], jobs["emails_sent"]) == (2, 2, 1)
+    assert jobs["fetch_p50"] == 0.3 and jobs["fetch_p99"] == 0.6  # mean p50, worst p99
+    assert history[0]["match_rate"] is None and history[0]["fetch_p50"] is None
@@ -0,0 +1,82 @@
+import json
+import sqlite3
+import zlib
+
+import pytest
+
+import canonical
+import db
+import dedup
+import deadlines
+import scoring
+
+
+def migrate_to(conn, version, monkeypatch):
+    full = db.MIGRATIONS
+    monkeypatch.setattr(db, "MIGRATIONS", full[:version])
+    db.migrate(conn)
+    monkeypatch.setattr(db, "MIGRATIONS", full)
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    yield conn
+    conn.close()
+
+
+def test_migrations_do_not_run_live_helpers(conn, monkeypatch):
+    migrate_to(conn, 2, monkeypatch)
+    with conn:
+        conn.execute("""
+            INSERT INTO tenders (title, organization, deadline, link, source)
+            VALUES ('Website development for Ministry of Health', 'RRA', '15 March 2026',
+                    'https://www.devex.com/jobs/web-developer-123?utm_source=x', 'Devex')
+        """)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("a migration called live code")
+
+    for module, name in [(canonical, "canonical_key"), (db, "canonical_key"), (db, "link_hash"),
+                         (dedup, "signature"), (dedup, "index"), (dedup, "is_duplicate"),
+                         (deadlines, "parse_deadline"), (db, "parse_deadline"), (scoring, "score"), (db, "score")]:
+        monkeypatch.setattr(module, name, fail)
+    db.migrate(conn)
+    row = conn.execute("SELECT canonical_key, deadline_at, score FROM tenders").fetchone()
+    assert row[:2] == ("devex.com/jobs/123", "2026-03-15")
+    assert row[2] > 0
+    assert conn.execute("SELECT COUNT(*) FROM tender_minhash").fetchone()[0] == 1
+
+
+def test_reordered_numbers_are_released_from_clusters(conn, monkeypatch):
+    migrate_to(conn, 17, monkeypatch)
+    with conn:
+        for title, duplicate_of in [("Supply of ICT equipment tender 0 1", None),
+                                    ("Supply of ICT equipment tender 1 0", 1),
+                                    ("Supply of ICT equipment tender 0 1 ", 1)]:
+            conn.execute("INSERT INTO tenders (title, link, source, duplicate_of) VALUES (?, ?, 'Test', ?)",
+                         (title, f"https://example.org/{title}", duplicate_of))
+    db.migrate(conn)
+    assert [row[0] for row in conn.execute("SELECT duplicate_of FROM tenders ORDER BY id")] == [None, None, 1]
+
+
+def test_brightermonday_keys_are_recomputed(conn, monkeypatch):
+    migrate_to(conn, 18, monkeypatch)
+    web, java, senior = (f"https://www.brightermonday.co.ke/listings/{slug}"
+                         for slug in ("web-developer", "java-developer-abc12", "senior-java-developer-abc12"))
+    with conn:
+        conn.execute("INSERT INTO tenders (id, title, link, source, canonical_key) VALUES (1, 'Web', ?, 'BM', ?)",
+                     (web, "brightermonday.co.ke/listings/developer"))
+        conn.execute("INSERT INTO tenders_archive (id, canonical_key, data) VALUES (2, ?, ?)",
+                     ("brightermonday.co.ke/listings/abc12", zlib.compress(json.dumps({"link": java}).encode())))
+        conn.execute("INSERT INTO tenders (id, title, link, source) VALUES (3, 'Senior', ?, 'BM')", (senior,))
+        conn.execute("INSERT INTO link_index (id, max_id, hashes) VALUES (1, 3, x'')")
+    db.migrate(conn)
+
+    assert conn.execute("SELECT canonical_key, link_hash, sent FROM tenders WHERE id = 1").fetchone() == (
+        "brightermonday.co.ke/listings/web-developer", db.link_hash(web), 0)
+    assert conn.execute("SELECT canonical_key, link_hash FROM tenders_archive").fetchone() == (
+        "brightermonday.co.ke/listings/abc12", db.link_hash(java))
+    # Same listing id as the archived row: keeps no key and is not emailed
+    assert conn.execute("SELECT canonical_key, sent FROM tenders WHERE id = 3").fetchone() == (None, 1)
+    assert conn.execute("SELECT COUNT(*) FROM link_index").fetchone()[0] == 0
@@ -0,0 +1,38 @@
+import os
+import types
+
+import pytest
+
+import instrument
+from config import PARSE_PROCS, PARSE_POOL_MIN_PAGES
+from scrapers import engine, httpcache, jobinrwanda
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+
+@pytest.fixture
+def pages():
+    httpcache.configure(enabled=False)
+    with open(os.path.join(DATA, "jobinrwanda_tenders.html"), encoding="utf-8") as f:
+        html = f.read()
+    pages = [engine.Page(f"https://www.jobinrwanda.com/jobs/tender?page={n}", types.SimpleNamespace(text=html))
+             for n in range(PARSE_POOL_MIN_PAGES)]
+    yield pages + [None]  # a failed download stays None
+    engine.configure(parse_procs=PARSE_PROCS)
+    engine.close()
+    httpcache.configure(enabled=True)
+
+
+def test_pool_gives_the_same_listings(pages):
+    engine.configure(parse_procs=1)
+    in_process = engine.parse_all(jobinrwanda, pages)
+
+    instrument.reset()
+    engine.configure(parse_procs=2)
+    pooled = engine.parse_all(jobinrwanda, pages)
+    assert engine._pool is not None  # the batch really went to the pool
+
+    assert pooled == in_process
+    assert in_process[-1] is None and len(in_process[0]) == 2
+    # The workers' timings come back to this process
+    assert instrument.summary()["spans"]["parse.JobInRwanda"]["count"] == PARSE_POOL_MIN_PAGES
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from scrapers import brightermonday, jobinrwanda, parsing
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+
+@pytest.fixture
+def strain():
+    """Parse with and without the card strainers."""
+    yield parsing.configure
+    parsing.configure(strain=True)
+
+
+def read(name):
+    with open(os.path.join(DATA, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_jobinrwanda_cards_wrapped_in_their_link(strain):
+    html = read("jobinrwanda_tenders.html")
+    listings = jobinrwanda.parse(html, "https://www.jobinrwanda.com/jobs/tender")
+    assert [(t["title"], t["link"]) for t in listings] == [
+        ("Tender for Design and Development of the Ministry of Health Website",
+         "https://www.jobinrwanda.com/job/tender-design-and-development-ministry-health-website"),
+        ("Consultancy for Mobile App Development",
+         "https://www.jobinrwanda.com/job/consultancy-mobile-app-development-undp"),
+    ]
+    assert listings[0]["deadline"] == "Deadline: 30 Nov 2026"
+    strain(strain=False)
+    assert jobinrwanda.parse(html, "https://www.jobinrwanda.com/jobs/tender") == listings
+
+
+def test_jobinrwanda_link_inside_card():
+    html = """
+        <div class="card"><div class="card-body">
+            <a href="/job/web-developer"><h5 class="card-title">Web Developer</h5></a>
+            <a href="/employer/kigali-city">City of Kigali</a>
+        </div></div>
+    """
+    assert jobinrwanda.parse(html, "https://www.jobinrwanda.com/jobs/all") == [{
+        "title": "Web Developer", "org": "City of Kigali", "deadline": "Check listing",
+        "link": "https://www.jobinrwanda.com/job/web-developer", "source": "JobInRwanda",
+    }]
+
+
+@pytest.mark.parametrize("card", [
+    '<div data-cy="listing-cards-components"><a data-cy="listing-title-link" href="/listings/web-developer-k1x9">'
+    '<p>Web Developer</p></a></div>',
+    '<a href="/listings/web-developer-k1x9"><div data-cy="listing-cards-components"><p>Web Developer</p></div></a>',
+])
+def test_brightermonday_link_inside_or_around_card(card):
+    listings = brightermonday.parse(f"<html><body>{card}</body></html>",
+                                    "https://www.brightermonday.co.ke/jobs/software-data")
+    assert [(t["title"], t["link"]) for t in listings] == [
+        ("Web Developer", "https://www.brightermonday.co.ke/listings/web-developer-k1x9")]
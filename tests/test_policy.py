@@ -0,0 +1,95 @@
+import pytest
+import requests
+
+from scrapers import policy
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+
+@pytest.fixture(autouse=True)
+def no_waiting(monkeypatch):
+    monkeypatch.setattr(policy, "RATE_LIMIT_PER_HOST", 0)
+    monkeypatch.setattr(policy, "BACKOFF_MAX", 0)
+    monkeypatch.setattr(policy, "CIRCUIT_FAILURES", 3)
+    policy.load({})
+    yield
+    policy.load({})
+
+
+def sender(*outcomes):
+    """send() returning (or raising) outcomes in turn; records the calls."""
+    outcomes = list(outcomes)
+    calls = []
+
+    def send():
+        calls.append(1)
+        outcome = outcomes.pop(0) if len(outcomes) > 1 else outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return Response(outcome)
+
+    send.calls = calls
+    return send
+
+
+def test_retries_server_errors():
+    send = sender(503, 429, 200)
+    assert policy.call("https://example.org/a", send).status_code == 200
+    assert len(send.calls) == 3
+
+
+def test_not_found_does_not_open_circuit():
+    for page in range(10):
+        assert policy.call(f"https://example.org/page/{page}", sender(404)).status_code == 404
+    assert policy.open_circuits() == []
+    assert policy.call("https://example.org/", sender(200)).status_code == 200
+
+
+def test_gone_is_not_retried():
+    send = sender(410)
+    assert policy.call("https://example.org/a", send).status_code == 410
+    assert len(send.calls) == 1
+
+
+def test_server_errors_open_circuit():
+    for _ in range(3):
+        assert policy.call("https://example.org/a", sender(503)).status_code == 503
+    assert [host for host, _, _ in policy.open_circuits()] == ["example.org"]
+    send = sender(200)
+    with pytest.raises(policy.CircuitOpenError):
+        policy.call("https://example.org/b", send)
+    assert send.calls == []
+
+
+def test_connection_errors_open_circuit():
+    for _ in range(3):
+        with pytest.raises(requests.ConnectionError):
+            policy.call("https://example.org/a", sender(requests.ConnectionError("refused")))
+    with pytest.raises(policy.CircuitOpenError):
+        policy.call("https://example.org/a", sender(200))
+
+
+def test_success_resets_failures():
+    policy.call("https://example.org/a", sender(503))
+    policy.call("https://example.org/a", sender(503))
+    policy.call("https://example.org/a", sender(404))
+    policy.call("https://example.org/a", sender(503))
+    assert policy.open_circuits() == []
+    assert policy.state()["example.org"] == (1, None)
+
+
+def test_other_request_errors_are_not_host_failures():
+    for _ in range(3):
+        with pytest.raises(requests.TooManyRedirects):
+            policy.call("https://example.org/a", sender(requests.TooManyRedirects()))
+    assert policy.open_circuits() == []
+
+
+def test_probe_after_cooldown_closes_circuit():
+    policy.load({"example.org": (3, 0.0)})
+    assert policy.call("https://example.org/a", sender(404)).status_code == 404
+    assert policy.state() == {"example.org": (0, None)}
@@ -0,0 +1,71 @@
+"""EXPLAIN QUERY PLAN checks for the hot queries in db.INDEXED_QUERIES (the SQL the functions run)."""
+
+import sqlite3
+
+import pytest
+
+import db
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    db.migrate(conn)
+    yield conn
+    conn.close()
+
+
+def test_schema_is_current(conn):
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(db.MIGRATIONS)
+
+
+def test_hot_queries_are_indexed(conn):
+    assert db.check_query_plans(conn) == []
+
+
+@pytest.mark.parametrize("name", sorted(db.INDEXED_QUERIES))
+def test_query_searches_an_index(conn, name):
+    assert db.check_query_plans(conn, {name: db.INDEXED_QUERIES[name]}) == []
+
+
+def test_table_scan_is_flagged(conn):
+    problems = db.check_query_plans(conn, {"by_title": "SELECT id FROM tenders WHERE title = ?"})
+    assert problems and problems[0].startswith("by_title: SCAN tenders")
+
+
+def test_full_index_scan_is_flagged(conn):
+    # Walks all of idx_tenders_created_at: an index, but not a partial one
+    problems = db.check_query_plans(conn, {"by_age": "SELECT created_at FROM tenders ORDER BY created_at"})
+    assert problems and "idx_tenders_created_at" in problems[0]
+
+
+def test_partial_index_scan_is_allowed(conn):
+    sql = "SELECT id FROM tenders WHERE sent = 0 AND duplicate_of IS NULL ORDER BY id DESC"
+    assert db.check_query_plans(conn, {"pending": sql}) == []
+
+
+def test_temporary_sort_is_flagged(conn):
+    problems = db.check_query_plans(conn, {"by_deadline": "SELECT id FROM tenders WHERE id > ? ORDER BY deadline"})
+    assert any("TEMP B-TREE" in problem for problem in problems)
+
+
+def test_every_list_query_is_checked():
+    # One entry per --list combination of status, source, --before and --sort
+    assert sum(name.startswith("iter_tenders") for name in db.INDEXED_QUERIES) == 24
+
+
+def add(conn, source, score):
+    conn.execute("INSERT INTO tenders (title, link, source, score) VALUES ('t', ?, ?, ?)",
+                 (f"https://example.org/{conn.total_changes}", source, score))
+
+
+def test_source_prefix_merges_sources_in_order(tmp_db):
+    conn = tmp_db.connect()
+    with conn:
+        for source, score in [("JobA", 1.0), ("jobb", 3.0), ("JobA", 2.0), ("Other", 9.0), ("JOBB", None)]:
+            add(conn, source, score)
+    assert [row[0] for row in tmp_db.iter_tenders(source="job")] == [5, 3, 2, 1]
+    assert [row[0] for row in tmp_db.iter_tenders(source="JOB", limit=2, offset=1)] == [3, 2]
+    assert [row[0] for row in tmp_db.iter_tenders(source="job", by_score=True)] == [2, 3, 1, 5]
+    assert [row[0] for row in tmp_db.iter_tenders(source="jobb", before=5)] == [2]
+    assert list(tmp_db.iter_tenders(source="none")) == []
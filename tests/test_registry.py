@@ -0,0 +1,62 @@
+import datetime
+import sys
+import types
+
+import pytest
+
+import scrapers
+from scrapers import client, engine
+
+
+@pytest.mark.parametrize("name", sorted(scrapers.REGISTRY))
+def test_registered_modules_follow_the_contract(name):
+    module = scrapers.REGISTRY[name]
+    assert isinstance(module.NAME, str) and isinstance(module.DESCRIPTION, str)
+    assert callable(module.urls) and callable(module.parse) and callable(module.fetch)
+    assert name in engine.SOURCES
+
+
+@pytest.mark.parametrize("name", sorted(scrapers.REGISTRY))
+def test_parse_never_touches_the_network(name, monkeypatch):
+    def no_network(*args, **kwargs):
+        raise AssertionError("parse() made a request")
+
+    monkeypatch.setattr(client, "get", no_network)
+    body = "{}" if name in ("reliefweb", "google_search") else "<html><body></body></html>"
+    url = "https://example.org/search?q=site:example.org+tender" if name == "google_search" else "https://example.org/"
+    assert scrapers.REGISTRY[name].parse(body, url) == []
+
+
+def test_enabled_follows_config(monkeypatch):
+    monkeypatch.setattr(engine, "SOURCES", {"devex": True, "jobinrwanda": {"enabled": False}})
+    assert scrapers.enabled() == [("devex", scrapers.REGISTRY["devex"])]
+
+
+@pytest.fixture
+def fake_scraper(monkeypatch):
+    module = types.ModuleType("fake_scraper")
+    module.__file__ = "/scrapers/fake_scraper.py"
+    module.NAME = "Fake"
+    module.CACHEABLE = False
+    module.urls = lambda: ["https://example.org/a", "https://example.org/b"]
+    module.parse = lambda body, url: [{"title": body, "link": link} for link in ("https://example.org/job/1",
+                                                                                  f"{url}/job")]
+    monkeypatch.setitem(sys.modules, "fake_scraper", module)
+    return module
+
+
+def test_fetch_runs_url_download_parse_merge(fake_scraper, monkeypatch):
+    requested = []
+
+    def get(url):
+        requested.append(url)
+        return types.SimpleNamespace(status_code=200, text=f"page {url[-1]}", elapsed=datetime.timedelta(0))
+
+    monkeypatch.setattr(client, "get", get)
+    monkeypatch.setattr(engine.linkindex, "known", lambda links: {l for l in links if l.endswith("/b/job")})
+    new = engine.fetch(fake_scraper)
+
+    assert requested == ["https://example.org/a", "https://example.org/b"]
+    # job/1 is on both pages (kept once, from the first); b/job is already stored
+    assert new == [{"title": "page a", "link": "https://example.org/job/1"},
+                   {"title": "page a", "link": "https://example.org/a/job"}]
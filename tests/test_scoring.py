@@ -0,0 +1,33 @@
+from scoring import score, source_prior
+
+
+def test_keyword_weights():
+    assert score("Web development of the RRA portal", "", "Test") == 3.0
+    assert score("IT officer", "", "Test") == 0.5
+    assert score("Senior programmer", "", "Test") == 1.0  # not in KEYWORD_WEIGHTS
+    assert score("Procurement of office furniture", "", "Test") == 0
+
+
+def test_organisation_keywords_count_less_and_once():
+    assert score("Consultancy", "Website and mobile app unit", "Test") == round((2.0 + 3.0) * 0.3, 2)
+    # "website" is already in the title, so the organisation adds nothing
+    assert score("Mobile app for the website", "Website unit", "Test") == 5.0
+
+
+def test_source_priors_match_longest_prefix():
+    assert source_prior("Devex Funding") == 1.3
+    assert source_prior("Devex Jobs") == 1.0
+    assert source_prior("BrighterMonday Kenya") == 0.8
+    assert source_prior("Somewhere else") == 1.0
+    assert source_prior(None) == 1.0
+    assert score("Web development", "", "TenderAfrica") > score("Web development", "", "BrighterMonday Kenya")
+
+
+def test_equal_scores_rank_by_deadline_proximity(tmp_db):
+    tmp_db.insert_tenders([
+        {"title": "Website redesign", "org": "RRA", "deadline": deadline, "link": f"https://example.org/{n}",
+         "source": "Test"}
+        for n, deadline in enumerate(["Check listing", "Deadline: 30 June 2099", "Deadline: 15 March 2099"])
+    ])
+    assert [row[3] for row in tmp_db.get_unsent()] == [
+        "Deadline: 15 March 2099", "Deadline: 30 June 2099", "Check listing"]
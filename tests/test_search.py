@@ -0,0 +1,44 @@
+def add(conn, title, org="RRA", source="Test"):
+    return conn.execute("INSERT INTO tenders (title, organization, link, source) VALUES (?, ?, ?, ?)",
+                        (title, org, f"https://example.org/{title}", source)).lastrowid
+
+
+def ids(db, text, **filters):
+    return [row[0] for row in db.search(text, **filters)]
+
+
+def test_insert_update_and_delete_stay_in_sync(tmp_db):
+    conn = tmp_db.connect()
+    with conn:
+        first = add(conn, "Website redesign")
+        second = add(conn, "Mobile app for farmers", org="MINAGRI")
+    assert ids(tmp_db, "website") == [first]
+    assert ids(tmp_db, "minagri") == [second]
+
+    with conn:
+        conn.execute("UPDATE tenders SET title = 'Payroll software' WHERE id = ?", (first,))
+    assert ids(tmp_db, "website") == []
+    assert ids(tmp_db, "payroll") == [first]
+
+    with conn:
+        conn.execute("DELETE FROM tenders WHERE id = ?", (second,))
+    assert ids(tmp_db, "mobile") == []
+    # Raises if the index and the tenders table disagree
+    conn.execute("INSERT INTO tenders_fts (tenders_fts, rank) VALUES ('integrity-check', 1)")
+
+
+def test_prefix_accent_and_source_matching(tmp_db):
+    conn = tmp_db.connect()
+    with conn:
+        web = add(conn, "Développeur web", source="JobInRwanda")
+        add(conn, "Web developer", source="BrighterMonday Kenya")
+    assert ids(tmp_db, "developpeur") == [web]
+    assert len(ids(tmp_db, "dev")) == 2
+    assert ids(tmp_db, "web", source="JobIn") == [web]
+
+
+def test_empty_query_matches_nothing(tmp_db):
+    with tmp_db.connect() as conn:
+        add(conn, "Website redesign")
+    assert ids(tmp_db, "") == []
+    assert ids(tmp_db, "!!") == []